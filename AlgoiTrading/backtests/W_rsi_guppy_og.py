@@ -1,10 +1,12 @@
-from backtesting import Backtest, Strategy
+from backtesting import Backtest
 from backtesting.lib import crossover
-import pandas as pd
 import numpy as np
 import talib
+from indicators import lsma
+from indicator_cache import CachedStrategy
+from ohlcv_store import load_csv
 print("RSI GUppy strategy OG loading....")
-class LSMAGuppyRSI(Strategy):
+class LSMAGuppyRSI(CachedStrategy):
     lsma_period = 55
     rsi_period = 14
     risk_multiplier = 2
@@ -15,22 +17,11 @@ class LSMAGuppyRSI(Strategy):
         print('RSI GUPPY Strategy initialization')
         close = self.data.Close
         time_period = np.arange(len(close))
-        self.lsma = self.I(lambda x: self.calculate_lsma(x, self.lsma_period), close)
+        self.lsma = self.I(lsma, close, self.lsma_period)
         
         self.rsi = self.I(talib.RSI, close, self.rsi_period)
         print("🍹 Indicators created successfully!")
 
-    def calculate_lsma(self, data, period):
-        """Calculate linear regression moving average"""
-        print("🧪Calculating LSMA")
-        result = np.zeros_like(data)
-        for i in range(period-1, len(data)):
-            x = np.arange(period)
-            y = data[i-period+1:i+1]
-            slope, intercept = np.polyfit(x,y,1)
-            result[i] = slope * (period -1) + intercept
-        return result
-    
     #this runs on each bar
     def next(self):
         price = self.data.Close[-1]
@@ -86,19 +77,19 @@ class LSMAGuppyRSI(Strategy):
                 self.position.close()
         elif self.position.is_short and price > self.lsma[-1]:
                 self.position.close()
-#load in the data
-data = pd.read_csv("/Users/macm4/Desktop/productivity/data/ETHUSD_1m_060124_01012025.csv")
 
-#data: Date,Open,High,Low,Close,Volume
-data.index = pd.to_datetime(data['Date'])
-data = data[['Open','High','Low','Close','Volume']]  
 
-bt= Backtest(data, LSMAGuppyRSI, cash=100000, commission=0.002, exclusive_orders=True)
+if __name__ == "__main__":
+    #load in the data: the CSV is converted into the memory-mapped OHLCV store on first run
+    #data: Date,Open,High,Low,Close,Volume
+    data = load_csv("/Users/macm4/Desktop/productivity/data/ETHUSD_1m_060124_01012025.csv", "ETHUSD")
+
+    bt= Backtest(data, LSMAGuppyRSI, cash=100000, commission=0.002, exclusive_orders=True)
 
-print("\n Starting Backtest...")
-stats = bt.run()
-print(stats)
+    print("\n Starting Backtest...")
+    stats = bt.run()
+    print(stats)
 
-#print("\n Generating plot...")
-bt.plot()
-#print(" OG RSI Guppy Strategy complete!") 
+    #print("\n Generating plot...")
+    bt.plot()
+    #print(" OG RSI Guppy Strategy complete!") 
@@ -0,0 +1,208 @@
+"""
+Local cache for exchange candles fetched through ccxt.
+
+Bars are kept per (exchange, symbol, timeframe) in the OHLCV store
+(ohlcv_store.py), next to a record of the time ranges already fetched. A
+request for [since, until) fetches only the parts of it not yet covered, each
+paginated past the exchange's per-request limit, so repeat runs read from
+disk and extending a backtest window downloads just the new bars. Ranges
+are recorded as fetched even where the exchange has no bars (before a
+listing, during an outage), so those aren't requested again either.
+
+Only closed candles are cached: the candle still forming is left out.
+
+The exchange only needs what CandleCache uses: `id`, `milliseconds()` and
+`fetch_ohlcv(symbol, timeframe, since, limit)`. FakeExchange provides them
+with generated candles, to run the backtests (or check the cache) offline.
+
+Usage:
+    exchange = ccxt.phemex({'enableRateLimit': True})
+    cache = CandleCache(exchange)
+    data = cache.fetch('ETH/USDT', '1h', since=exchange.milliseconds() - 2000 * 3600_000)
+    data = cache.last('ETH/USDT', '1h', 2000)     # the 2000 latest closed candles
+
+    python candle_cache.py ETH/USDT 1h --bars 2000 --exchange phemex
+    python candle_cache.py ETH/USDT 1h --bars 2000 --fake
+
+Cache location: $BACKTEST_CACHE_DIR/ohlcv/<exchange>-<symbol>-<timeframe>
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import OHLCV, _symbol_dir, ingest_frame, load
+
+_UNITS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_ms(timeframe):
+    """'15m' -> 900000. Calendar months ('1M') have no fixed length and aren't supported."""
+    count, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _UNITS or not count.isdigit():
+        raise ValueError(f"Unsupported timeframe {timeframe!r}; expected e.g. 1m, 15m, 1h, 4h, 1d, 1w")
+    return int(count) * _UNITS[unit]
+
+
+def missing_ranges(covered, start, end):
+    """Parts of [start, end) outside the sorted, non-overlapping [a, b) ranges in covered."""
+    gaps, cursor = [], start
+    for a, b in covered:
+        if b <= cursor:
+            continue
+        if a >= end:
+            break
+        if a > cursor:
+            gaps.append((cursor, a))
+        cursor = max(cursor, b)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _merge(ranges):
+    merged = []
+    for a, b in sorted(ranges):
+        if merged and a <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+
+class CandleCache:
+
+    def __init__(self, exchange, root=None, page_limit=1000):
+        self.exchange = exchange
+        self.root = root
+        self.page_limit = page_limit
+        self.stats = {'requests': 0, 'bars_fetched': 0}
+
+    def _key(self, symbol, timeframe):
+        return f"{self.exchange.id}-{symbol}-{timeframe}"
+
+    def _coverage_path(self, key):
+        return os.path.join(_symbol_dir(key, self.root), 'coverage.json')
+
+    def coverage(self, symbol, timeframe):
+        """Fetched [start, end) ranges in ms, merged and sorted."""
+        try:
+            with open(self._coverage_path(self._key(symbol, timeframe))) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _fetch_range(self, symbol, timeframe, start, end, step):
+        """Every bar in [start, end), one page after another."""
+        pages, cursor = [], start
+        while cursor < end:
+            self.stats['requests'] += 1
+            batch = np.asarray(self.exchange.fetch_ohlcv(symbol, timeframe, since=int(cursor),
+                                                         limit=self.page_limit), dtype=np.float64)
+            if batch.size:
+                batch = batch[(batch[:, 0] >= cursor) & (batch[:, 0] < end)]
+            if not batch.size:
+                break  # nothing left before end
+            pages.append(batch)
+            cursor = int(batch[-1, 0]) + step
+        return np.concatenate(pages) if pages else np.empty((0, 6))
+
+    def fetch(self, symbol, timeframe, since, until=None):
+        """Closed candles with open time in [since, until) (ms; until defaults to now), fetching only what's missing."""
+        step = timeframe_ms(timeframe)
+        # Align to candle boundaries; the candle open at `now` is still forming
+        now = self.exchange.milliseconds()
+        start = int(since) // step * step
+        end = min(-(-int(until) // step) * step if until is not None else now, now // step * step)
+        key = self._key(symbol, timeframe)
+
+        covered = self.coverage(symbol, timeframe)
+        for a, b in missing_ranges(covered, start, end):
+            bars = self._fetch_range(symbol, timeframe, a, b, step)
+            if len(bars):
+                frame = pd.DataFrame(bars[:, 1:], columns=OHLCV,
+                                     index=pd.to_datetime(bars[:, 0].astype(np.int64), unit='ms'))
+                ingest_frame(frame, key, self.root)
+                self.stats['bars_fetched'] += len(bars)
+            # Record each range as soon as it is stored, so a failure later on keeps the progress
+            covered = _merge(covered + [[a, b]])
+            os.makedirs(os.path.dirname(self._coverage_path(key)), exist_ok=True)
+            with open(self._coverage_path(key), 'w') as f:
+                json.dump(covered, f)
+
+        try:
+            return load(key, pd.Timestamp(start, unit='ms'), pd.Timestamp(end, unit='ms'), self.root)
+        except KeyError:
+            return pd.DataFrame(columns=OHLCV, index=pd.DatetimeIndex([], name='Date'), dtype=np.float64)
+
+    def last(self, symbol, timeframe, bars):
+        """The latest `bars` closed candles (fewer if the exchange has fewer)."""
+        step = timeframe_ms(timeframe)
+        return self.fetch(symbol, timeframe, since=self.exchange.milliseconds() // step * step - bars * step)
+
+
+class FakeExchange:
+    """
+    Offline stand-in for a ccxt exchange: deterministic synthetic candles
+    from `listed` (ms) on, served at most `max_limit` per request.
+    `calls` records every fetch_ohlcv(since, limit).
+    """
+
+    def __init__(self, id='fake', listed=0, now=None, max_limit=500, seed=0, gaps=()):
+        self.id = id
+        self.listed = listed
+        self.now = now
+        self.max_limit = max_limit
+        self.seed = seed
+        self.gaps = gaps  # [(start, end) ms] with no candles, like an exchange outage
+        self.calls = []
+
+    def milliseconds(self):
+        return self.now if self.now is not None else int(time.time() * 1000)
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.calls.append((symbol, timeframe, since, limit))
+        step = timeframe_ms(timeframe)
+        limit = min(limit or self.max_limit, self.max_limit)
+        first = -(-max(since if since is not None else self.listed, self.listed) // step) * step
+        # Like an exchange, skip past outages and return the next `limit` candles that exist
+        span = limit * step + sum(b - a for a, b in self.gaps)
+        stamps = np.arange(first, min(first + span, self.milliseconds() // step * step + 1), step, dtype=np.int64)
+        for a, b in self.gaps:
+            stamps = stamps[(stamps < a) | (stamps >= b)]
+        stamps = stamps[:limit]
+        # Prices depend only on the candle's time, so every request sees the same history
+        bar = stamps // step
+        noise = (bar + self.seed) * 2654435761 % 1000 / 1000
+        base = 1000 + 50 * np.sin(bar / 97.0) + bar % 13
+        return [[int(t), o, o + 2 + n, o - 2 - n, o + n - 0.5, 10 + 5 * n]
+                for t, o, n in zip(stamps, base, noise)]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Fetch exchange candles through the local cache")
+    p.add_argument('symbol')
+    p.add_argument('timeframe')
+    p.add_argument('--bars', type=int, default=2000, help="Latest closed candles to return (default: 2000)")
+    p.add_argument('--exchange', default='phemex', help="ccxt exchange id (default: phemex)")
+    p.add_argument('--fake', action='store_true', help="Use FakeExchange instead of the network")
+    args = p.parse_args()
+
+    if args.fake:
+        exchange = FakeExchange(listed=1_700_000_000_000)
+    else:
+        import ccxt
+        exchange = getattr(ccxt, args.exchange)({'enableRateLimit': True})
+    cache = CandleCache(exchange)
+    start = time.perf_counter()
+    data = cache.last(args.symbol, args.timeframe, args.bars)
+    print(f"✨ {len(data)} bars in {time.perf_counter() - start:.2f}s "
+          f"({cache.stats['requests']} requests, {cache.stats['bars_fetched']} new bars)")
+    print(data.tail())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+On-disk cache for indicator arrays.
+
+Strategies declare indicators with self.I(func, *args). CachedStrategy wraps
+those calls: the result is keyed on the content hash of the array/data
+arguments, the indicator's name and code, and its scalar parameters, saved
+once as a .npy file and memory-mapped on every later run with the same data
+and parameters (later runs of a script, other sweep workers, other
+strategies using the same indicator).
+
+Indicators that compute several outputs in one pass (e.g. StochRSI %K and
+%D) are declared with @multi_output. Each output is its own cache entry, and
+computing one stores all of them, so asking for %D after %K is a cache hit:
+
+    @multi_output('k', 'd')
+    def stoch_rsi(data, length=14):
+        ...
+        return k, d
+
+    stoch_rsi_k = stoch_rsi.output('k')
+    stoch_rsi_d = stoch_rsi.output('d')
+
+    class Strat(CachedStrategy):
+        def init(self):
+            self.k = self.I(stoch_rsi_k, self.data, 14)
+            self.d = self.I(stoch_rsi_d, self.data, 14)   # read from the cache
+
+An indicator's version is its `indicator_version` attribute when it has one;
+otherwise, for a Python function, a hash of its code and of its module's
+source file, so editing a helper in the same module (e.g. indicators'
+_lsma_cumsum) also invalidates the entries. Compiled functions (talib,
+Cython) are tied to their library's version. Give an indicator an explicit
+indicator_version when it depends on code in other modules.
+
+Functions that can't be named reliably (lambdas, nested functions) and calls
+with arguments that can't be hashed run uncached.
+
+Cache location: $BACKTEST_CACHE_DIR/indicators, else ~/.cache/backtests/indicators
+"""
+import functools
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+from backtesting import Strategy
+
+
+def cache_root():
+    return os.environ.get('BACKTEST_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'backtests'))
+
+
+class Uncacheable(TypeError):
+    pass
+
+
+def _hash_array(digest, values):
+    values = np.ascontiguousarray(values)
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    if values.dtype == object:
+        raise Uncacheable("object arrays have no stable content hash")
+    digest.update(values.view(np.uint8).reshape(-1))
+
+
+def _arg_key(value):
+    """JSON-able stand-in for one indicator argument: scalars as-is, data by content hash."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(value, np.ndarray):
+        _hash_array(digest, value)
+    elif hasattr(value, 'df'):
+        # backtesting's self.data: every column plus the index
+        df = value.df
+        _hash_array(digest, df.index.asi8 if hasattr(df.index, 'asi8') else df.index.to_numpy())
+        for col in df.columns:
+            digest.update(str(col).encode())
+            _hash_array(digest, df[col].to_numpy())
+    elif isinstance(value, (list, tuple)):
+        return [_arg_key(v) for v in value]
+    else:
+        raise Uncacheable(f"can't hash indicator argument of type {type(value).__name__}")
+    return 'data:' + digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+def indicator_version(func):
+    """Version string of an indicator's implementation (see the module docstring)."""
+    explicit = getattr(func, 'indicator_version', None)
+    if explicit is not None:
+        return str(explicit)
+    module_name = getattr(func, '__module__', None) or ''
+    source = getattr(sys.modules.get(module_name), '__file__', None) or ''
+    if isinstance(func, types.FunctionType) and source.endswith('.py'):
+        code = func.__code__
+        digest = hashlib.blake2b(code.co_code + repr(code.co_consts).encode(), digest_size=8).hexdigest()
+        return f"{digest}-{_source_digest(source)}"
+    # talib, Cython and other compiled functions (even those exposing __code__): the library version
+    return str(getattr(sys.modules.get(module_name.split('.')[0]), '__version__', ''))
+
+
+def indicator_id(func):
+    """('module.qualname', version), or None for unnamed functions."""
+    name = getattr(func, '__qualname__', None)
+    if not name or '<' in name:
+        return None
+    return f"{getattr(func, '__module__', '')}.{name}", indicator_version(func)
+
+
+def multi_output(*names):
+    """Mark a function returning len(names) arrays; .output(name) gives a callable for one of them."""
+    def decorate(func):
+        func.indicator_outputs = names
+
+        def output(name):
+            index = names.index(name)
+
+            def one(*args, **kwargs):
+                return func(*args, **kwargs)[index]
+            one.__name__ = one.__qualname__ = f"{func.__name__}_{name}"
+            one.__module__ = func.__module__
+            one.indicator_joint, one.indicator_output = func, name
+            return one
+        func.output = output
+        return func
+    return decorate
+
+
+class IndicatorCache:
+    """Indicator results as .npy files under cache_dir, memory-mapped on reuse."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(cache_root(), 'indicators')
+        self.loaded = {}
+        self.stats = {'hits': 0, 'misses': 0, 'uncached': 0}
+
+    def _path(self, name, output, key):
+        folder = name if output is None else f"{name}.{output}"
+        return os.path.join(self.cache_dir, folder, f"{key}.npy")
+
+    def _load(self, path):
+        if path not in self.loaded:
+            try:
+                self.loaded[path] = np.load(path, mmap_mode='r')
+            except (OSError, ValueError):
+                return None
+        return self.loaded[path]
+
+    def _save(self, path, value):
+        value = np.asarray(value)
+        if value.dtype == object:
+            return value
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, value)
+        os.replace(tmp, path)
+        return self._load(path)
+
+    def __call__(self, func, *args, **kwargs):
+        """func(*args, **kwargs), from the cache when this data and these parameters were seen before."""
+        joint = getattr(func, 'indicator_joint', None)
+        base = joint or func
+        ident = indicator_id(base)
+        try:
+            if ident is None:
+                raise Uncacheable(f"{func!r} has no stable name")
+            key = hashlib.sha256(json.dumps(
+                [ident, [_arg_key(a) for a in args], {k: _arg_key(v) for k, v in sorted(kwargs.items())}],
+            ).encode()).hexdigest()[:32]
+        except Uncacheable:
+            self.stats['uncached'] += 1
+            return func(*args, **kwargs)
+
+        outputs = getattr(base, 'indicator_outputs', None) or (None,)
+        wanted = [func.indicator_output] if joint else list(outputs)
+        hits = [self._load(self._path(ident[0], name, key)) for name in wanted]
+        if all(hit is not None for hit in hits):
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            values = base(*args, **kwargs)
+            if outputs == (None,):
+                values = (values,)
+            if len(values) != len(outputs):
+                raise ValueError(f"{ident[0]} returned {len(values)} arrays for outputs {outputs}")
+            saved = {name: self._save(self._path(ident[0], name, key), value)
+                     for name, value in zip(outputs, values)}
+            hits = [saved[name] for name in wanted]
+        return hits[0] if joint or outputs == (None,) else tuple(hits)
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = IndicatorCache()
+    return _default_cache
+
+
+class CachedStrategy(Strategy):
+    """Strategy whose self.I reads indicators through indicator_cache (default: the shared disk cache)."""
+    indicator_cache = None
+
+    def I(self, func, *args, **kwargs):
+        return super().I(_bind(self.indicator_cache or default_cache(), func), *args, **kwargs)
+
+
+def _bind(cache, func):
+    def cached(*args, **kwargs):
+        return cache(func, *args, **kwargs)
+    # Strategy.I labels indicators with the function name
+    cached.__name__ = getattr(func, '__name__', 'indicator')
+    return cached
+
+
+def with_indicator_cache(strategy, cache=None):
+    """Subclass of strategy whose indicators are read through cache (default: the shared disk cache)."""
+    bases = (strategy,) if issubclass(strategy, CachedStrategy) else (CachedStrategy, strategy)
+    return type(strategy.__name__, bases, {'indicator_cache': cache, '__module__': strategy.__module__})
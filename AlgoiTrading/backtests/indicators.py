@@ -0,0 +1,79 @@
+"""
+Shared indicators for the backtests.
+
+Every function takes and returns plain numpy arrays of bar values, so it can be
+handed straight to Strategy.I:
+
+    from indicators import lsma
+    self.lsma = self.I(lsma, self.data.Close, self.lsma_period)
+
+lsma (least squares moving average) is the end point of a linear regression
+fitted over each trailing window. Fitting every window with np.polyfit costs a
+Python-level call per bar; the closed form below only needs rolling sums of y
+and x*y, taken as differences of two cumulative sums, so it is O(n) whatever
+the period.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _lsma_weights(period):
+    """Weights w with lsma value = w @ window, oldest bar first."""
+    x = np.arange(period, dtype=np.float64)
+    xc = x - x.mean()
+    return 1.0 / period + xc * xc[-1] / (xc @ xc)
+
+
+def _lsma_cumsum(y, period):
+    n = len(y)
+    # The fit is shift-invariant; centering y keeps the cumulative sums small
+    shift = y.mean()
+    yc = y - shift
+    k = np.arange(n, dtype=np.float64)
+    cy = np.concatenate(([0.0], np.cumsum(yc)))
+    cky = np.concatenate(([0.0], np.cumsum(k * yc)))
+
+    start = k[:n - period + 1]                       # first bar of each window
+    sy = cy[period:] - cy[:-period]                  # sum of y over the window
+    sxy = cky[period:] - cky[:-period] - start * sy  # sum of x*y with x = 0..period-1
+
+    sx = period * (period - 1) / 2
+    sxx = (period - 1) * period * (2 * period - 1) / 6
+    slope = (period * sxy - sx * sy) / (period * sxx - sx * sx)
+    intercept = (sy - slope * sx) / period
+    return slope * (period - 1) + intercept + shift
+
+
+def _lsma_window(y, period):
+    return sliding_window_view(y, period) @ _lsma_weights(period)
+
+
+def lsma(data, period, method='auto', fill=0.0):
+    """
+    Linear regression moving average: for each bar, the value at that bar of
+    the least squares line through the last `period` closes.
+
+    method: 'cumsum' (O(n) rolling sums), 'window' (sliding_window_view times
+    the regression weights, O(n * period)) or 'auto', which uses cumsum unless
+    the data has NaN/inf values; in a cumulative sum those would spoil every
+    later bar, while the window method only loses the windows that hold them.
+    The first period - 1 bars are set to `fill` (0.0, as the per-bar polyfit
+    loop left them; np.nan lets Backtest skip the warm-up).
+    """
+    y = np.asarray(data, dtype=np.float64)
+    period = int(period)
+    if period < 2:
+        raise ValueError(f"LSMA period must be at least 2, got {period}")
+    result = np.full(len(y), fill, dtype=np.float64)
+    if len(y) < period:
+        return result
+
+    if method == 'auto':
+        method = 'cumsum' if np.isfinite(y).all() else 'window'
+    if method == 'cumsum':
+        result[period - 1:] = _lsma_cumsum(y, period)
+    elif method == 'window':
+        result[period - 1:] = _lsma_window(y, period)
+    else:
+        raise ValueError(f"Unknown LSMA method {method!r}, expected 'auto', 'cumsum' or 'window'")
+    return result
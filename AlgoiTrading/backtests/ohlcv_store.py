@@ -0,0 +1,212 @@
+"""
+Local OHLCV store: CSVs converted once into memory-mapped column files.
+
+Layout, one directory per symbol and calendar month (UTC):
+
+    $BACKTEST_CACHE_DIR/ohlcv/ETHUSD/2024-06/timestamp.npy   int64 ns since epoch
+                                            Open.npy ...    float64, one per column
+                                            Volume.npy
+
+Bars are sorted by time with one row per timestamp. Loading a date range
+memory-maps only the months it overlaps and binary-searches the timestamps,
+so a backtest over a sub-range reads just those bytes. A range inside one
+month comes back as a DataFrame over the mapped files themselves (zero copy,
+read-only); longer ranges are joined from the month slices in one copy.
+
+Usage:
+    python ohlcv_store.py ingest data.csv ETHUSD
+    python ohlcv_store.py info ETHUSD
+
+    from ohlcv_store import load, load_csv
+    data = load_csv("ETHUSD_1m.csv", "ETHUSD")          # ingests on first use or when the CSV changes
+    data = load("ETHUSD", "2024-09-01", "2024-10-01")   # [start, end)
+
+Cache location: $BACKTEST_CACHE_DIR/ohlcv, else ~/.cache/backtests/ohlcv
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from indicator_cache import cache_root
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def store_root(root=None):
+    return root or os.path.join(cache_root(), 'ohlcv')
+
+
+def _symbol_dir(symbol, root=None):
+    return os.path.join(store_root(root), re.sub(r'[^A-Za-z0-9._-]+', '-', symbol))
+
+
+def _to_ns(value):
+    """int64 ns (UTC) for a timestamp-like value; naive times are taken as UTC."""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.as_unit('ns').value
+
+
+def _months(symbol, root=None):
+    folder = _symbol_dir(symbol, root)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(m for m in os.listdir(folder) if re.fullmatch(r'\d{4}-\d{2}', m))
+
+
+def _read_partition(path, mmap=True):
+    mode = 'r' if mmap else None
+    return {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mode) for col in ['timestamp'] + OHLCV}
+
+
+def _write_partition(path, columns):
+    """Write a month's columns into a fresh directory, then swap it in for the old one."""
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    for col, values in columns.items():
+        np.save(os.path.join(tmp, f"{col}.npy"), values)
+    old = None
+    if os.path.exists(path):
+        old = path + '.old'
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(tmp, path)
+    if old:
+        shutil.rmtree(old)
+
+
+def ingest_frame(df, symbol, root=None):
+    """
+    Add bars (a DatetimeIndex and OHLCV columns) to the store. Months the
+    frame touches are merged with what is stored; where timestamps repeat,
+    the new bar wins. Returns the months written.
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    ts = index.as_unit('ns').asi8
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in OHLCV}
+
+    month = ts.astype('datetime64[ns]').astype('datetime64[M]')
+    written = []
+    for m in np.unique(month):
+        rows = month == m
+        key = str(m)
+        path = os.path.join(_symbol_dir(symbol, root), key)
+        new = {'timestamp': ts[rows], **{col: v[rows] for col, v in values.items()}}
+        if os.path.isdir(path):
+            old = _read_partition(path, mmap=False)
+            new = {col: np.concatenate([old[col], new[col]]) for col in new}
+        # Stable sort, then keep the last row per timestamp: new rows follow old ones
+        order = np.argsort(new['timestamp'], kind='stable')
+        stamps = new['timestamp'][order]
+        keep = np.append(stamps[1:] != stamps[:-1], True)
+        _write_partition(path, {col: v[order][keep] for col, v in new.items()})
+        written.append(key)
+    return written
+
+
+def read_ohlcv_csv(path, date_col='Date'):
+    data = pd.read_csv(path)
+    data.index = pd.to_datetime(data[date_col])
+    return data[OHLCV]
+
+
+def ingest_csv(path, symbol, root=None, date_col='Date'):
+    """Parse an OHLCV CSV once and store it; remembers the file so load_csv can skip it next time."""
+    written = ingest_frame(read_ohlcv_csv(path, date_col), symbol, root)
+    sources_path = os.path.join(_symbol_dir(symbol, root), 'sources.json')
+    try:
+        with open(sources_path) as f:
+            sources = json.load(f)
+    except (OSError, ValueError):
+        sources = {}
+    stat = os.stat(path)
+    sources[os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns]
+    with open(sources_path, 'w') as f:
+        json.dump(sources, f, indent=1)
+    return written
+
+
+def load(symbol, start=None, end=None, root=None):
+    """Bars in [start, end) as a DataFrame with a UTC-naive DatetimeIndex (read-only when zero-copy)."""
+    lo = _to_ns(start) if start is not None else None
+    hi = _to_ns(end) if end is not None else None
+    first = str(np.datetime64(lo, 'ns').astype('datetime64[M]')) if lo is not None else None
+    last = str(np.datetime64(hi - 1, 'ns').astype('datetime64[M]')) if hi is not None else None
+
+    pieces = []
+    for m in _months(symbol, root):
+        if (first and m < first) or (last and m > last):
+            continue
+        part = _read_partition(os.path.join(_symbol_dir(symbol, root), m))
+        ts = part['timestamp']
+        i = np.searchsorted(ts, lo, side='left') if lo is not None else 0
+        j = np.searchsorted(ts, hi, side='left') if hi is not None else len(ts)
+        if j > i:
+            pieces.append({col: v[i:j] for col, v in part.items()})
+    if not pieces:
+        raise KeyError(f"No {symbol} bars stored for {start or 'start'} .. {end or 'end'}")
+
+    columns = pieces[0] if len(pieces) == 1 else {
+        col: np.concatenate([p[col] for p in pieces]) for col in pieces[0]}
+    index = pd.DatetimeIndex(columns['timestamp'].view('datetime64[ns]'), name='Date', copy=False)
+    return pd.DataFrame({col: columns[col] for col in OHLCV}, index=index, copy=False)
+
+
+def load_csv(path, symbol=None, start=None, end=None, root=None, date_col='Date'):
+    """load() for a CSV's symbol, ingesting the CSV first if it is new or has changed since."""
+    symbol = symbol or os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(os.path.join(_symbol_dir(symbol, root), 'sources.json')) as f:
+            seen = json.load(f).get(os.path.abspath(path))
+    except (OSError, ValueError):
+        seen = None
+    stat = os.stat(path)
+    if seen != [stat.st_size, stat.st_mtime_ns]:
+        print(f"🧪 Converting {os.path.basename(path)} into the OHLCV store ({symbol})...")
+        ingest_csv(path, symbol, root, date_col)
+    return load(symbol, start, end, root)
+
+
+def info(symbol, root=None):
+    """Rows and time span per stored month."""
+    rows = []
+    for m in _months(symbol, root):
+        ts = np.load(os.path.join(_symbol_dir(symbol, root), m, 'timestamp.npy'), mmap_mode='r')
+        rows.append({'month': m, 'bars': len(ts),
+                     'first': pd.Timestamp(int(ts[0])), 'last': pd.Timestamp(int(ts[-1]))})
+    return pd.DataFrame(rows)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Memory-mapped OHLCV store for the backtests")
+    sub = p.add_subparsers(dest='command', required=True)
+    ing = sub.add_parser('ingest', help="Convert an OHLCV CSV into the store")
+    ing.add_argument('csv')
+    ing.add_argument('symbol')
+    ing.add_argument('--date-col', default='Date')
+    inf = sub.add_parser('info', help="Stored months for a symbol")
+    inf.add_argument('symbol')
+    for cmd in (ing, inf):
+        cmd.add_argument('--root', default=None, help="Store directory (default: $BACKTEST_CACHE_DIR/ohlcv)")
+    args = p.parse_args()
+
+    if args.command == 'ingest':
+        months = ingest_csv(args.csv, args.symbol, args.root, args.date_col)
+        print(f"✨ {args.symbol}: wrote {len(months)} month(s) {months[0]} .. {months[-1]}" if months
+              else f"{args.csv} has no bars")
+    else:
+        print(info(args.symbol, args.root).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
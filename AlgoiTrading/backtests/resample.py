@@ -0,0 +1,144 @@
+"""
+Multi-timeframe OHLCV bars built from the base (1-minute) store.
+
+Each month of base bars is bucketed by timeframe (bucket = timestamp // step)
+and reduced per bucket with numpy segment reductions: open = first, high =
+np.maximum.reduceat, low = np.minimum.reduceat, close = last, volume =
+np.add.reduceat. The timeframes are built in one pass from finest to
+coarsest, each from the previous one when its step divides evenly (1h from
+15m, 4h from 1h ...), so the base bars are only reduced once. Bars are
+labelled with their bucket's start time, like DataFrame.resample(..., label='left').
+
+Results are kept in the OHLCV store per timeframe and month, with the base
+month's file fingerprint; a month is rebuilt only when its base bars change
+(e.g. after re-ingesting a CSV or a candle cache fill), so strategies can
+switch timeframes without re-parsing or re-downloading anything.
+
+Timeframes must divide a day, so months split into whole buckets (1w and
+calendar months are not supported).
+
+Usage:
+    python resample.py ETHUSD                       # build 5m 15m 1h 4h 1d
+    python resample.py ETHUSD --timeframes 15m 4h
+
+    from resample import load_timeframe
+    bars = load_timeframe("ETHUSD", "4h", "2024-09-01", "2024-12-01")
+    bars = load_timeframe("phemex-ETH/USDT-1m", "1h")   # candle cache entries work too
+
+Cache location: $BACKTEST_CACHE_DIR/ohlcv/_resampled/<timeframe>/<symbol>
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from candle_cache import timeframe_ms
+from ohlcv_store import _months, _read_partition, _symbol_dir, _write_partition, load, store_root
+
+TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d')
+DAY_MS = 86_400_000
+
+
+def resample_arrays(columns, timeframes=TIMEFRAMES):
+    """
+    {timeframe: columns} for time-sorted base columns ('timestamp' in ns plus
+    OHLCV), coarser timeframes reduced from the finest one they divide.
+    """
+    steps = {tf: timeframe_ms(tf) * 1_000_000 for tf in timeframes}
+    out, built = {}, []  # built: (step, columns) from fine to coarse
+    for tf in sorted(timeframes, key=steps.get):
+        step = steps[tf]
+        source = next((cols for s, cols in reversed(built) if step % s == 0), columns)
+        ts = source['timestamp']
+        if len(ts):
+            bucket = ts // step
+            starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            ends = np.r_[starts[1:], len(ts)] - 1
+            cols = {
+                'timestamp': bucket[starts] * step,
+                'Open': source['Open'][starts],
+                'High': np.maximum.reduceat(source['High'], starts),
+                'Low': np.minimum.reduceat(source['Low'], starts),
+                'Close': source['Close'][ends],
+                'Volume': np.add.reduceat(source['Volume'], starts),
+            }
+        else:
+            cols = {col: values[:0] for col, values in source.items()}
+        out[tf] = cols
+        built.append((step, cols))
+    return out
+
+
+def _resampled_root(timeframe, root=None):
+    return os.path.join(store_root(root), '_resampled', timeframe)
+
+
+def _fingerprint(path):
+    stat = os.stat(os.path.join(path, 'timestamp.npy'))
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build(symbol, timeframes=TIMEFRAMES, root=None):
+    """Bring the stored timeframes of symbol up to date with its base bars; returns {timeframe: months rebuilt}."""
+    for tf in timeframes:
+        if DAY_MS % timeframe_ms(tf):
+            raise ValueError(f"Timeframe {tf!r} doesn't divide a day; months wouldn't split into whole bars")
+    manifests = {}
+    for tf in timeframes:
+        try:
+            with open(os.path.join(_symbol_dir(symbol, _resampled_root(tf, root)), 'resampled.json')) as f:
+                manifests[tf] = json.load(f)
+        except (OSError, ValueError):
+            manifests[tf] = {}
+
+    base_months = _months(symbol, root)
+    rebuilt = {tf: [] for tf in timeframes}
+    for month in base_months:
+        base_path = os.path.join(_symbol_dir(symbol, root), month)
+        fingerprint = _fingerprint(base_path)
+        stale = [tf for tf in timeframes if manifests[tf].get(month) != fingerprint]
+        if not stale:
+            continue
+        for tf, cols in resample_arrays(_read_partition(base_path), stale).items():
+            _write_partition(os.path.join(_symbol_dir(symbol, _resampled_root(tf, root)), month), cols)
+            manifests[tf][month] = fingerprint
+            rebuilt[tf].append(month)
+
+    for tf in timeframes:
+        folder = _symbol_dir(symbol, _resampled_root(tf, root))
+        # Months no longer in the base store are dropped here too
+        for month in set(_months(symbol, _resampled_root(tf, root))) - set(base_months):
+            shutil.rmtree(os.path.join(folder, month))
+        manifests[tf] = {m: fp for m, fp in manifests[tf].items() if m in base_months}
+        if rebuilt[tf] or os.path.isdir(folder):
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, 'resampled.json'), 'w') as f:
+                json.dump(manifests[tf], f, indent=1)
+    return rebuilt
+
+
+def load_timeframe(symbol, timeframe, start=None, end=None, root=None):
+    """Bars of `timeframe` in [start, end), resampled from symbol's base bars (built or refreshed as needed)."""
+    build(symbol, (timeframe,), root)
+    return load(symbol, start, end, _resampled_root(timeframe, root))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Build multi-timeframe bars from the base OHLCV store")
+    p.add_argument('symbol')
+    p.add_argument('--timeframes', nargs='+', default=list(TIMEFRAMES))
+    p.add_argument('--root', default=None, help="Store directory (default: $BACKTEST_CACHE_DIR/ohlcv)")
+    args = p.parse_args()
+
+    start = time.perf_counter()
+    rebuilt = build(args.symbol, args.timeframes, args.root)
+    print(f"✨ {args.symbol}: {time.perf_counter() - start:.2f}s")
+    for tf, months in rebuilt.items():
+        print(f"  {tf:>4}: {len(months)} month(s) rebuilt" if months else f"  {tf:>4}: up to date")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Parallel parameter sweeps for the backtest strategies.
+
+Runs a strategy once per parameter combination, over a full grid or a random
+sample of it, in a pool of worker processes, and streams every run's stats to a
+Parquet leaderboard as results come in.
+
+- The OHLCV frame is loaded once by the parent and copied into shared memory;
+  each worker attaches to it when it starts, so tasks only carry parameters.
+- Indicators go through the shared on-disk cache (indicator_cache.py), so
+  runs that share e.g. lsma_period compute that LSMA once across all
+  workers, and later sweeps over the same data start from the cache.
+
+Usage:
+    python sweep.py guppy data.csv
+    python sweep.py guppy data.csv --grid lsma_period=21,34,55,89 rsi_period=7:22:7 --workers 4
+    python sweep.py stochrsi data.csv --random 40 --seed 1 --out stochrsi.parquet --sort "Return [%]"
+    python sweep.py my_module:MyStrategy data.csv --grid n=10,20,30
+    python sweep.py guppy data.csv --start 2024-09-01 --end 2024-10-01
+    python sweep.py guppy data.csv --timeframe 15m
+
+data.csv has Date,Open,High,Low,Close,Volume columns, as in W_rsi_guppy_og.py;
+it is read through the OHLCV store (ohlcv_store.py), so it is only parsed on
+the first sweep, and --start/--end pick a date range from it. --timeframe
+runs on bars resampled from it (resample.py), built once per timeframe.
+Without --grid a strategy's default grid (STRATEGIES) is swept.
+
+Dependencies:
+    pip install backtesting pyarrow
+"""
+import argparse
+import importlib
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from backtesting import Backtest
+
+from indicator_cache import IndicatorCache, with_indicator_cache
+from ohlcv_store import OHLCV, load_csv
+from resample import load_timeframe
+
+# alias: (module, strategy class, Backtest kwargs, default grid)
+STRATEGIES = {
+    'guppy': ('W_rsi_guppy_og', 'LSMAGuppyRSI',
+              {'cash': 100000, 'commission': 0.002, 'exclusive_orders': True},
+              {'lsma_period': [21, 34, 55, 89], 'rsi_period': [7, 14, 21],
+               'risk_multiplier': [1.5, 2, 3], 'min_reward_ratio': [1.0, 1.5, 2.0]}),
+    'stochrsi': ('w16_stochrsi_bt', 'Strat',
+                 {'cash': 1000, 'commission': 0.002},
+                 {'rsi_window': [7, 14, 21], 'bbands_length': [10, 20, 30], 'bbands_std': [1.5, 2, 2.5]}),
+}
+
+# Stats kept per run, all float64 in the leaderboard (missing stats are null)
+METRICS = ['Return [%]', 'Return (Ann.) [%]', 'Buy & Hold Return [%]', 'Sharpe Ratio', 'Sortino Ratio',
+           'Calmar Ratio', 'Max. Drawdown [%]', '# Trades', 'Win Rate [%]', 'Profit Factor',
+           'Expectancy [%]', 'Exposure Time [%]', 'Equity Final [$]']
+
+
+def resolve_strategy(name):
+    """(strategy class, Backtest kwargs, default grid) for an alias or 'module:Class'."""
+    if name in STRATEGIES:
+        module, cls, bt_kwargs, grid = STRATEGIES[name]
+    else:
+        module, _, cls = name.partition(':')
+        if not cls:
+            raise ValueError(f"Unknown strategy {name!r}; use one of {sorted(STRATEGIES)} or module:Class")
+        bt_kwargs, grid = {}, {}
+    return getattr(importlib.import_module(module), cls), bt_kwargs, grid
+
+
+# ---------------------------------------------------------------- parameter space
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(specs):
+    """['n=10,20,30', 'k=5:20:5'] -> {'n': [10, 20, 30], 'k': [5, 10, 15]} (start:stop:step excludes stop)."""
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition('=')
+        if not sep or not values:
+            raise ValueError(f"Expected name=v1,v2,... or name=start:stop:step, got {spec!r}")
+        if ':' in values:
+            start, stop, step = (_parse_value(v) for v in values.split(':'))
+            grid[name] = np.arange(start, stop, step).tolist()
+        else:
+            grid[name] = [_parse_value(v) for v in values.split(',')]
+    return grid
+
+
+def grid_points(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def random_points(grid, n, seed=None):
+    """n distinct combinations drawn uniformly from the grid, without building it."""
+    names, sizes = list(grid), [len(v) for v in grid.values()]
+    total = int(np.prod(sizes))
+    picks = np.random.default_rng(seed).choice(total, size=min(n, total), replace=False)
+    return [{name: grid[name][i] for name, i in zip(names, idx)}
+            for idx in zip(*np.unravel_index(picks, sizes))]
+
+
+# ------------------------------------------------------------------ shared data
+
+def share_frame(df, name=None):
+    """Copy an OHLCV frame into one shared memory block; returns (block, spec for attach_frame)."""
+    n = len(df)
+    index = df.index.as_unit('ns') if isinstance(df.index, pd.DatetimeIndex) else pd.to_datetime(df.index)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(8 * n * (1 + len(OHLCV)), 1))
+    block = np.ndarray((1 + len(OHLCV), n), dtype=np.float64, buffer=shm.buf)
+    block[0].view(np.int64)[:] = index.asi8
+    block[1:] = df[OHLCV].to_numpy(dtype=np.float64).T
+    return shm, {'name': shm.name, 'rows': n, 'tz': str(index.tz) if index.tz else None}
+
+
+def attach_frame(spec):
+    """(shared block, DataFrame over it) in a worker."""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    block = np.ndarray((1 + len(OHLCV), spec['rows']), dtype=np.float64, buffer=shm.buf)
+    index = pd.DatetimeIndex(block[0].view('datetime64[ns]'))
+    if spec['tz']:
+        index = index.tz_localize('UTC').tz_convert(spec['tz'])
+    return shm, pd.DataFrame(block[1:].T, index=index, columns=OHLCV, copy=False)
+
+
+# ------------------------------------------------------------------- workers
+
+_worker = {}
+
+
+def _init_worker(spec, strategy, bt_kwargs, cache_dir=None):
+    shm, data = attach_frame(spec)
+    cls, _, _ = resolve_strategy(strategy)
+    cache = IndicatorCache(cache_dir)
+    _worker.update(shm=shm, cache=cache, bt=Backtest(data, with_indicator_cache(cls, cache), **bt_kwargs))
+
+
+def _run(params):
+    start = time.perf_counter()
+    stats = _worker['bt'].run(**params)
+    row = dict(params)
+    for metric in METRICS:
+        value = stats.get(metric, np.nan)
+        row[metric] = float(value) if pd.notna(value) else None
+    row['seconds'] = time.perf_counter() - start
+    return row
+
+
+def leaderboard_schema(points):
+    """
+    Parquet schema of the leaderboard rows for these parameter points: each
+    parameter typed from all its values, then METRICS and seconds as float64.
+    Fixed up front, as a batch whose stats are all None would infer null columns.
+    """
+    names = list(dict.fromkeys(name for p in points for name in p))
+    fields = [(name, pa.array([p.get(name) for p in points]).type) for name in names]
+    return pa.schema(fields + [(metric, pa.float64()) for metric in METRICS + ['seconds']])
+
+
+class Leaderboard:
+    """Appends result rows to a Parquet file in batches of `batch` rows."""
+
+    def __init__(self, path, schema, batch=64):
+        self.path, self.schema, self.batch = path, schema, batch
+        self.rows, self.writer, self.count = [], None, 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        table = pa.Table.from_pylist(self.rows, schema=self.schema)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table)
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def sweep(strategy, data, points, out='leaderboard.parquet', workers=None, bt_kwargs=None, cache_dir=None):
+    """
+    Run `strategy` (alias or module:Class) on `data` for every parameter dict
+    in `points`, writing one leaderboard row per run to `out`. Returns the
+    leaderboard as a DataFrame.
+    """
+    cls, default_kwargs, _ = resolve_strategy(strategy)
+    bt_kwargs = {**default_kwargs, **(bt_kwargs or {})}
+    workers = min(len(points), workers or os.cpu_count() or 1)
+    board = Leaderboard(out, leaderboard_schema(points))
+    shm, spec = share_frame(data)
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(spec, strategy, bt_kwargs, cache_dir)) as pool:
+                for i, future in enumerate(as_completed([pool.submit(_run, p) for p in points]), 1):
+                    board.add(future.result())
+                    print(f"\r{i}/{len(points)} runs", end='', flush=True)
+        else:
+            _init_worker(spec, strategy, bt_kwargs, cache_dir)
+            for i, params in enumerate(points, 1):
+                board.add(_run(params))
+                print(f"\r{i}/{len(points)} runs", end='', flush=True)
+        print()
+    finally:
+        board.close()
+        _worker.clear()
+        shm.close()
+        shm.unlink()
+    return pq.read_table(out).to_pandas() if board.count else pd.DataFrame()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Parallel parameter sweep for the backtest strategies")
+    p.add_argument('strategy', help=f"{' | '.join(STRATEGIES)} | module:Class")
+    p.add_argument('data', help="OHLCV CSV with Date,Open,High,Low,Close,Volume columns")
+    p.add_argument('--start', default=None, help="First bar's date (default: all data)")
+    p.add_argument('--end', default=None, help="Sweep bars before this date (default: all data)")
+    p.add_argument('--timeframe', default=None, help="Resample the data to 5m, 15m, 1h, 4h or 1d first")
+    p.add_argument('--grid', nargs='+', default=[], metavar='NAME=VALUES',
+                   help="Parameter values, v1,v2,... or start:stop:step (default: the strategy's grid)")
+    p.add_argument('--random', type=int, default=None, metavar='N', help="Run N random grid points instead of all")
+    p.add_argument('--seed', type=int, default=None)
+    p.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument('--out', default='leaderboard.parquet')
+    p.add_argument('--cache-dir', default=None, help="Indicator cache (default: $BACKTEST_CACHE_DIR/indicators)")
+    p.add_argument('--sort', default='Sharpe Ratio', help="Leaderboard column to rank by (default: Sharpe Ratio)")
+    p.add_argument('--top', type=int, default=10)
+    args = p.parse_args()
+
+    _, _, default_grid = resolve_strategy(args.strategy)
+    grid = parse_grid(args.grid) if args.grid else default_grid
+    if not grid:
+        p.error("No parameter grid; pass --grid")
+    points = random_points(grid, args.random, args.seed) if args.random else grid_points(grid)
+
+    print(f"🧪 Sweeping {args.strategy}: {len(points)} runs over {', '.join(grid)}")
+    start = time.perf_counter()
+    symbol = os.path.splitext(os.path.basename(args.data))[0]
+    data = load_csv(args.data, symbol, args.start, args.end)
+    if args.timeframe:
+        data = load_timeframe(symbol, args.timeframe, args.start, args.end)
+    board = sweep(args.strategy, data, points, args.out, args.workers, cache_dir=args.cache_dir)
+    print(f"✨ {len(board)} runs in {time.perf_counter() - start:.1f}s -> {args.out}")
+    if len(board):
+        print(board.sort_values(args.sort, ascending=False).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backtests are scripts run from their own folder, not an installed package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
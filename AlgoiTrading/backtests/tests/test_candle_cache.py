@@ -0,0 +1,77 @@
+import numpy as np
+
+from candle_cache import CandleCache, FakeExchange
+
+STEP = 60_000
+LISTED = 1_700_000_040_000  # a minute boundary
+NOW = LISTED + 3000 * STEP + 30_000  # half way through a candle
+
+
+def _stamps(frame):
+    return frame.index.asi8 // 1_000_000
+
+
+def _expected(exchange, start, end):
+    """Every candle the fake has in [start, end), one request at a time."""
+    bars, since = [], start
+    while since < end:
+        batch = [b for b in exchange.fetch_ohlcv('ETH/USDT', '1m', since, 1000) if b[0] < end]
+        if not batch:
+            break
+        bars += batch
+        since = batch[-1][0] + STEP
+    return np.array(bars)
+
+
+def test_paginates_past_the_exchange_limit(tmp_path):
+    exchange = FakeExchange(listed=LISTED, now=NOW, max_limit=500)
+    cache = CandleCache(exchange, root=tmp_path, page_limit=1000)
+    data = cache.fetch('ETH/USDT', '1m', since=LISTED + 1000 * STEP)
+
+    assert len(data) == 2000
+    assert np.all(np.diff(_stamps(data)) == STEP)
+    assert _stamps(data)[-1] == NOW // STEP * STEP - STEP  # the forming candle is left out
+    assert cache.stats == {'requests': 4, 'bars_fetched': 2000}
+    assert all(limit == 1000 for _, _, _, limit in exchange.calls)
+
+    expected = _expected(FakeExchange(listed=LISTED, now=NOW, max_limit=500), LISTED + 1000 * STEP, NOW // STEP * STEP)
+    np.testing.assert_allclose(data.to_numpy(), expected[:, 1:])
+
+
+def test_later_request_fetches_only_new_bars(tmp_path):
+    exchange = FakeExchange(listed=LISTED, now=NOW, max_limit=500)
+    cache = CandleCache(exchange, root=tmp_path)
+    first = cache.last('ETH/USDT', '1m', 300)
+
+    exchange.now += 5 * STEP
+    exchange.calls.clear()
+    second = cache.last('ETH/USDT', '1m', 300)
+
+    assert len(exchange.calls) == 1
+    assert exchange.calls[0][2] == _stamps(first)[-1] + STEP
+    assert cache.stats['bars_fetched'] == 305
+    assert len(second) == 300 and _stamps(second)[-1] == _stamps(first)[-1] + 5 * STEP
+    np.testing.assert_allclose(second.iloc[:295].to_numpy(), first.iloc[5:].to_numpy())
+
+    exchange.calls.clear()
+    cache.last('ETH/USDT', '1m', 300)
+    assert exchange.calls == []
+
+
+def test_outages_are_recorded_and_not_requested_again(tmp_path):
+    outage = (LISTED + 200 * STEP, LISTED + 260 * STEP)
+    exchange = FakeExchange(listed=LISTED, now=NOW, max_limit=100, gaps=[outage])
+    cache = CandleCache(exchange, root=tmp_path)
+    start, end = LISTED - 50 * STEP, LISTED + 400 * STEP  # starts before the listing too
+    data = cache.fetch('ETH/USDT', '1m', since=start, until=end)
+
+    stamps = _stamps(data)
+    assert stamps[0] == LISTED and stamps[-1] == end - STEP
+    assert not ((stamps >= outage[0]) & (stamps < outage[1])).any()
+    assert len(data) == 400 - 60
+    assert cache.coverage('ETH/USDT', '1m') == [[start, end]]
+
+    exchange.calls.clear()
+    again = cache.fetch('ETH/USDT', '1m', since=start, until=end)
+    assert exchange.calls == []
+    assert again.equals(data)
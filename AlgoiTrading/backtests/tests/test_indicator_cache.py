@@ -0,0 +1,69 @@
+import sys
+import types
+
+import numpy as np
+
+import indicator_cache
+import indicators
+from indicator_cache import IndicatorCache, indicator_id, indicator_version
+
+
+def _module(tmp_path, name, source):
+    path = tmp_path / f'{name}.py'
+    path.write_text(source)
+    module = types.ModuleType(name)
+    module.__file__ = str(path)
+    exec(compile(source, str(path), 'exec'), module.__dict__)
+    sys.modules[name] = module
+    return module
+
+
+HELPER = '''
+import numpy as np
+
+def _helper(y):
+    return y * {factor}
+
+def scaled(y):
+    return _helper(np.asarray(y, dtype=float))
+'''
+
+
+def test_editing_a_helper_changes_the_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_cache, '_source_digest', indicator_cache._source_digest.__wrapped__)
+    old = _module(tmp_path, 'ind_helper_old', HELPER.format(factor=2))
+    before = indicator_version(old.scaled)
+    (tmp_path / 'ind_helper_old.py').write_text(HELPER.format(factor=3))
+    assert indicator_version(old.scaled) != before
+
+
+def test_stale_entries_are_not_served_after_a_helper_fix(tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_cache, '_source_digest', indicator_cache._source_digest.__wrapped__)
+    cache = IndicatorCache(str(tmp_path / 'cache'))
+    y = np.arange(5.0)
+    module = _module(tmp_path, 'ind_helper_fix', HELPER.format(factor=2))
+    assert cache(module.scaled, y).tolist() == (y * 2).tolist()
+    module = _module(tmp_path, 'ind_helper_fix', HELPER.format(factor=3))
+    assert cache(module.scaled, y).tolist() == (y * 3).tolist()
+    assert cache.stats == {'hits': 0, 'misses': 2, 'uncached': 0}
+    assert cache(module.scaled, y).tolist() == (y * 3).tolist()
+    assert cache.stats['hits'] == 1
+
+
+def test_explicit_version_wins():
+    def ind(y):
+        return y
+    ind.indicator_version = 7
+    assert indicator_version(ind) == '7'
+
+
+def test_compiled_functions_use_the_library_version():
+    # np.add is compiled; a Cython function exposing __code__ takes the same path
+    assert indicator_version(np.add) == np.__version__
+    compiled = types.SimpleNamespace(__qualname__='rsi', __module__='numpy.fake', __code__=indicators.lsma.__code__)
+    assert indicator_id(compiled) == ('numpy.fake.rsi', np.__version__)
+
+
+def test_python_indicators_are_versioned_by_their_module():
+    version = indicator_version(indicators.lsma)
+    assert version.endswith(indicator_cache._source_digest(indicators.__file__))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from indicators import lsma
+
+
+def polyfit_lsma(data, period):
+    """The per-bar np.polyfit loop lsma replaced (W_rsi_guppy_og's calculate_lsma)."""
+    result = np.zeros_like(data)
+    for i in range(period - 1, len(data)):
+        x = np.arange(period)
+        y = data[i - period + 1:i + 1]
+        slope, intercept = np.polyfit(x, y, 1)
+        result[i] = slope * (period - 1) + intercept
+    return result
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(0)
+    return 2000 + np.cumsum(rng.normal(0, 5, 3000))
+
+
+@pytest.mark.parametrize('method', ['cumsum', 'window', 'auto'])
+@pytest.mark.parametrize('period', [2, 21, 55, 200])
+def test_matches_polyfit(closes, method, period):
+    np.testing.assert_allclose(lsma(closes, period, method), polyfit_lsma(closes, period), rtol=0, atol=1e-6)
+
+
+def test_nan_only_spoils_the_windows_holding_it(closes):
+    data = closes.copy()
+    data[[100, 1500]] = np.nan
+    got = lsma(data, 21)  # auto picks the window method
+    spoiled = np.zeros(len(data), dtype=bool)
+    for i in (100, 1500):
+        spoiled[i:i + 21] = True
+    assert np.isnan(got[spoiled]).all()
+    clean = ~spoiled & (np.arange(len(data)) >= 20)
+    expected = np.array([polyfit_lsma(data[i - 20:i + 1], 21)[-1] for i in np.flatnonzero(clean)])
+    np.testing.assert_allclose(got[clean], expected, rtol=0, atol=1e-6)
+    assert (got[:20] == 0).all()
+
+
+@pytest.mark.parametrize('method', ['cumsum', 'window'])
+def test_shorter_than_period(method):
+    data = np.array([1.0, 2.0, 3.0])
+    assert lsma(data, 5, method).tolist() == [0.0, 0.0, 0.0]
+    assert np.isnan(lsma(data, 5, method, fill=np.nan)).all()
+    assert lsma(data, 3, method)[-1] == pytest.approx(polyfit_lsma(data, 3)[-1])
+
+
+def test_rejects_bad_arguments(closes):
+    with pytest.raises(ValueError):
+        lsma(closes, 1)
+    with pytest.raises(ValueError):
+        lsma(closes, 10, 'polyfit')
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from backtesting import Strategy
+
+from sweep import METRICS, Leaderboard, grid_points, leaderboard_schema, sweep
+
+
+class Idle(Strategy):
+    """Never trades, so ratio stats such as Sharpe Ratio come back missing."""
+    n = 1
+
+    def init(self):
+        pass
+
+    def next(self):
+        pass
+
+
+def _row(params, value):
+    return {**params, **{metric: value for metric in METRICS}, 'seconds': 0.1}
+
+
+def test_leaderboard_accepts_values_after_an_all_null_batch(tmp_path):
+    points = grid_points({'n': [10, 20, 30], 'mode': ['fast', 'slow'], 'k': [1.5, 2]})
+    board = Leaderboard(tmp_path / 'board.parquet', leaderboard_schema(points), batch=2)
+    for i, params in enumerate(points):
+        board.add(_row(params, None if i < 2 else float(i)))
+    board.close()
+
+    table = pq.read_table(tmp_path / 'board.parquet')
+    assert table.num_rows == len(points)
+    assert str(table.schema.field('n').type) == 'int64' and str(table.schema.field('k').type) == 'double'
+    assert all(str(table.schema.field(m).type) == 'double' for m in METRICS + ['seconds'])
+    assert table.column('Sharpe Ratio').null_count == 2
+
+
+def test_sweep_with_no_trades(tmp_path, monkeypatch):
+    monkeypatch.setenv('BACKTEST_CACHE_DIR', str(tmp_path / 'cache'))
+    index = pd.date_range('2024-01-01', periods=200, freq='h')
+    close = 100 + np.sin(np.arange(200) / 5)
+    data = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1.0},
+                        index=index)
+    board = sweep('test_sweep:Idle', data, grid_points({'n': [1, 2, 3]}), out=tmp_path / 'board.parquet',
+                  workers=1)
+    assert list(board['n']) == [1, 2, 3]
+    assert board['# Trades'].eq(0).all()
@@ -2,22 +2,22 @@
 
 
 
-import pandas as pd
 import backtesting as bt
-from backtesting import Backtest, Strategy
+from backtesting import Backtest
 from ta.momentum import StochRSIIndicator
-import dshare as d
 import ccxt
+from candle_cache import CandleCache
 
 import pandas_ta as ta
 import warnings
 from backtesting.lib import crossover
+from indicator_cache import CachedStrategy, multi_output
 #fiilter all warnings
 warnings.filterwarnings('ignore')
 
 factor = 1000
 
-class Strat(Strategy):
+class Strat(CachedStrategy):
     rsi_window = 14
     stochrsi_smooth1 = 3
     stochrsi_smooth2 = 3
@@ -26,9 +26,11 @@ class Strat(Strategy):
     bbands_std = 2
 
     def init(self):
-        self.bbands = self.I(bands, self.data)
-        self.stoch_rsi_k = self.I(stoch_rsi_k, self.data)
-        self.stoch_rsi_d = self.I(stoch_rsi_d, self.data)
+        self.bbands = self.I(bands, self.data, self.bbands_length, self.bbands_std)
+        self.stoch_rsi_k = self.I(stoch_rsi_k, self.data, self.stochrsi_length, self.rsi_window,
+                                  self.stochrsi_smooth1, self.stochrsi_smooth2)
+        self.stoch_rsi_d = self.I(stoch_rsi_d, self.data, self.stochrsi_length, self.rsi_window,
+                                  self.stochrsi_smooth1, self.stochrsi_smooth2)
         self.buy_price = 0
 
     def next(self):
@@ -50,47 +52,45 @@ class Strat(Strategy):
             #get data from discord
 
 
-def fetch_data(symbol, timeframe, limit=2000):
-    exchange = ccxt.phemex({
-        'apiKey': d.phemex_key,
-        'enableRateLimit': True,
-    })
-
-    since = exchange.milliseconds() - (limit *60*60*1000)
-    ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
-    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close','volume'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit = 'ms')
-    df.set_index('timestamp', inplace=True)
-    #upper case column names
-    #df.columns = [x.upper() for x in df.columns]
-    df.columns =['Open','High','Low','Close','Volume']
-    return df
-
-def bands(data):
-    bbands = ta.bbands(close=data.Close.s, length=20, std=2)
+def fetch_data(symbol, timeframe, limit=2000, exchange=None):
+    #candles are cached locally per exchange/symbol/timeframe; only missing ones are fetched
+    if exchange is None:
+        import dshare as d  # API keys; only needed to fetch, so the strategy imports without them
+        exchange = ccxt.phemex({
+            'apiKey': d.phemex_key,
+            'enableRateLimit': True,
+        })
+    return CandleCache(exchange).last(symbol, timeframe, limit)
+
+def bands(data, length=20, std=2):
+    bbands = ta.bbands(close=data.Close.s, length=length, std=std)
     return bbands.to_numpy().T
                 
-def stoch_rsi_k(data):
-    stochrsi = ta.stochrsi(close=data.Close.s, k=3, d=3)
-    return stochrsi['STOCHRSIk_14_14_3_3'].to_numpy()
-    
-def stoch_rsi_d(data):
-    stochrsi = ta.stochrsi(close=data.Close.s, k=3, d=3)
-    return stochrsi['STOCHRSId_14_14_3_3'].to_numpy()
-                
-data_df = fetch_data('ETH/USDT', '1h')  # Corrected the symbol format
-if not data_df.empty:
-    data_df.Open /= factor
-    data_df.High /= factor
-    data_df.Low /= factor
-    data_df.Close /= factor
-    data_df.Volume *= factor
-
-    print(data_df.tail())
+#k and d come from one ta.stochrsi call; the indicator cache stores both
+@multi_output('k', 'd')
+def stoch_rsi(data, length=14, rsi_length=14, k=3, d=3):
+    stochrsi = ta.stochrsi(close=data.Close.s, length=length, rsi_length=rsi_length, k=k, d=d)
+    return (stochrsi[f'STOCHRSIk_{length}_{rsi_length}_{k}_{d}'].to_numpy(),
+            stochrsi[f'STOCHRSId_{length}_{rsi_length}_{k}_{d}'].to_numpy())
+
+stoch_rsi_k = stoch_rsi.output('k')
+stoch_rsi_d = stoch_rsi.output('d')
+
+
+if __name__ == "__main__":
+    data_df = fetch_data('ETH/USDT', '1h')  # Corrected the symbol format
+    if not data_df.empty:
+        data_df.Open /= factor
+        data_df.High /= factor
+        data_df.Low /= factor
+        data_df.Close /= factor
+        data_df.Volume *= factor
+
+        print(data_df.tail())
     
-    bt = Backtest(data_df, Strat, cash=1000, commission=0.002)
-    stats = bt.run()
-    bt.plot()
-    print(stats)
-else:
-    print("The fetched DataFrame is empty, cannot proceed with backtesting.")
\ No newline at end of file
+        bt = Backtest(data_df, Strat, cash=1000, commission=0.002)
+        stats = bt.run()
+        bt.plot()
+        print(stats)
+    else:
+        print("The fetched DataFrame is empty, cannot proceed with backtesting.")
\ No newline at end of file
@@ -4,15 +4,49 @@ Paste this entire script into the GPT's Code Interpreter or save as analyze_gpt_
 """
 
 import pandas as pd
+import numpy as np
+import functools
+import hashlib
+import html
 import json
+import os
+import sys
 from datetime import datetime
 from collections import defaultdict
 import re
+import string
+import tempfile
+
+try:
+    import ahocorasick  # optional: pip install pyahocorasick (faster batch categorization)
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Columnar workbook cache and exclusion rules shared with the ../wb report
+    # tools; not available when this script is pasted into Code Interpreter on its own
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'wb'))
+    from gptdata_cache import read_gptdata
+    from gpt_exclusions import load_rules
+    from gpt_hll import HyperLogLog, read_user_events, sketch_groups, user_column
+except (NameError, ImportError):
+    read_gptdata = None
+    load_rules = None
+    HyperLogLog = read_user_events = sketch_groups = None
+
+    def user_column(df: pd.DataFrame) -> str:
+        # Standalone copy of gpt_hll.user_column (same columns, same order); keep the two in sync
+        for col in ['user_email', 'user_id', 'email', 'user']:
+            if col in df.columns:
+                return col
+        raise ValueError("Per-user events need one of these columns: user_email, user_id, email, user")
 
 # ============================================================================
 # CONFIGURATION - Modify these rules as needed
 # ============================================================================
 
+# Mirrored by the "analyzer" profile in ../wb/exclusion_rules.json, which is used
+# instead when available; keep the two in sync
 EXCLUSION_PATTERNS = [
     'smart pack', 'smartpack', 'smart-pack',
     'candidate letter generator', 
@@ -205,27 +239,245 @@ def fallback_categorization(name: str, description: str) -> str:
     return 'Other / Uncategorized'
 
 
+# ============================================================================
+# BATCH CATEGORIZATION ENGINE
+# ============================================================================
+
+UNCATEGORIZED = 'Other / Uncategorized'
+
+# Same order and rules as fallback_categorization:
+# (any of these in the name, required in the description or None, category)
+FALLBACK_RULES = [
+    (['email'], None, 'Writing & Communications'),
+    (['notes', 'transcript'], None, 'Meeting Notes & Summarization'),
+    (['research', 'digger', 'finder'], None, 'Research & Intelligence'),
+    (['assessment', 'appraisal'], None, 'Assessment & Reporting'),
+    (['coach'], 'leadership', 'Leadership & Talent Advisory'),
+    (['test', 'training'], None, 'Testing & Training'),
+    (['automat', 'process'], None, 'Productivity & Automation'),
+]
+
+
+def _trie_regex(keywords: list) -> str:
+    """
+    Build a regex alternation from a character trie of the keywords. Greedy optional
+    branches make it match the longest keyword at a position, and each position only
+    branches on distinct next characters instead of trying every keyword.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def _to_regex(node: dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + _to_regex(child) for char, child in node.items() if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return body + '?' if len(branches) == 1 and len(branches[0]) == 1 else '(?:' + body + ')?'
+        return body
+
+    return _to_regex(trie)
+
+
+def compile_category_matcher(definitions: dict = None) -> dict:
+    """
+    Compile category definitions once into a combined keyword regex plus a
+    keyword x category weight matrix, so scores for a whole column come from
+    one regex scan per distinct text and a single matrix product.
+    """
+    definitions = CATEGORY_DEFINITIONS if definitions is None else definitions
+    categories = [c for c in definitions if c != UNCATEGORIZED]
+    keywords = list(dict.fromkeys(kw for c in categories for kw in definitions[c]['keywords']))
+    keyword_index = {kw: i for i, kw in enumerate(keywords)}
+
+    # Repeated keywords inside one category score once per repetition, like the per-row loop
+    weights = np.zeros((len(keywords), len(categories)), dtype=np.int64)
+    for j, category in enumerate(categories):
+        for keyword in definitions[category]['keywords']:
+            weights[keyword_index[keyword], j] += 1
+
+    # A zero-width lookahead tried at every position reports the longest keyword starting
+    # there. Every other keyword starting at that position is a substring of it, so expanding
+    # each hit to the keywords it contains recovers all matches, overlapping ones included.
+    pattern = re.compile('(?=(' + _trie_regex(keywords) + '))') if keywords else None
+    contains = {kw: [keyword_index[other] for other in keywords if other in kw] for kw in keywords}
+
+    automaton = None
+    if ahocorasick is not None and keywords:
+        automaton = ahocorasick.Automaton()
+        for i, keyword in enumerate(keywords):
+            automaton.add_word(keyword, i)
+        automaton.make_automaton()
+
+    return {
+        'categories': categories,
+        'keywords': keywords,
+        'weights': weights,
+        'pattern': pattern,
+        'contains': contains,
+        'automaton': automaton,
+    }
+
+
+def _lower_text(values) -> pd.Series:
+    """Lowercase a column, treating missing values as empty text."""
+    series = pd.Series(values, dtype=object).reset_index(drop=True)
+    return series.where(series.notna(), '').astype(str).str.lower()
+
+
+def _keyword_scores(texts: pd.Series, matcher: dict) -> np.ndarray:
+    """Unweighted (rows x categories) keyword scores, scanning each distinct text once."""
+    codes, uniques = pd.factorize(texts)
+    hits = np.zeros((len(uniques), len(matcher['keywords'])), dtype=np.int64)
+    if matcher['pattern'] is None:
+        return (hits @ matcher['weights'])[codes]
+    rows, cols = [], []
+    if matcher.get('automaton') is not None:
+        # Aho-Corasick reports every (possibly overlapping) keyword occurrence directly
+        automaton = matcher['automaton']
+        for i, text in enumerate(uniques.tolist()):
+            for _, k in automaton.iter(text):
+                rows.append(i)
+                cols.append(k)
+    else:
+        findall = matcher['pattern'].findall
+        contains = matcher['contains']
+        for i, text in enumerate(uniques.tolist()):
+            for found in set(findall(text)):
+                idx = contains[found]
+                rows.extend([i] * len(idx))
+                cols.extend(idx)
+    hits[rows, cols] = 1
+    return (hits @ matcher['weights'])[codes]
+
+
+def _fallback_categories(name_lower: pd.Series, desc_lower: pd.Series) -> np.ndarray:
+    """Vectorized fallback_categorization over whole columns."""
+    conditions = []
+    choices = []
+    for name_keywords, desc_keyword, category in FALLBACK_RULES:
+        cond = np.zeros(len(name_lower), dtype=bool)
+        for keyword in name_keywords:
+            cond |= name_lower.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+        if desc_keyword:
+            cond &= desc_lower.str.contains(desc_keyword, regex=False).to_numpy(dtype=bool)
+        conditions.append(cond)
+        choices.append(category)
+    return np.select(conditions, choices, default=UNCATEGORIZED)
+
+
+def categorize_gpts(names, descriptions, matcher: dict = None) -> pd.DataFrame:
+    """
+    Categorize whole columns of GPTs at once.
+    Returns a DataFrame with 'category', 'confidence' and 'scores' columns that
+    match categorize_gpt row for row (missing descriptions count as empty).
+    """
+    matcher = matcher or compile_category_matcher()
+    categories = matcher['categories']
+    name_lower = _lower_text(names)
+    desc_lower = _lower_text(descriptions)
+
+    if len(name_lower) == 0:
+        return pd.DataFrame({'category': [], 'confidence': [], 'scores': []})
+
+    # Names repeat across configs and months, so score each distinct (name, description) once
+    pair_codes, pair_uniques = pd.factorize(name_lower + '\x00' + desc_lower)
+    first_rows = np.unique(pair_codes, return_index=True)[1]
+    name_u = name_lower.iloc[first_rows].reset_index(drop=True)
+    desc_u = desc_lower.iloc[first_rows].reset_index(drop=True)
+
+    scores = 2 * _keyword_scores(desc_u, matcher) + _keyword_scores(name_u, matcher)
+
+    # argmax returns the first maximum, same tie-breaking as max(scores, key=scores.get)
+    best_idx = scores.argmax(axis=1)
+    best_score = scores[np.arange(len(scores)), best_idx]
+    matched = best_score > 0
+
+    category = np.where(matched, np.asarray(categories, dtype=object)[best_idx], None)
+    if not matched.all():
+        category[~matched] = _fallback_categories(name_u[~matched].reset_index(drop=True),
+                                                  desc_u[~matched].reset_index(drop=True))
+    confidence = np.where(matched, np.where(best_score >= 3, 'high', 'medium'), 'low').astype(object)
+
+    # np.nonzero walks row-major, so each dict keeps CATEGORY_DEFINITIONS order
+    score_dicts = [{} for _ in range(len(scores))]
+    rows, cols = np.nonzero(scores)
+    for r, c, v in zip(rows.tolist(), cols.tolist(), scores[rows, cols].tolist()):
+        score_dicts[r][categories[c]] = v
+    for r in np.flatnonzero(~matched).tolist():
+        score_dicts[r] = {category[r]: 1}
+
+    return pd.DataFrame({
+        'category': category[pair_codes],
+        'confidence': confidence[pair_codes],
+        'scores': [dict(score_dicts[c]) for c in pair_codes.tolist()],
+    })
+
+
 # ============================================================================
 # MAIN ANALYSIS PIPELINE
 # ============================================================================
 
-def analyze_gpt_data(file_path: str, period: str = None) -> dict:
+def top_n_per_group(df: pd.DataFrame, group_col: str, value_col: str, n: int = 5) -> pd.DataFrame:
     """
-    Main analysis function.
-    
-    Args:
-        file_path: Path to Excel file
-        period: Optional period label (e.g., "December 2025")
-    
-    Returns:
-        Complete analysis results as dictionary
+    The n largest rows by value_col within each group, in one stable sort plus a
+    grouped rank instead of a filter + nlargest per group. Rows come back in
+    descending value order (ties in original row order, like nlargest), so each
+    group's rows appear in rank order.
     """
-    
-    # Read data
+    ranked = df.sort_values(value_col, ascending=False, kind='stable')
+    return ranked[ranked.groupby(group_col, sort=False, observed=True).cumcount() < n]
+
+
+def _records(columns: dict) -> list:
+    """List of row dicts built from equal-length column lists."""
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def _preview(values: pd.Series, length: int) -> list:
+    """Text truncated to length, None where missing."""
+    return [str(v)[:length] if pd.notna(v) else None for v in values.tolist()]
+
+
+def distinct_users(user_events, category_of: dict) -> tuple:
+    """
+    Distinct users overall and per category from per-user events (a user column
+    plus gpt_name), counting only GPTs in category_of. Uses HyperLogLog sketches
+    (../wb/gpt_hll.py) when available, exact counts otherwise.
+    Returns (total, {category: users}).
+    """
+    if not isinstance(user_events, pd.DataFrame):
+        user_events = read_user_events(user_events) if read_user_events else pd.read_csv(user_events)
+    user_col = user_column(user_events)
+    category = user_events['gpt_name'].map(category_of)
+    known = category.notna() & user_events[user_col].notna()
+    users = user_events.loc[known, user_col].astype(str).str.strip().str.lower()
+    category = category[known]
+
+    if sketch_groups is not None:
+        by_category = sketch_groups(users, category)
+        total = HyperLogLog.union(by_category.values()).count()
+        return total, {cat: sketch.count() for cat, sketch in by_category.items()}
+    return int(users.nunique()), {cat: int(n) for cat, n in users.groupby(category).nunique().items()}
+
+
+def load_gpt_frame(file_path: str) -> pd.DataFrame:
+    """
+    Read, clean and screen an export: live GPTs only, with 'is_excluded' and
+    'exclusion_reason' columns. Depends on the file and the exclusion rules only.
+    """
+    # Read data (through the columnar cache when available)
+    read_sheet = read_gptdata or (lambda path, sheet_name: pd.read_excel(path, sheet_name=sheet_name or 0))
     try:
-        df = pd.read_excel(file_path, sheet_name='GPTData')
+        df = read_sheet(file_path, sheet_name='GPTData')
     except ValueError:
-        df = pd.read_excel(file_path)  # Fall back to first sheet
+        df = read_sheet(file_path, sheet_name=None)  # Fall back to first sheet
     
     # Clean data
     df = df[df['gpt_name'] != 'gpt_name'].copy()
@@ -239,28 +491,62 @@ def analyze_gpt_data(file_path: str, period: str = None) -> dict:
     df = df[df['config_type'] == 'live'].copy() if 'config_type' in df.columns else df
     
     # Apply exclusions
-    df['exclusion_info'] = df['gpt_name'].apply(should_exclude)
-    df['is_excluded'] = df['exclusion_info'].apply(lambda x: x['excluded'])
-    df['exclusion_reason'] = df['exclusion_info'].apply(lambda x: x['reason'])
+    if load_rules is not None:
+        exclusions = load_rules('analyzer').evaluate(df['gpt_name'])
+        df['is_excluded'] = exclusions['excluded']
+        df['exclusion_reason'] = exclusions['exclude_reason']
+    else:
+        df['exclusion_info'] = df['gpt_name'].apply(should_exclude)
+        df['is_excluded'] = df['exclusion_info'].apply(lambda x: x['excluded'])
+        df['exclusion_reason'] = df['exclusion_info'].apply(lambda x: x['reason'])
+        df = df.drop(columns='exclusion_info')
+    return df
+
+
+def analyze_gpt_data(file_path: str, period: str = None, categorizer=None, user_events=None) -> dict:
+    """
+    Main analysis function.
+    
+    Args:
+        file_path: Path to Excel file
+        period: Optional period label (e.g., "December 2025")
+        categorizer: Optional replacement for categorize_gpts, called with the name and
+            description columns (e.g. semantic_categorizer.SemanticCategorizer())
+        user_events: Optional per-user events (DataFrame, CSV or Excel path with a user
+            column and gpt_name). Adds true distinct user counts to the summary and
+            categories; the totals from the export count a user once per GPT used.
     
+    Returns:
+        Complete analysis results as dictionary
+    """
+    return analyze_gpt_frame(load_gpt_frame(file_path), file_path, period, categorizer, user_events)
+
+
+def analyze_gpt_frame(df: pd.DataFrame, file_path: str, period: str = None, categorizer=None,
+                      user_events=None) -> dict:
+    """analyze_gpt_data for a frame from load_gpt_frame: categorization and statistics."""
     # Split data
     df_excluded = df[df['is_excluded'] == True].copy()
     df_included = df[df['is_excluded'] == False].copy()
     
-    # Categorize included GPTs
-    categorization_results = []
-    for _, row in df_included.iterrows():
-        result = categorize_gpt(row['gpt_name'], row.get('gpt_description'))
-        result['messages'] = int(row['messages_workspace'])
-        result['users'] = int(row['unique_messagers_workspace'])
-        result['creator'] = row.get('gpt_creator_email', 'Unknown')
-        categorization_results.append(result)
+    # Categorize included GPTs (one vectorized pass over the whole column)
+    descriptions = df_included['gpt_description'] if 'gpt_description' in df_included.columns else pd.Series([None] * len(df_included))
+    categorized = (categorizer or categorize_gpts)(df_included['gpt_name'], descriptions)
+    categorized['name'] = df_included['gpt_name'].to_numpy()
+    # object dtype: a plain list becomes a string column under pandas 3, turning None into NaN
+    categorized['description_preview'] = pd.Series([d[:150] if isinstance(d, str) and d else None for d in descriptions],
+                                                   index=categorized.index, dtype=object)
+    categorized['messages'] = df_included['messages_workspace'].astype(int).to_numpy()
+    categorized['users'] = df_included['unique_messagers_workspace'].astype(int).to_numpy()
+    categorized['creator'] = df_included['gpt_creator_email'].to_numpy() if 'gpt_creator_email' in df_included.columns else 'Unknown'
+    categorization_results = categorized.to_dict('records')
     
-    # Add category to dataframe
-    category_map = {r['name']: r['category'] for r in categorization_results}
-    confidence_map = {r['name']: r['confidence'] for r in categorization_results}
-    df_included['category'] = df_included['gpt_name'].map(category_map)
-    df_included['confidence'] = df_included['gpt_name'].map(confidence_map)
+    # Add category to dataframe (by name; the last row wins for repeated names)
+    by_name = categorized.drop_duplicates('name', keep='last').set_index('name')
+    df_included['category'] = df_included['gpt_name'].map(by_name['category'])
+    df_included['confidence'] = df_included['gpt_name'].map(by_name['confidence'])
+    if 'gpt_description' not in df_included.columns:
+        df_included['gpt_description'] = None
     
     # Calculate statistics
     total_included_gpts = len(df_included)
@@ -276,21 +562,30 @@ def analyze_gpt_data(file_path: str, period: str = None) -> dict:
     category_stats.columns = ['category', 'gpt_count', 'total_messages', 'total_users']
     category_stats['percentage'] = (category_stats['total_messages'] / total_included_messages * 100).round(1)
     category_stats = category_stats.sort_values('total_messages', ascending=False)
+
+    distinct_total = None
+    if user_events is not None:
+        distinct_total, distinct_by_category = distinct_users(user_events, by_name['category'].to_dict())
+        category_stats['distinct_users'] = category_stats['category'].map(distinct_by_category).fillna(0).astype(int)
     
-    # Top GPTs per category
-    top_by_category = {}
-    for cat in category_stats['category']:
-        cat_gpts = df_included[df_included['category'] == cat].nlargest(5, 'messages_workspace')
-        top_by_category[cat] = [
-            {
-                'name': row['gpt_name'],
-                'messages': int(row['messages_workspace']),
-                'users': int(row['unique_messagers_workspace']),
-                'confidence': row.get('confidence', 'unknown'),
-                'description': str(row['gpt_description'])[:100] if pd.notna(row['gpt_description']) else None
-            }
-            for _, row in cat_gpts.iterrows()
-        ]
+    # Top GPTs per category: one grouped pass, rows arrive in rank order per category
+    top_by_category = {cat: [] for cat in category_stats['category']}
+    top = top_n_per_group(df_included, 'category', 'messages_workspace', 5)
+    top_records = _records({
+        'name': top['gpt_name'].tolist(),
+        'messages': top['messages_workspace'].astype(int).tolist(),
+        'users': top['unique_messagers_workspace'].astype(int).tolist(),
+        'confidence': top['confidence'].tolist(),
+        'description': _preview(top['gpt_description'], 100),
+    })
+    for cat, record in zip(top['category'].tolist(), top_records):
+        top_by_category[cat].append(record)
+
+    top_excluded = df_excluded.nlargest(5, 'messages_workspace')
+    uncategorized = df_included[
+        (df_included['category'] == 'Other / Uncategorized') &
+        (df_included['messages_workspace'] > 10)
+    ]
     
     # Confidence distribution
     confidence_dist = df_included['confidence'].value_counts().to_dict()
@@ -308,14 +603,11 @@ def analyze_gpt_data(file_path: str, period: str = None) -> dict:
         'exclusions': {
             'count': len(df_excluded),
             'total_messages': int(df_excluded['messages_workspace'].sum()),
-            'top_excluded': [
-                {
-                    'name': row['gpt_name'],
-                    'messages': int(row['messages_workspace']),
-                    'reason': row['exclusion_reason']
-                }
-                for _, row in df_excluded.nlargest(5, 'messages_workspace').iterrows()
-            ]
+            'top_excluded': _records({
+                'name': top_excluded['gpt_name'].tolist(),
+                'messages': top_excluded['messages_workspace'].astype(int).tolist(),
+                'reason': top_excluded['exclusion_reason'].tolist(),
+            })
         },
         'summary': {
             'total_gpts_analyzed': total_included_gpts,
@@ -325,115 +617,271 @@ def analyze_gpt_data(file_path: str, period: str = None) -> dict:
         },
         'categories': category_stats.to_dict('records'),
         'top_gpts_by_category': top_by_category,
-        'uncategorized_high_volume': [
-            {
-                'name': row['gpt_name'],
-                'messages': int(row['messages_workspace']),
-                'description': str(row['gpt_description'])[:100] if pd.notna(row['gpt_description']) else None
-            }
-            for _, row in df_included[
-                (df_included['category'] == 'Other / Uncategorized') & 
-                (df_included['messages_workspace'] > 10)
-            ].iterrows()
-        ],
+        'uncategorized_high_volume': _records({
+            'name': uncategorized['gpt_name'].tolist(),
+            'messages': uncategorized['messages_workspace'].astype(int).tolist(),
+            'description': _preview(uncategorized['gpt_description'], 100),
+        }),
         'all_categorizations': categorization_results
     }
     
+    if distinct_total is not None:
+        result['summary']['distinct_users'] = distinct_total
+
     return result
 
 
-def generate_markdown_report(analysis: dict) -> str:
+# ============================================================================
+# REPORT RENDERING
+# ============================================================================
+
+_FORMATTER = string.Formatter()
+_CONVERSIONS = {'r': 'repr', 's': 'str', 'a': 'ascii'}
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template: str, html_escape: bool = False):
     """
-    Generate a formatted markdown report from analysis results.
+    Compile a str.format-style template ("| {name} | {messages:,} |") once into
+    a function of one dict, so rendering a row is a single concatenation with
+    no format-string parsing. With html_escape every substituted value is
+    escaped; literal text is emitted as written.
     """
-    
-    lines = []
-    
-    # Header
-    lines.append(f"# GPT Usage Analysis Report")
-    lines.append(f"**Period**: {analysis['metadata']['period']}")
-    lines.append(f"**Generated**: {analysis['metadata']['analysis_date'][:10]}")
-    lines.append(f"")
-    
-    # Executive Summary
-    lines.append(f"## Executive Summary")
-    lines.append(f"- **Total Live GPTs**: {analysis['metadata']['total_live_gpts']}")
-    lines.append(f"- **Excluded (High-Volume)**: {analysis['exclusions']['count']} GPTs ({analysis['exclusions']['total_messages']:,} messages)")
-    lines.append(f"- **Analyzed GPTs**: {analysis['summary']['total_gpts_analyzed']} ({analysis['summary']['total_messages']:,} messages)")
-    lines.append(f"- **Unique Users**: {analysis['summary']['total_unique_users']}")
-    lines.append(f"- **Categorization Confidence**: {analysis['summary']['confidence_distribution']}")
-    lines.append(f"")
-    
-    # Excluded GPTs
-    lines.append(f"## Excluded High-Volume GPTs")
-    lines.append(f"| GPT | Messages | Exclusion Reason |")
-    lines.append(f"|-----|----------|------------------|")
-    for gpt in analysis['exclusions']['top_excluded']:
-        lines.append(f"| {gpt['name']} | {gpt['messages']:,} | {gpt['reason']} |")
-    lines.append(f"")
-    
-    # Category Breakdown
-    lines.append(f"## Category Breakdown")
-    lines.append(f"| Category | GPTs | Messages | % of Total | Users |")
-    lines.append(f"|----------|------|----------|------------|-------|")
-    for cat in analysis['categories']:
-        lines.append(f"| {cat['category']} | {cat['gpt_count']} | {cat['total_messages']:,} | {cat['percentage']}% | {cat['total_users']} |")
-    lines.append(f"")
-    
-    # Detailed Category Analysis
-    lines.append(f"## Detailed Analysis by Category")
+    parts = []
+    for literal, field, spec, conversion in _FORMATTER.parse(template):
+        if literal:
+            parts.append(repr(literal))
+        if field is not None:
+            value = f"d[{field!r}]"
+            if conversion:
+                value = f"{_CONVERSIONS[conversion]}({value})"
+            value = f"format({value}, {spec!r})"
+            parts.append(f"_escape({value})" if html_escape else value)
+    source = f"lambda d: ''.join(({', '.join(parts)},))" if parts else "lambda d: ''"
+    return eval(compile(source, f"<template {template[:40]!r}>", 'eval'), {'_escape': html.escape})
+
+
+CONFIDENCE_EMOJI = {'high': '🟢', 'medium': '🟡', 'low': '🔴'}
+
+
+def report_context(analysis: dict, top_n: int = 5) -> dict:
+    """
+    Everything the Markdown and HTML reports show, computed once: category
+    stats are looked up by name in a dict, and the recommendations are
+    worked out here rather than in each renderer.
+    """
+    meta, summary = analysis['metadata'], analysis['summary']
+    cats = analysis['categories']
+    stats_by_cat = {c['category']: c for c in cats}
+
+    details = []
     for cat_name, gpts in analysis['top_gpts_by_category'].items():
-        cat_stats = next((c for c in analysis['categories'] if c['category'] == cat_name), None)
+        cat_stats = stats_by_cat.get(cat_name)
         if cat_stats:
-            lines.append(f"")
-            lines.append(f"### {cat_name}")
-            lines.append(f"*{CATEGORY_DEFINITIONS.get(cat_name, {}).get('description', '')}*")
-            lines.append(f"")
-            lines.append(f"**Stats**: {cat_stats['gpt_count']} GPTs | {cat_stats['total_messages']:,} messages | {cat_stats['percentage']}% of usage")
-            lines.append(f"")
-            lines.append(f"| GPT | Messages | Users | Confidence |")
-            lines.append(f"|-----|----------|-------|------------|")
-            for gpt in gpts[:5]:  # Top 5
-                conf_emoji = {'high': '🟢', 'medium': '🟡', 'low': '🔴'}.get(gpt.get('confidence', 'unknown'), '⚪')
-                lines.append(f"| {gpt['name']} | {gpt['messages']:,} | {gpt['users']} | {conf_emoji} {gpt.get('confidence', 'unknown')} |")
-    lines.append(f"")
-    
-    # Uncategorized high-volume
-    if analysis['uncategorized_high_volume']:
-        lines.append(f"## ⚠️ Uncategorized High-Volume GPTs")
-        lines.append(f"These GPTs have >10 messages but weren't categorized. Review and update keywords.")
-        lines.append(f"")
-        for gpt in analysis['uncategorized_high_volume']:
-            lines.append(f"- **{gpt['name']}** ({gpt['messages']} messages)")
-            if gpt['description']:
-                lines.append(f"  - Description: {gpt['description']}")
-        lines.append(f"")
-    
-    # Recommendations
-    lines.append(f"## Recommendations")
-    
-    # Find insights
-    cats = analysis['categories']
+            details.append({
+                **cat_stats,
+                'description': CATEGORY_DEFINITIONS.get(cat_name, {}).get('description', ''),
+                'gpts': [{**gpt, 'confidence': gpt.get('confidence', 'unknown'),
+                          'emoji': CONFIDENCE_EMOJI.get(gpt.get('confidence', 'unknown'), '⚪')}
+                         for gpt in gpts[:top_n]],
+            })
+
+    recommendations = []
     if cats:
         top_cat = cats[0]
         if top_cat['percentage'] > 40:
-            lines.append(f"- ⚠️ **Category Concentration**: {top_cat['category']} dominates with {top_cat['percentage']:.0f}% of usage")
-        
-        low_usage = [c for c in cats if c['total_messages'] < 100]
+            recommendations.append({'icon': '⚠️', 'label': 'Category Concentration',
+                                    'text': f"{top_cat['category']} dominates with {top_cat['percentage']:.0f}% of usage"})
+        low_usage = sum(1 for c in cats if c['total_messages'] < 100)
         if low_usage:
-            lines.append(f"- 💡 **Growth Opportunity**: {len(low_usage)} categories have <100 messages—consider promotion")
-    
+            recommendations.append({'icon': '💡', 'label': 'Growth Opportunity',
+                                    'text': f"{low_usage} categories have <100 messages—consider promotion"})
     if analysis['uncategorized_high_volume']:
-        lines.append(f"- 🔧 **Data Quality**: {len(analysis['uncategorized_high_volume'])} high-volume GPTs need manual categorization review")
-    
-    high_conf = analysis['summary']['confidence_distribution'].get('high', 0)
-    total_cat = sum(analysis['summary']['confidence_distribution'].values())
+        recommendations.append({'icon': '🔧', 'label': 'Data Quality',
+                                'text': f"{len(analysis['uncategorized_high_volume'])} high-volume GPTs need manual categorization review"})
+    high_conf = summary['confidence_distribution'].get('high', 0)
+    total_cat = sum(summary['confidence_distribution'].values())
     if total_cat > 0 and high_conf / total_cat < 0.7:
-        lines.append(f"- 📊 **Categorization Coverage**: Only {high_conf/total_cat*100:.0f}% high-confidence categorizations—consider enriching descriptions")
-    
+        recommendations.append({'icon': '📊', 'label': 'Categorization Coverage',
+                                'text': f"Only {high_conf/total_cat*100:.0f}% high-confidence categorizations—consider enriching descriptions"})
+
+    return {
+        'period': meta['period'],
+        'generated': meta['analysis_date'][:10],
+        'total_live_gpts': meta['total_live_gpts'],
+        'excluded_count': analysis['exclusions']['count'],
+        'excluded_messages': analysis['exclusions']['total_messages'],
+        'gpts_analyzed': summary['total_gpts_analyzed'],
+        'total_messages': summary['total_messages'],
+        'unique_users': summary['total_unique_users'],
+        'distinct_users': summary.get('distinct_users'),
+        'confidence_distribution': summary['confidence_distribution'],
+        'excluded': analysis['exclusions']['top_excluded'],
+        'categories': cats,
+        'details': details,
+        'uncategorized': analysis['uncategorized_high_volume'],
+        'recommendations': recommendations,
+    }
+
+
+# One template per report element; {field} slots take the context (or row) dict keys
+MARKDOWN_TEMPLATES = {
+    'header': "# GPT Usage Analysis Report\n**Period**: {period}\n**Generated**: {generated}\n\n"
+              "## Executive Summary\n"
+              "- **Total Live GPTs**: {total_live_gpts}\n"
+              "- **Excluded (High-Volume)**: {excluded_count} GPTs ({excluded_messages:,} messages)\n"
+              "- **Analyzed GPTs**: {gpts_analyzed} ({total_messages:,} messages)\n"
+              "- **Unique Users**: {unique_users}",
+    'distinct_users': "- **Distinct Users** (per-user events): {distinct_users:,}",
+    'confidence': "- **Categorization Confidence**: {confidence_distribution}\n",
+    'excluded_head': "## Excluded High-Volume GPTs\n| GPT | Messages | Exclusion Reason |\n|-----|----------|------------------|",
+    'excluded_row': "| {name} | {messages:,} | {reason} |",
+    'categories_head': "\n## Category Breakdown\n| Category | GPTs | Messages | % of Total | Users |\n"
+                       "|----------|------|----------|------------|-------|",
+    'category_row': "| {category} | {gpt_count} | {total_messages:,} | {percentage}% | {total_users} |",
+    'details_head': "\n## Detailed Analysis by Category",
+    'detail': "\n### {category}\n*{description}*\n\n"
+              "**Stats**: {gpt_count} GPTs | {total_messages:,} messages | {percentage}% of usage\n\n"
+              "| GPT | Messages | Users | Confidence |\n|-----|----------|-------|------------|",
+    'gpt_row': "| {name} | {messages:,} | {users} | {emoji} {confidence} |",
+    'uncategorized_head': "## ⚠️ Uncategorized High-Volume GPTs\n"
+                          "These GPTs have >10 messages but weren't categorized. Review and update keywords.\n",
+    'uncategorized_row': "- **{name}** ({messages} messages)",
+    'uncategorized_description': "  - Description: {description}",
+    'recommendations_head': "## Recommendations",
+    'recommendation': "- {icon} **{label}**: {text}",
+}
+
+HTML_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #1f2937; max-width: 1100px; margin: 2rem auto; padding: 0 1rem; line-height: 1.45; }
+h1 { margin-bottom: .25rem; } h2 { border-bottom: 2px solid #e5e7eb; padding-bottom: .25rem; margin-top: 2rem; }
+.meta, .note { color: #6b7280; } .desc { color: #6b7280; font-style: italic; margin: 0; }
+table { border-collapse: collapse; width: 100%; margin: .5rem 0 1rem; font-size: .92rem; }
+th, td { border: 1px solid #e5e7eb; padding: .35rem .6rem; text-align: left; vertical-align: top; }
+th { background: #f3f4f6; } td.num { text-align: right; font-variant-numeric: tabular-nums; }
+.bar { background: #dbeafe; height: .6rem; border-radius: 2px; min-width: 1px; }
+details { margin: .4rem 0; } summary { cursor: pointer; font-weight: 600; }
+"""
+
+HTML_TEMPLATES = {
+    'title': '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+             '<title>GPT Usage Analysis Report: {period}</title>',
+    'header': '</head>\n<body>\n<h1>GPT Usage Analysis Report</h1>\n'
+              '<p class="meta"><strong>Period</strong>: {period} &middot; <strong>Generated</strong>: {generated}</p>\n'
+              '<h2>Executive Summary</h2>\n<ul>\n'
+              '<li><strong>Total Live GPTs</strong>: {total_live_gpts}</li>\n'
+              '<li><strong>Excluded (High-Volume)</strong>: {excluded_count} GPTs ({excluded_messages:,} messages)</li>\n'
+              '<li><strong>Analyzed GPTs</strong>: {gpts_analyzed} ({total_messages:,} messages)</li>\n'
+              '<li><strong>Unique Users</strong>: {unique_users}</li>',
+    'distinct_users': '<li><strong>Distinct Users</strong> (per-user events): {distinct_users:,}</li>',
+    'confidence': '<li><strong>Categorization Confidence</strong>: {confidence}</li>\n</ul>',
+    'excluded_head': '<h2>Excluded High-Volume GPTs</h2>\n<table>\n'
+                     '<tr><th>GPT</th><th>Messages</th><th>Exclusion Reason</th></tr>',
+    'excluded_row': '<tr><td>{name}</td><td class="num">{messages:,}</td><td>{reason}</td></tr>',
+    'categories_head': '</table>\n<h2>Category Breakdown</h2>\n<table>\n'
+                       '<tr><th>Category</th><th>GPTs</th><th>Messages</th><th>% of Total</th><th></th><th>Users</th></tr>',
+    'category_row': '<tr><td>{category}</td><td class="num">{gpt_count}</td><td class="num">{total_messages:,}</td>'
+                    '<td class="num">{percentage}%</td><td style="width:20%"><div class="bar" style="width:{bar_width}%"></div></td>'
+                    '<td class="num">{total_users}</td></tr>',
+    'details_head': '</table>\n<h2>Detailed Analysis by Category</h2>',
+    'detail': '<details>\n<summary>{category}: {gpt_count} GPTs &middot; {total_messages:,} messages &middot; {percentage}% of usage</summary>\n'
+              '<p class="desc">{description}</p>\n<table>\n'
+              '<tr><th>GPT</th><th>Messages</th><th>Users</th><th>Confidence</th></tr>',
+    'detail_end': '</table>\n</details>',
+    'gpt_row': '<tr><td>{name}</td><td class="num">{messages:,}</td><td class="num">{users}</td><td>{emoji} {confidence}</td></tr>',
+    'uncategorized_head': '<h2>⚠️ Uncategorized High-Volume GPTs</h2>\n'
+                          '<p class="note">These GPTs have &gt;10 messages but weren\'t categorized. Review and update keywords.</p>\n<ul>',
+    'uncategorized_row': '<li><strong>{name}</strong> ({messages} messages)',
+    'uncategorized_description': '<br><span class="note">Description: {description}</span>',
+    'uncategorized_end': '</ul>',
+    'recommendations_head': '<h2>Recommendations</h2>\n<ul>',
+    'recommendation': '<li>{icon} <strong>{label}</strong>: {text}</li>',
+    'footer': '</ul>\n</body>\n</html>\n',
+}
+
+
+def _templates(templates: dict, html_escape: bool = False) -> dict:
+    return {name: compile_template(t, html_escape) for name, t in templates.items()}
+
+
+def generate_markdown_report(analysis: dict) -> str:
+    """
+    Generate a formatted markdown report from analysis results.
+    """
+    ctx = report_context(analysis)
+    t = _templates(MARKDOWN_TEMPLATES)
+
+    lines = [t['header'](ctx)]
+    if ctx['distinct_users'] is not None:
+        lines.append(t['distinct_users'](ctx))
+    lines.append(t['confidence'](ctx))
+    lines.append(t['excluded_head'](ctx))
+    lines.extend(map(t['excluded_row'], ctx['excluded']))
+    lines.append(t['categories_head'](ctx))
+    lines.extend(map(t['category_row'], ctx['categories']))
+    lines.append(t['details_head'](ctx))
+    for detail in ctx['details']:
+        lines.append(t['detail'](detail))
+        lines.extend(map(t['gpt_row'], detail['gpts']))
+    lines.append('')
+
+    if ctx['uncategorized']:
+        lines.append(t['uncategorized_head'](ctx))
+        for gpt in ctx['uncategorized']:
+            lines.append(t['uncategorized_row'](gpt))
+            if gpt['description']:
+                lines.append(t['uncategorized_description'](gpt))
+        lines.append('')
+
+    lines.append(t['recommendations_head'](ctx))
+    lines.extend(map(t['recommendation'], ctx['recommendations']))
+    return "\n".join(lines)
+
+
+def generate_html_report(analysis: dict) -> str:
+    """
+    The markdown report as one self-contained HTML page (inline CSS, no
+    scripts or external assets); per-category details are collapsible.
+    """
+    ctx = report_context(analysis)
+    t = _templates(HTML_TEMPLATES, html_escape=True)
+    top_pct = max((c['percentage'] for c in ctx['categories']), default=0) or 1
+
+    confidence = ', '.join(f"{level}: {n:,}" for level, n in ctx['confidence_distribution'].items())
+    lines = [t['title'](ctx), f"<style>{HTML_STYLE}</style>", t['header'](ctx)]
+    if ctx['distinct_users'] is not None:
+        lines.append(t['distinct_users'](ctx))
+    lines.append(t['confidence']({'confidence': confidence}))
+    lines.append(t['excluded_head'](ctx))
+    lines.extend(map(t['excluded_row'], ctx['excluded']))
+    lines.append(t['categories_head'](ctx))
+    lines.extend(t['category_row']({**c, 'bar_width': round(c['percentage'] / top_pct * 100, 1)})
+                 for c in ctx['categories'])
+    lines.append(t['details_head'](ctx))
+    for detail in ctx['details']:
+        lines.append(t['detail'](detail))
+        lines.extend(map(t['gpt_row'], detail['gpts']))
+        lines.append(t['detail_end'](detail))
+
+    if ctx['uncategorized']:
+        lines.append(t['uncategorized_head'](ctx))
+        for gpt in ctx['uncategorized']:
+            row = t['uncategorized_row'](gpt)
+            if gpt['description']:
+                row += t['uncategorized_description'](gpt)
+            lines.append(row + '</li>')
+        lines.append(t['uncategorized_end'](ctx))
+
+    lines.append(t['recommendations_head'](ctx))
+    lines.extend(map(t['recommendation'], ctx['recommendations']))
+    lines.append(t['footer'](ctx))
     return "\n".join(lines)
 
 
+# ============================================================================
+# PERIOD COMPARISON
+# ============================================================================
+
 def compare_periods(current_analysis: dict, previous_analysis: dict) -> dict:
     """
     Compare two analysis periods and generate MoM insights.
@@ -491,6 +939,160 @@ def compare_periods(current_analysis: dict, previous_analysis: dict) -> dict:
     return comparison
 
 
+# ============================================================================
+# CACHED ANALYSES
+# ============================================================================
+
+# Bump when analyze_gpt_data's output changes shape, so old cache files are ignored
+ANALYSIS_CACHE_VERSION = 1
+
+
+def _short_hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _exclusion_specs() -> list:
+    if load_rules is not None:
+        return [[r.code, r.reason, r.field, r.kind, r.pattern] for r in load_rules('analyzer').rules]
+    return EXCLUSION_PATTERNS
+
+
+def frame_fingerprint() -> str:
+    """Short hash of what load_gpt_frame depends on besides the file: the exclusion rules."""
+    return _short_hash({'version': ANALYSIS_CACHE_VERSION, 'exclusions': _exclusion_specs()})
+
+
+def analysis_fingerprint(categorizer=None) -> str:
+    """
+    Short hash of the rules an analysis depends on besides the input file:
+    category definitions, fallback rules and exclusion rules, plus the
+    categorizer's `fingerprint` when one replaces categorize_gpts.
+    """
+    rules = {
+        'frame': frame_fingerprint(),
+        'categories': CATEGORY_DEFINITIONS,
+        'fallback': FALLBACK_RULES,
+    }
+    if categorizer is not None:
+        rules['categorizer'] = getattr(categorizer, 'fingerprint', getattr(categorizer, '__qualname__', repr(categorizer)))
+    return _short_hash(rules)
+
+
+def _analysis_cache_dir(cache_dir: str = None) -> str:
+    return cache_dir or os.path.join(
+        os.environ.get('GPTDATA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'gptdata')),
+        'analyses')
+
+
+def _file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _atomic_write(path: str, write) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _prune(folder: str, stale) -> None:
+    """Remove the cache files in folder whose name satisfies stale(name)."""
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    for name in names:
+        if stale(name) and not name.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+def load_gpt_frame_cached(file_path: str, cache_dir: str = None, digest: str = None) -> pd.DataFrame:
+    """
+    load_gpt_frame, memoized on disk by file content hash plus frame_fingerprint(),
+    so editing category rules doesn't re-read or re-screen the export.
+    """
+    folder = os.path.join(_analysis_cache_dir(cache_dir), 'frames')
+    digest = digest or _file_digest(file_path)
+    name = f"{digest}.{frame_fingerprint()}.pkl"
+    path = os.path.join(folder, name)
+    try:
+        return pd.read_pickle(path)
+    except Exception:  # missing, partial or written by an incompatible pandas
+        pass
+    df = load_gpt_frame(file_path)
+    _atomic_write(path, df.to_pickle)
+    _prune(folder, lambda other: other.startswith(f"{digest}.") and other != name)
+    return df
+
+
+def analyze_gpt_data_cached(file_path: str, period: str = None, cache_dir: str = None, categorizer=None) -> dict:
+    """
+    analyze_gpt_data, memoized on disk in two stages:
+
+    - the cleaned, screened frame (load_gpt_frame_cached), keyed by file
+      content hash and the exclusion rules;
+    - the analysis, keyed by file content hash, a hash of the category,
+      fallback and exclusion rules, and the categorizer's fingerprint.
+
+    Editing CATEGORY_DEFINITIONS or FALLBACK_RULES re-runs only categorization
+    and the statistics on the cached frame; editing exclusion rules also
+    re-reads the export. When a file is analyzed under new rules, its entries
+    under older rules are removed. Analyses by other categorizers under the
+    current rules are kept.
+
+    A cached result is returned with this call's period label and file path;
+    metadata.analysis_date still records when the analysis was computed.
+
+    Cache location: cache_dir, else $GPTDATA_CACHE_DIR/analyses, else ~/.cache/gptdata/analyses
+    """
+    folder = _analysis_cache_dir(cache_dir)
+    digest = _file_digest(file_path)
+    # <file>.<rules>.<rules + categorizer>.json, so a rules edit can prune stale entries
+    # of every categorizer while analyses by other categorizers stay
+    rules_key = analysis_fingerprint()
+    name = f"{digest}.{rules_key}.{analysis_fingerprint(categorizer)}.json"
+    cache_path = os.path.join(folder, name)
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        df = load_gpt_frame_cached(file_path, cache_dir, digest)
+        result = analyze_gpt_frame(df, file_path, period, categorizer)
+
+        def write(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(result, f, separators=(',', ':'))
+        _atomic_write(cache_path, write)
+        _prune(folder, lambda other: other.startswith(f"{digest}.") and other.endswith('.json')
+               and not other.startswith(f"{digest}.{rules_key}."))
+
+    result['metadata']['period'] = period or 'Unknown'
+    result['metadata']['file_processed'] = file_path
+    return result
+
+
+def compare_period_files(current_file: str, previous_file: str,
+                         current_period: str = None, previous_period: str = None) -> dict:
+    """
+    compare_periods for two exports, reusing cached analyses; once both files
+    have been analyzed under the current rules this is two cache reads.
+    """
+    return compare_periods(analyze_gpt_data_cached(current_file, current_period),
+                           analyze_gpt_data_cached(previous_file, previous_period))
+
+
 # ============================================================================
 # USAGE EXAMPLE
 # ============================================================================
@@ -504,6 +1106,9 @@ if __name__ == "__main__":
     print("1. Upload your Excel file to the GPT")
     print("2. Run: result = analyze_gpt_data('your_file.xlsx', 'December 2025')")
     print("3. Generate report: print(generate_markdown_report(result))")
+    print("   or a self-contained HTML page: open('report.html', 'w', encoding='utf-8').write(generate_html_report(result))")
     print()
     print("For month-over-month comparison:")
-    print("comparison = compare_periods(current_analysis, previous_analysis)")
\ No newline at end of file
+    print("comparison = compare_periods(current_analysis, previous_analysis)")
+    print("or, memoized on disk by file hash and rules version:")
+    print("comparison = compare_period_files('current.xlsx', 'previous.xlsx', 'January 2026', 'December 2025')")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service for the GPT Usage Analyst API (action.yaml).
+
+  POST /analyze   multipart: file, period            -> analyze_gpt_data JSON
+                  ?format=markdown                   -> generate_markdown_report text
+                  ?format=html                       -> generate_html_report page
+  POST /compare   multipart: current_file, previous_file,
+                  current_period, previous_period    -> compare_periods JSON
+  GET  /health                                       -> {"status", "timestamp"}
+
+Uploads are stored once under their SHA-256, and analyses are cached per
+(content hash, period) in memory and on disk (analyze_gpt_data_cached), so
+re-sending a file returns the cached result; identical requests that arrive
+together share one computation. Parsing and analysis run in a process pool,
+keeping the event loop free for other requests.
+
+The app is a plain ASGI callable (no web framework needed):
+  python gpt_service.py --port 8000 --workers 2
+  uvicorn gpt_service:app --port 8000            # settings from the environment only
+
+  curl -F file=@export.xlsx -F period="December 2025" http://127.0.0.1:8000/analyze
+
+Settings (flags or environment): GPT_SERVICE_DIR (upload store, default
+~/.cache/gpt_service), GPT_SERVICE_WORKERS, GPT_SERVICE_MAX_UPLOAD_MB.
+The module-level `app` is built on first access, from the environment;
+the command-line flags only apply to `python gpt_service.py`.
+
+Dependencies:
+  pip install pandas numpy openpyxl
+  pip install uvicorn   (to serve over HTTP; tests can call the app in-process)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from analyze_gpt_usage import (analyze_gpt_data_cached, compare_periods, generate_html_report,
+                               generate_markdown_report)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_multipart(body: bytes, content_type: str) -> dict[str, tuple[str | None, bytes]]:
+    """Split a multipart/form-data body into {field: (filename or None, raw bytes)}."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not content_type.startswith("multipart/form-data") or not match:
+        raise HTTPError(415, "Expected multipart/form-data")
+    delimiter = b"--" + match.group(1).encode("latin-1")
+
+    fields = {}
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break  # closing delimiter
+        head, sep, data = part.partition(b"\r\n\r\n")
+        if not sep:
+            raise HTTPError(400, "Malformed multipart body")
+        disposition = ""
+        for line in head.decode("utf-8", "replace").split("\r\n"):
+            if line.lower().startswith("content-disposition:"):
+                disposition = line
+        name = re.search(r'\bname="([^"]*)"', disposition)
+        filename = re.search(r'\bfilename="([^"]*)"', disposition)
+        if name:
+            data = data[:-2] if data.endswith(b"\r\n") else data
+            fields[name.group(1)] = (filename.group(1) if filename else None, data)
+    return fields
+
+
+def _finite(obj):
+    """obj with NaN/inf floats as None: bare NaN tokens are not JSON, and JSON.parse rejects them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _analyze_file(path: str, period: str | None) -> dict:
+    """Process-pool worker; goes through the on-disk analysis memo, so results survive restarts."""
+    return analyze_gpt_data_cached(path, period)
+
+
+class AnalyzerService:
+    """ASGI app serving analyze_gpt_data_cached / compare_periods over uploaded workbooks."""
+
+    def __init__(self, store_dir: str | Path | None = None, workers: int | None = None,
+                 max_upload_mb: float | None = None, cache_size: int = 256):
+        self.store_dir = Path(store_dir or os.environ.get("GPT_SERVICE_DIR", Path.home() / ".cache" / "gpt_service"))
+        self.workers = workers or int(os.environ.get("GPT_SERVICE_WORKERS", 0)) or min(4, os.cpu_count() or 1)
+        self.max_upload = int(float(max_upload_mb or os.environ.get("GPT_SERVICE_MAX_UPLOAD_MB", 50)) * 1024 * 1024)
+        self.cache_size = cache_size
+        self._results: OrderedDict[tuple, dict] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._pool: ProcessPoolExecutor | None = None
+        self.stats = {"requests": 0, "analyses": 0, "cache_hits": 0}
+
+    # ------------------------------------------------------------------ ASGI
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        self.stats["requests"] += 1
+        try:
+            status, content_type, payload = await self._dispatch(scope, receive)
+        except HTTPError as e:
+            status, content_type, payload = e.status, "application/json", {"error": e.message}
+        except Exception as e:  # analysis failures are reported, not raised into the server
+            status, content_type, payload = 500, "application/json", {"error": f"{type(e).__name__}: {e}"}
+
+        if content_type == "application/json":
+            body = json.dumps(_finite(payload), default=str, allow_nan=False).encode("utf-8")
+        else:
+            body = payload.encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", f"{content_type}; charset=utf-8".encode()),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.store_dir.mkdir(parents=True, exist_ok=True)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def _dispatch(self, scope, receive):
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        routes = {"/health": "GET", "/analyze": "POST", "/compare": "POST"}
+        if path not in routes:
+            raise HTTPError(404, f"Not found: {path}")
+        if method != routes[path]:
+            raise HTTPError(405, f"{path} expects {routes[path]}")
+
+        if path == "/health":
+            return 200, "application/json", {"status": "healthy", "timestamp": datetime.now().isoformat(),
+                                             "workers": self.workers, **self.stats}
+
+        fields = parse_multipart(await self._read_body(receive), self._header(scope, b"content-type"))
+        if path == "/analyze":
+            filename, data = self._upload(fields, "file")
+            result = await self.analyze(data, self._text(fields, "period"), filename)
+            fmt = query.get("format", ["json"])[0]
+            if fmt == "markdown":
+                return 200, "text/markdown", generate_markdown_report(result)
+            if fmt == "html":
+                return 200, "text/html", generate_html_report(result)
+            return 200, "application/json", result
+
+        cur_name, cur_data = self._upload(fields, "current_file")
+        prev_name, prev_data = self._upload(fields, "previous_file")
+        current, previous = await asyncio.gather(
+            self.analyze(cur_data, self._text(fields, "current_period"), cur_name),
+            self.analyze(prev_data, self._text(fields, "previous_period"), prev_name),
+        )
+        return 200, "application/json", compare_periods(current, previous)
+
+    @staticmethod
+    def _header(scope, name: bytes) -> str:
+        for key, value in scope.get("headers", []):
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return ""
+
+    async def _read_body(self, receive) -> bytes:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_upload:
+                raise HTTPError(413, f"Upload larger than {self.max_upload // (1024 * 1024)} MB")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _upload(fields: dict, name: str) -> tuple[str, bytes]:
+        filename, data = fields.get(name, (None, b""))
+        if not data:
+            raise HTTPError(400, f"Missing file field '{name}'")
+        return filename or f"{name}.xlsx", data
+
+    @staticmethod
+    def _text(fields: dict, name: str) -> str | None:
+        try:
+            value = fields.get(name, (None, b""))[1].decode("utf-8").strip()
+        except UnicodeDecodeError:
+            raise HTTPError(400, f"Field '{name}' is not valid UTF-8") from None
+        return value or None
+
+    # ------------------------------------------------------------- analysis
+
+    def _store(self, digest: str, data: bytes) -> Path:
+        """Content-addressed upload store; each distinct file is written once."""
+        path = self.store_dir / "uploads" / f"{digest}.xlsx"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return path
+
+    async def analyze(self, data: bytes, period: str | None, filename: str = "upload.xlsx") -> dict:
+        """analyze_gpt_data for an uploaded workbook, deduplicated by content hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = (digest, period)
+        if key in self._results:
+            self.stats["cache_hits"] += 1
+            self._results.move_to_end(key)
+            result = self._results[key]
+        elif key in self._inflight:
+            self.stats["cache_hits"] += 1
+            result = await asyncio.shield(self._inflight[key])
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            try:
+                path = self._store(digest, data)
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self.stats["analyses"] += 1
+                result = await loop.run_in_executor(self._pool, _analyze_file, str(path), period)
+                self._results[key] = result
+                if len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # mark retrieved when nobody else was waiting
+                raise
+            finally:
+                del self._inflight[key]
+
+        # The worker saw the stored path; report the name the client sent
+        result = dict(result)
+        result["metadata"] = {**result["metadata"], "file_processed": filename, "content_sha256": digest}
+        return result
+
+
+_app: AnalyzerService | None = None
+
+
+def __getattr__(name: str):
+    # `app` for `uvicorn gpt_service:app`, built on first access rather than at import,
+    # so importing the module doesn't read the environment or fix the store directory
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = AnalyzerService()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Serve the GPT Usage Analyst API locally")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=None, help="Analysis worker processes (default: min(4, CPUs))")
+    p.add_argument("--store-dir", type=Path, default=None, help="Upload store (default: ~/.cache/gpt_service)")
+    p.add_argument("--max-upload-mb", type=float, default=None, help="Largest accepted request body (default: 50)")
+    args = p.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Serving over HTTP needs uvicorn: pip install uvicorn")
+
+    service = AnalyzerService(args.store_dir, args.workers, args.max_upload_mb)
+    uvicorn.run(service, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Embedding-based categorizer for GPT names and descriptions.
+
+Keyword scoring (categorize_gpts) leaves many GPTs at 'low' confidence or in
+'Other / Uncategorized'. This categorizer embeds "name. description" with a
+small local sentence-embedding model and assigns the category whose centroid
+is nearest by cosine similarity. A centroid starts from the embedded category
+description and keywords; by default it is then averaged with the GPTs the
+keyword scorer placed with high confidence, so it follows the vocabulary
+actually in use.
+
+Vectors are cached on disk per embedder (the model, or a custom `embed`
+callable), keyed by a hash of the embedded text, so each month only new or
+edited GPTs are embedded. Distinct texts are embedded once, in batches, and
+the cache file is written once per call. A cache file written by another
+embedder, or holding vectors of another dimension, is discarded.
+
+Usage:
+  from semantic_categorizer import SemanticCategorizer
+  result = analyze_gpt_data("export.xlsx", "January 2026", categorizer=SemanticCategorizer())
+
+  python semantic_categorizer.py export.xlsx       # compare with keyword scoring
+
+Cache location: $GPTDATA_CACHE_DIR/embeddings, else ~/.cache/gptdata/embeddings
+Dependencies:
+  pip install sentence-transformers   (CPU is fine; the default model is ~90 MB)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analyze_gpt_usage import (CATEGORY_DEFINITIONS, UNCATEGORIZED, analyze_gpt_data, categorize_gpts,
+                               compile_category_matcher)
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_DESCRIPTION_CHARS = 500
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("GPTDATA_CACHE_DIR", Path.home() / ".cache" / "gptdata")) / "embeddings"
+
+
+def text_keys(texts: list[str]) -> np.ndarray:
+    """64-bit content hash of each text (collisions are negligible at export sizes)."""
+    return np.array([int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little")
+                     for t in texts], dtype=np.uint64)
+
+
+class VectorCache:
+    """Unit-length float16 vectors keyed by text hash, one sorted .npz file per embedder."""
+
+    def __init__(self, path: str | Path, embedder: str = ""):
+        self.path = Path(path)
+        self.embedder = embedder
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.vectors = None
+        self.dirty = False
+        if self.path.exists():
+            try:
+                with np.load(self.path) as data:
+                    # Files from another embedder (or from before the tag was stored) are ignored
+                    if str(data["embedder"]) == embedder:
+                        self.keys, self.vectors = data["keys"], data["vectors"]
+            except (OSError, ValueError, KeyError):
+                pass  # corrupt or partial file; rebuilt on the next save
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def dimension(self) -> int | None:
+        return None if self.vectors is None else self.vectors.shape[1]
+
+    def require_dimension(self, dim: int) -> None:
+        """Drop every cached vector if they aren't dim long."""
+        if self.vectors is not None and self.vectors.shape[1] != dim:
+            self.keys, self.vectors = np.empty(0, dtype=np.uint64), None
+            self.dirty = True
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Row of each key in self.vectors, -1 where it isn't cached."""
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[pos] == keys, pos, -1)
+
+    def add(self, keys: np.ndarray, vectors: np.ndarray) -> None:
+        self.require_dimension(vectors.shape[1])
+        vectors = vectors.astype(np.float16)
+        keys = np.concatenate([self.keys, keys])
+        vectors = vectors if self.vectors is None else np.concatenate([self.vectors, vectors])
+        keys, first = np.unique(keys, return_index=True)
+        self.keys, self.vectors = keys, vectors[first]
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty or self.vectors is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp.npz")
+        os.close(fd)
+        np.savez(tmp, keys=self.keys, vectors=self.vectors, embedder=np.str_(self.embedder))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class SemanticCategorizer:
+    """
+    Nearest-centroid categorizer, usable wherever categorize_gpts is:
+    called with name and description columns, it returns a frame with
+    'category', 'confidence' and 'scores' (top cosine similarities).
+
+    Rows whose best similarity is below min_similarity fall back to
+    'Other / Uncategorized' with 'low' confidence; high_similarity marks
+    'high' confidence, anything between is 'medium'.
+    `embed` replaces the sentence-transformers model with any callable
+    mapping a list of texts to a 2-D array. Its vectors are cached and
+    fingerprinted under `embed_name`, by default "custom:<module>.<qualname>";
+    pass one to tell apart callables sharing a name (e.g. lambdas).
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, definitions: dict = None,
+                 cache_dir: str | Path = None, batch_size: int = 128,
+                 min_similarity: float = 0.25, high_similarity: float = 0.45,
+                 seed_with_keywords: bool = True, embed=None, embed_name: str = None):
+        self.model_name = model_name
+        self.definitions = CATEGORY_DEFINITIONS if definitions is None else definitions
+        self.categories = [c for c in self.definitions if c != UNCATEGORIZED]
+        self._matcher = None  # keyword matcher over self.definitions, for seeding
+        self.batch_size = batch_size
+        self.min_similarity = min_similarity
+        self.high_similarity = high_similarity
+        self.seed_with_keywords = seed_with_keywords
+        if embed is None:
+            self.embedder = model_name
+        else:
+            self.embedder = embed_name or "custom:{}.{}".format(
+                getattr(embed, "__module__", None) or type(embed).__module__,
+                getattr(embed, "__qualname__", None) or type(embed).__qualname__)
+        slug = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in self.embedder)
+        self.cache = VectorCache(Path(cache_dir or default_cache_dir()) / f"{slug}.npz", self.embedder)
+        self._embed = embed
+        self._custom_embed = embed is not None
+        self._dimension = None
+        self.stats = {"texts": 0, "embedded": 0, "embed_seconds": 0.0}
+
+    @property
+    def dimension(self) -> int:
+        """
+        Vector length. A model's is read from its cache when there is one, so a
+        fully cached run never loads the model; otherwise one probe text is
+        embedded, and cached vectors of another length are dropped.
+        """
+        if self._dimension is None:
+            if self._custom_embed or self.cache.dimension is None:
+                # Custom callables are cheap to probe and may change under the same name
+                self._dimension = self._encode(["dimension probe"]).shape[1]
+                self.cache.require_dimension(self._dimension)
+            else:
+                self._dimension = self.cache.dimension
+        return self._dimension
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies these settings in analysis cache keys (see analysis_fingerprint)."""
+        definitions = hashlib.sha256(json.dumps(self.definitions, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return (f"semantic:{self.embedder}:{self.dimension}:{definitions}:{self.min_similarity}"
+                f":{self.high_similarity}:{int(self.seed_with_keywords)}")
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        if self._embed is None:
+            if SentenceTransformer is None:
+                raise ImportError("The semantic categorizer needs sentence-transformers: "
+                                  "pip install sentence-transformers")
+            model = SentenceTransformer(self.model_name, device="cpu")
+            self._embed = lambda batch: model.encode(batch, batch_size=self.batch_size,
+                                                     convert_to_numpy=True, show_progress_bar=False)
+        vectors = np.asarray(self._embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+    def embed_texts(self, texts: list[str], save: bool = True) -> np.ndarray:
+        """
+        Unit vectors for texts; only texts missing from the cache reach the model.
+        With save=False new vectors stay in memory until the next cache.save().
+        """
+        self.cache.require_dimension(self.dimension)
+        keys = text_keys(texts)
+        rows = self.cache.lookup(keys)
+        missing = np.unique(keys[rows < 0], return_index=True)[1]
+        if len(missing):
+            start = time.perf_counter()
+            todo = np.flatnonzero(rows < 0)[missing]
+            self.cache.add(keys[todo], self._encode([texts[i] for i in todo.tolist()]))
+            if save:
+                self.cache.save()
+            self.stats["embedded"] += len(todo)
+            self.stats["embed_seconds"] += time.perf_counter() - start
+            rows = self.cache.lookup(keys)
+        self.stats["texts"] += len(texts)
+        return self.cache.vectors[rows].astype(np.float32)
+
+    def centroids(self, vectors: np.ndarray = None, seed_categories: np.ndarray = None,
+                  save: bool = True) -> np.ndarray:
+        """(categories x dim) unit centroids from category text, plus seed GPTs when given."""
+        texts, owner = [], []
+        for j, category in enumerate(self.categories):
+            rules = self.definitions[category]
+            texts.append(f"{category}: {rules.get('description', '')}")
+            owner.append(j)
+            if rules.get("keywords"):
+                texts.append(", ".join(rules["keywords"]))
+                owner.append(j)
+        # All prototypes in one batch (and one cache write)
+        embedded = self.embed_texts(texts, save=save)
+        owner = np.asarray(owner)
+        centroids = np.vstack([embedded[owner == j].mean(axis=0) for j in range(len(self.categories))])
+
+        if vectors is not None and seed_categories is not None:
+            for j, category in enumerate(self.categories):
+                seeds = vectors[seed_categories == category]
+                if len(seeds):
+                    centroids[j] = centroids[j] / np.linalg.norm(centroids[j]) + seeds.mean(axis=0)
+        return centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def __call__(self, names, descriptions) -> pd.DataFrame:
+        names = pd.Series(names, dtype=object).reset_index(drop=True)
+        descriptions = pd.Series(descriptions, dtype=object).reset_index(drop=True)
+        if len(names) == 0:
+            return pd.DataFrame({"category": [], "confidence": [], "scores": []})
+
+        descs = descriptions.where(descriptions.notna(), "").astype(str).str.slice(0, MAX_DESCRIPTION_CHARS)
+        texts = (names.astype(str) + ". " + descs).str.rstrip(". ")
+        codes, uniques = pd.factorize(texts)
+        vectors = self.embed_texts(uniques.tolist(), save=False)
+
+        seed_categories = None
+        if self.seed_with_keywords:
+            first_rows = np.unique(codes, return_index=True)[1]
+            if self._matcher is None:
+                self._matcher = compile_category_matcher(self.definitions)
+            keyword = categorize_gpts(names.iloc[first_rows], descriptions.iloc[first_rows], self._matcher)
+            seed_categories = np.where(keyword["confidence"].to_numpy() == "high",
+                                       keyword["category"].to_numpy(), None)
+
+        centroids = self.centroids(vectors, seed_categories, save=False)
+        self.cache.save()
+        similarity = vectors @ centroids.T
+        order = np.argsort(-similarity, axis=1, kind="stable")[:, :3]
+        best = similarity[np.arange(len(similarity)), order[:, 0]]
+
+        labels = np.asarray(self.categories, dtype=object)
+        category = np.where(best >= self.min_similarity, labels[order[:, 0]], UNCATEGORIZED)
+        confidence = np.where(best >= self.high_similarity, "high",
+                              np.where(best >= self.min_similarity, "medium", "low")).astype(object)
+        top_sims = np.round(np.take_along_axis(similarity, order, axis=1).astype(np.float64), 3).tolist()
+        scores = [dict(zip(labels[o].tolist(), s)) for o, s in zip(order.tolist(), top_sims)]
+
+        return pd.DataFrame({
+            "category": category[codes],
+            "confidence": confidence[codes],
+            "scores": [scores[c] for c in codes.tolist()],
+        })
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Categorize a GPT export by embedding similarity")
+    p.add_argument("input", type=Path, help="Excel export (.xlsx)")
+    p.add_argument("--period", default=None, help="Period label")
+    p.add_argument("--model", default=DEFAULT_MODEL, help=f"Sentence-embedding model (default: {DEFAULT_MODEL})")
+    p.add_argument("--cache-dir", type=Path, default=None, help="Vector cache directory")
+    p.add_argument("--batch-size", type=int, default=128)
+    args = p.parse_args()
+
+    keyword = analyze_gpt_data(str(args.input), args.period)
+    categorizer = SemanticCategorizer(args.model, cache_dir=args.cache_dir, batch_size=args.batch_size)
+    start = time.perf_counter()
+    semantic = analyze_gpt_data(str(args.input), args.period, categorizer=categorizer)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.input}: {semantic['summary']['total_gpts_analyzed']:,} GPTs in {elapsed:.1f}s "
+          f"({categorizer.stats['embedded']:,} texts embedded, {len(categorizer.cache):,} cached vectors)")
+    print(f"{'Category':<36}{'keyword':>10}{'semantic':>10}")
+    counts = {name: {c["category"]: c["gpt_count"] for c in result["categories"]}
+              for name, result in (("keyword", keyword), ("semantic", semantic))}
+    for category in CATEGORY_DEFINITIONS:
+        print(f"{category:<36}{counts['keyword'].get(category, 0):>10}{counts['semantic'].get(category, 0):>10}")
+    print(f"Confidence  keyword: {keyword['summary']['confidence_distribution']}")
+    print(f"            semantic: {semantic['summary']['confidence_distribution']}")
+
+
+if __name__ == "__main__":
+    main()
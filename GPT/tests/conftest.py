@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The GPT tools are scripts run from their own folders, not an installed package
+HERE = os.path.dirname(os.path.abspath(__file__))
+for folder in ('Analysis', 'wb'):
+    sys.path.insert(0, os.path.join(HERE, '..', folder))
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+import analyze_gpt_usage as agu
+from gpt_bench import synth_gptdata, write_export
+
+
+@pytest.fixture
+def export(tmp_path, monkeypatch):
+    monkeypatch.setenv('GPTDATA_CACHE_DIR', str(tmp_path / 'cache'))
+    path = tmp_path / 'export.xlsx'
+    write_export(synth_gptdata(400, seed=5), path)
+    return str(path)
+
+
+@pytest.fixture
+def frame_loads(monkeypatch):
+    calls = []
+    load = agu.load_gpt_frame
+
+    def counting(file_path):
+        calls.append(file_path)
+        return load(file_path)
+    monkeypatch.setattr(agu, 'load_gpt_frame', counting)
+    return calls
+
+
+def _without_date(result):
+    # As JSON text, which is what the cache and the service hand out
+    return json.dumps({**result, 'metadata': {k: v for k, v in result['metadata'].items() if k != 'analysis_date'}},
+                      sort_keys=True)
+
+
+def _files(tmp_path, sub=''):
+    return sorted(n for n in os.listdir(tmp_path / 'cache' / 'analyses' / sub) if n != 'frames')
+
+
+def test_cached_analysis_matches_uncached(export, frame_loads):
+    expected = agu.analyze_gpt_data(export, 'December 2025')
+    cold = agu.analyze_gpt_data_cached(export, 'December 2025')
+    warm = agu.analyze_gpt_data_cached(export, 'December 2025')
+    assert _without_date(cold) == _without_date(expected)
+    assert _without_date(warm) == _without_date(expected)
+    assert len(frame_loads) == 2  # analyze_gpt_data, then the cold cached run
+
+
+def test_category_edit_recomputes_only_categorization(export, frame_loads, monkeypatch, tmp_path):
+    before = agu.analyze_gpt_data_cached(export)
+    definitions = {cat: dict(rules) for cat, rules in agu.CATEGORY_DEFINITIONS.items()}
+    definitions['Testing & Training']['keywords'] = definitions['Testing & Training']['keywords'] + ['helper']
+    monkeypatch.setattr(agu, 'CATEGORY_DEFINITIONS', definitions)
+
+    after = agu.analyze_gpt_data_cached(export)
+    assert len(frame_loads) == 1
+    assert after['categories'] != before['categories']
+    # the entry under the old rules is gone, the frame is kept
+    assert len(_files(tmp_path)) == 1
+    assert len(_files(tmp_path, 'frames')) == 1
+
+
+def test_exclusion_edit_reloads_frame_and_prunes(export, frame_loads, monkeypatch, tmp_path):
+    monkeypatch.setattr(agu, 'load_rules', None)
+    agu.analyze_gpt_data_cached(export)
+    monkeypatch.setattr(agu, 'EXCLUSION_PATTERNS', agu.EXCLUSION_PATTERNS + ['assistant'])
+    agu.analyze_gpt_data_cached(export)
+    assert len(frame_loads) == 2
+    assert len(_files(tmp_path)) == 1
+    assert len(_files(tmp_path, 'frames')) == 1
+
+
+def test_other_categorizers_keep_their_entries(export, tmp_path):
+    def by_name_length(names, descriptions):
+        result = agu.categorize_gpts(names, descriptions)
+        result['category'] = ['Long' if len(str(n)) > 20 else 'Short' for n in names]
+        return result
+
+    agu.analyze_gpt_data_cached(export)
+    agu.analyze_gpt_data_cached(export, categorizer=by_name_length)
+    assert len(_files(tmp_path)) == 2
+
+
+def test_missing_descriptions_preview_as_none(export):
+    result = agu.analyze_gpt_data(export)
+    previews = [c['description_preview'] for c in result['all_categorizations']]
+    assert None in previews
+    assert all(p is None or isinstance(p, str) for p in previews)
+    assert 'NaN' not in json.dumps(result, default=str)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analyze_gpt_usage as agu
+from analyze_gpt_usage import categorize_gpt, categorize_gpts, compile_category_matcher
+
+# (name, description) pairs around the edges of the keyword and fallback rules
+CASES = [
+    # missing and empty descriptions
+    ('Email Polisher', None),
+    ('Email Polisher', float('nan')),
+    ('Email Polisher', ''),
+    ('', ''),
+    ('Mystery Box', None),
+    # overlapping keywords: writing/write, summary/summar, transcription/transcript, evaluation/evaluat
+    ('Writing Helper', 'Helps you write and rewrite drafts'),
+    ('Summary Bot', 'Summarizes meeting transcription into notes'),
+    ('Evaluation Buddy', 'evaluation of candidates, evaluates 360 feedback'),
+    ('Web Digger', 'a web digger and finder'),
+    ('Call Notes', 'call notes and interview notes'),
+    # keywords only as parts of longer words (plain substring matching, no word boundaries)
+    ('Latest Contest', 'protest attested'),
+    ('Copywright', 'photocopy'),
+    ('Assess Me', 'assess the candidate'),
+    ('Assessor', 'assessor'),
+    ('Catalog', 'blog-ish dialog'),
+    # keyword that is a suffix of another keyword's prefix: 'intel' in 'intelligence'
+    ('Intelligence', 'intel'),
+    # ties go to the first category in CATEGORY_DEFINITIONS order
+    ('Coach', None),
+    ('Coach', 'leadership coaching'),
+    # case
+    ('EMAIL DRAFTER', 'TRANSLATE'),
+    # fallback rules, in rule order
+    ('Weekly Emailer', None),
+    ('Notes Thing', 'xyz'),
+    ('Finder Keeper', 'xyz'),
+    ('Appraisal', 'xyz'),
+    ('Coach Carter', 'leadership'),
+    ('Coach Carter', 'xyz'),
+    ('Training Wheels', 'xyz'),
+    ('Process Pal', 'xyz'),
+    ('Nothing Here', 'xyz'),
+]
+
+FIXTURE_NAMES = [name for name, _ in CASES]
+FIXTURE_DESCRIPTIONS = [desc for _, desc in CASES]
+
+
+def _reference(names, descriptions):
+    """categorize_gpt row by row; the per-row path takes None for a missing description."""
+    rows = []
+    for name, desc in zip(names, descriptions):
+        desc = desc if isinstance(desc, str) else None
+        result = categorize_gpt(name, desc)
+        rows.append((result['category'], result['confidence'], result['scores']))
+    return rows
+
+
+def _batch(names, descriptions, matcher=None):
+    batch = categorize_gpts(names, descriptions, matcher)
+    return list(zip(batch['category'], batch['confidence'], batch['scores']))
+
+
+def test_matches_per_row_categorizer():
+    assert _batch(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS) == _reference(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS)
+
+
+def test_scores_keep_definition_order():
+    order = list(agu.CATEGORY_DEFINITIONS)
+    for scores in categorize_gpts(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS)['scores']:
+        assert list(scores) == sorted(scores, key=order.index)
+
+
+def test_regex_and_automaton_matchers_agree(monkeypatch):
+    monkeypatch.setattr(agu, 'ahocorasick', None)
+    regex_matcher = compile_category_matcher()
+    assert regex_matcher['automaton'] is None
+    assert _batch(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS, regex_matcher) == _reference(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS)
+
+
+def test_custom_definitions_with_repeated_and_nested_keywords(monkeypatch):
+    definitions = {
+        'A': {'keywords': ['ab', 'abc', 'abc', 'b']},
+        'B': {'keywords': ['bc', 'c', 'abcd']},
+        agu.UNCATEGORIZED: {'keywords': []},
+    }
+    monkeypatch.setattr(agu, 'CATEGORY_DEFINITIONS', definitions)
+    names = ['abcd', 'xbcx', 'zz', 'ABC', 'email me']
+    descriptions = ['c', None, 'ab', 'abcabc', '']
+    assert _batch(names, descriptions, compile_category_matcher(definitions)) == _reference(names, descriptions)
+
+
+def test_index_and_repeats_do_not_matter():
+    names = pd.Series(FIXTURE_NAMES * 3, index=np.arange(len(CASES) * 3)[::-1] + 100)
+    descriptions = pd.Series(FIXTURE_DESCRIPTIONS * 3, index=names.index)
+    assert _batch(names, descriptions) == _reference(FIXTURE_NAMES, FIXTURE_DESCRIPTIONS) * 3
+
+
+def test_empty_input():
+    result = categorize_gpts([], [])
+    assert list(result.columns) == ['category', 'confidence', 'scores']
+    assert len(result) == 0
+
+
+@pytest.mark.parametrize('desc', [None, float('nan')])
+def test_missing_description_counts_as_empty(desc):
+    assert _batch(['Research Desk'], [desc]) == _batch(['Research Desk'], [''])
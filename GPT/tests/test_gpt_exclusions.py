@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from analyze_gpt_usage import should_exclude
+from gpt_exclusions import ExclusionEngine, _parse_rule, load_rules
+
+NAMES = [
+    'Company Smart Pack', 'smartpack v2', 'Smart-Pack', 'smart\npack',
+    'Person\nSmart Thing', 'Smart\ncompany', 'Company Smart', 'Smarty',
+    'Candidate Letter Generator', 'candidate letter', 'CANDIDATE LETTER v3',
+    'Psychometric Report Writing', 'psychometric stylist', 'Prompt Coach Pro',
+    'Executive Assessment Advisor', 'Consultant Finder', 'Candidate Archetype',
+    'Email Polisher', '', 'a\nb',
+]
+
+
+def test_analyzer_profile_matches_should_exclude():
+    res = load_rules('analyzer').evaluate(pd.Series(NAMES))
+    expected = [should_exclude(name) for name in NAMES]
+    assert res['excluded'].tolist() == [e['excluded'] for e in expected]
+    reasons = res['exclude_reason'].astype(object).where(res['excluded'], None).tolist()
+    assert reasons == [e['reason'] for e in expected]
+
+
+def test_regex_rules_match_across_newlines():
+    engine = ExclusionEngine([_parse_rule({'code': 'x', 'reason': 'X', 'regex': 'alpha.*beta'})])
+    texts = ['alpha\nbeta', 'ALPHA beta', 'beta alpha']
+    assert engine.evaluate(pd.Series(texts))['excluded'].tolist() == [True, True, False]
+    rule = engine.rules[0]
+    assert [bool(rule.regex.search(t)) for t in texts] == [True, True, False]
+
+
+@pytest.mark.parametrize('profile', ['monthly', 'mom', 'analyzer'])
+def test_repeat_calls_use_memo_consistently(profile):
+    engine = load_rules(profile)
+    names = pd.Series(NAMES * 2)
+    descriptions = pd.Series(['psych eval', None] * len(NAMES))
+    first = engine.evaluate(names, descriptions)
+    pd.testing.assert_frame_equal(engine.evaluate(names, descriptions), first)
+
+
+def test_memo_is_bounded():
+    engine = ExclusionEngine([_parse_rule({'code': 'x', 'reason': 'X', 'contains': 'smart'})], memo_size=10)
+    for start in range(0, 100, 7):
+        names = pd.Series([f'smart {i}' if i % 2 else f'gpt {i}' for i in range(start, start + 7)])
+        assert engine.evaluate(names)['excluded'].tolist() == [bool(i % 2) for i in range(start, start + 7)]
+        assert len(engine._memo) <= 10
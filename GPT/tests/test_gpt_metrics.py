@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import gpt_metrics
+from gpt_metrics import (SEGMENT_BINS, SEGMENT_ORDER, USAGE_TIER_EDGES, USAGE_TIER_LABELS, bin_values,
+                         concentration, top_shares)
+
+
+def _reference(values, ks):
+    """The full-sort formulas concentration() must agree with."""
+    x = np.sort(np.asarray(values, dtype=np.float64))
+    n, total = len(x), x.sum()
+    out = {f'top{k}_share': x[max(n - k, 0):].sum() / total if total > 0 else 0.0 for k in ks}
+    if n and total > 0:
+        out['gini'] = 2 * np.dot(np.arange(1, n + 1), x) / (n * total) - (n + 1) / n
+        out['hhi'] = np.square(x / total).sum()
+    else:
+        out['gini'] = out['hhi'] = 0.0
+    return out
+
+
+CASES = [
+    np.random.default_rng(0).zipf(1.8, 5000) - 1,
+    np.random.default_rng(1).integers(0, 50, 37),
+    np.array([7, 7, 7, 7, 7, 7]),
+    np.array([0, 0, 12, 0]),
+    np.array([3, 1]),
+    np.zeros(4, dtype=np.int64),
+    np.array([], dtype=np.int64),
+]
+
+
+@pytest.mark.parametrize('values', CASES)
+def test_concentration_matches_full_sort(values):
+    ks = (10, 5, 1, 0, 50)
+    got, expected = concentration(values, ks=ks), _reference(values, ks)
+    assert list(got) == list(expected)
+    for key, value in expected.items():
+        assert got[key] == pytest.approx(value, abs=1e-12), key
+
+
+@pytest.mark.parametrize('values', CASES)
+def test_top_shares_without_gini_skip_the_sort(values, monkeypatch):
+    expected = _reference(values, (10, 5))
+    monkeypatch.setattr(gpt_metrics.np, 'sort', None)  # fails if anything sorts fully
+    got = concentration(values, ks=(10, 5), with_gini=False)
+    assert 'gini' not in got
+    assert got == pytest.approx({k: v for k, v in expected.items() if k != 'gini'}, abs=1e-12)
+
+
+def test_top_shares_match_argpartition():
+    values = np.random.default_rng(2).integers(0, 10_000, 1000)
+    for k in (1, 5, 10, 999, 1000, 2000):
+        top = values[np.argpartition(values, max(len(values) - k, 0))[max(len(values) - k, 0):]]
+        assert top_shares(values, (k,))[k] == pytest.approx(top.sum() / values.sum())
+
+
+def test_bin_values_match_pd_cut():
+    values = np.array([0, 1, 9, 10, 99, 100, 999, 1000, 10 ** 6])
+    expected = pd.cut(values, [-np.inf, *USAGE_TIER_EDGES, np.inf], right=False, labels=USAGE_TIER_LABELS)
+    assert list(bin_values(values)) == list(expected.astype(str))
+
+
+def test_polars_segments_match_pd_cut():
+    pl = pytest.importorskip('polars')
+    from gpt_lazy import _segment
+
+    gpts = np.arange(1, 40)
+    expected = pd.cut(gpts, SEGMENT_BINS, labels=SEGMENT_ORDER).astype(str)
+    got = pl.DataFrame({'gpts': gpts}).select(_segment(pl.col('gpts')).alias('s'))['s'].to_list()
+    assert got == list(expected)
+    assert pl.DataFrame({'gpts': [0]}).select(_segment(pl.col('gpts')).alias('s'))['s'].to_list() == [None]
+
+
+def test_report_segments_match_between_backends():
+    pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+    from gpt_bench import synth_gptdata
+    from gpt_exclusions import load_rules
+    from gpt_lazy import polars_report_frames
+    from GPTMonthlyv2 import pandas_report_frames
+
+    df = synth_gptdata(2000, seed=4)
+    rules = load_rules('monthly')
+    pandas_frames, polars_frames = pandas_report_frames(df, rules), polars_report_frames(df, rules)
+    assert list(pandas_frames.creator_segments['segment']) == [
+        s for s in SEGMENT_ORDER if s in set(pandas_frames.creator_detail['segment'])]
+    pd.testing.assert_frame_equal(pandas_frames.creator_segments, polars_frames.creator_segments,
+                                  check_dtype=False, check_index_type=False)
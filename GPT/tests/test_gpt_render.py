@@ -0,0 +1,104 @@
+import pytest
+from openpyxl import load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+
+import gpt_render
+from gpt_bench import synth_gptdata, write_export
+from gpt_profile import StageProfiler
+from gpt_render import SheetJob, render_workbook
+from GPTMonthlyv2 import _named_style, build_report
+
+
+def _summary(wb, rows):
+    ws = wb.create_sheet('Summary')
+    ws['A1'] = 'Summary'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:C1')
+    for i, (name, value) in enumerate(rows, start=2):
+        ws.cell(row=i, column=1, value=name).fill = PatternFill('solid', fgColor='E0E0E0')
+        ws.cell(row=i, column=2, value=value).number_format = '#,##0'
+    ws.column_dimensions['A'].width = 30
+    ws.freeze_panes = 'A2'
+
+
+def _data(wb, n):
+    ws = wb.create_sheet('Data')
+    style = _named_style(wb, 'report_cell #,##0', number_format='#,##0')
+    for i in range(n):
+        cell = WriteOnlyCell(ws, value=i * 1000)
+        cell.style = style
+        ws.append([f'gpt {i}', cell])
+    ws.append([])
+    ws.append(['total', n])
+
+
+JOBS = [SheetJob('Summary', _summary, ([('alpha', 1234), ('beta', 5678)],)),
+        SheetJob('Data', _data, (50,), write_only=True)]
+
+
+def _cells(path):
+    wb = load_workbook(path)
+    out = {}
+    for ws in wb.worksheets:
+        out[ws.title] = (
+            sorted(str(r) for r in ws.merged_cells.ranges), ws.freeze_panes,
+            {k: d.width for k, d in ws.column_dimensions.items()},
+            [(c.coordinate, c.value, c.font.b, c.font.sz, c.fill.fgColor.rgb, c.number_format, c.style,
+              c.alignment.horizontal, c.border.left.style)
+             for row in ws.iter_rows() for c in row if c.value is not None or c.has_style],
+        )
+    return out
+
+
+def test_parallel_matches_in_process(tmp_path):
+    render_workbook(JOBS, tmp_path / 'serial.xlsx')
+    render_workbook(JOBS, tmp_path / 'parallel.xlsx', workers=2)
+    assert _cells(tmp_path / 'serial.xlsx') == _cells(tmp_path / 'parallel.xlsx')
+
+
+def test_report_matches_in_process(tmp_path):
+    pytest.importorskip('pyarrow')
+    export = tmp_path / 'export.xlsx'
+    write_export(synth_gptdata(400, seed=5), export)
+    build_report(export, tmp_path / 'serial.xlsx', use_cache=False)
+    build_report(export, tmp_path / 'parallel.xlsx', use_cache=False, workers=3)
+    serial, parallel = _cells(tmp_path / 'serial.xlsx'), _cells(tmp_path / 'parallel.xlsx')
+    assert list(serial) == ['Dashboard', 'Insights', 'Data_Clean', 'Excluded_Rows', 'Creator_Detail']
+    assert serial == parallel
+
+
+def test_unsupported_openpyxl_renders_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(gpt_render, 'PARTS_OPENPYXL', ('0.',))
+    monkeypatch.setattr(gpt_render, 'ProcessPoolExecutor', None)  # fails if the pool is used
+    assert not gpt_render.parts_supported()
+    render_workbook(JOBS, tmp_path / 'fallback.xlsx', workers=2)
+    render_workbook(JOBS, tmp_path / 'serial.xlsx')
+    assert _cells(tmp_path / 'fallback.xlsx') == _cells(tmp_path / 'serial.xlsx')
+
+
+def test_sheet_stages_are_profiled(tmp_path):
+    serial, parallel = StageProfiler(trace_memory=False), StageProfiler(trace_memory=False)
+    with serial.activate():
+        render_workbook(JOBS, tmp_path / 'serial.xlsx')
+    with parallel.activate():
+        render_workbook(JOBS, tmp_path / 'parallel.xlsx', workers=2)
+
+    assert [r.path for r in serial.records] == ['Summary', 'Data', 'save']
+    paths = {r.path: r for r in parallel.records}
+    assert set(paths) == {'render', 'render/Summary', 'render/Data', 'assemble'}
+    render = paths['render']
+    for name in ('render/Summary', 'render/Data'):
+        sheet = paths[name]
+        assert sheet.depth == 1 and sheet.tid not in (0, None)
+        assert render.start_s - 0.05 <= sheet.start_s <= render.start_s + render.wall_s
+    events = {e['args']['path']: e['tid'] for e in parallel.as_dict()['traceEvents']}
+    assert events['render/Data'] == paths['render/Data'].tid and events['render'] == 0
+
+
+def test_job_must_add_one_sheet(tmp_path):
+    bad = [SheetJob('Other', _summary, ([],))]
+    with pytest.raises(ValueError, match='Other'):
+        render_workbook(bad, tmp_path / 'bad.xlsx')
+    with pytest.raises(ValueError, match='Other'):
+        gpt_render.render_sheet(bad[0])
@@ -0,0 +1,85 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+
+import gpt_service
+from gpt_bench import synth_gptdata, write_export
+from gpt_service import AnalyzerService
+
+BOUNDARY = 'testboundary'
+
+
+def _multipart(fields):
+    parts = []
+    for name, (filename, data) in fields.items():
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else '')
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n'.encode() + data + b'\r\n')
+    return b''.join(parts) + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def _request(app, method, path, body=b''):
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+             'headers': [(b'content-type', f'multipart/form-data; boundary={BOUNDARY}'.encode())]}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'], parse_constant=_reject)
+
+
+def _reject(token):
+    raise ValueError(f'Not strict JSON: {token}')
+
+
+def test_non_utf8_field_is_a_bad_request(tmp_path):
+    app = AnalyzerService(store_dir=tmp_path, workers=1)
+    body = _multipart({'file': ('export.xlsx', b'not really a workbook'), 'period': (None, b'D\xe9cembre 2025')})
+    status, payload = _request(app, 'POST', '/analyze', body)
+    assert status == 400
+    assert 'period' in payload['error']
+
+
+def test_missing_file_is_a_bad_request(tmp_path):
+    app = AnalyzerService(store_dir=tmp_path, workers=1)
+    status, payload = _request(app, 'POST', '/analyze', _multipart({'period': (None, b'December 2025')}))
+    assert status == 400
+
+
+def test_module_app_is_built_on_first_access(monkeypatch, tmp_path):
+    module = importlib.reload(gpt_service)
+    assert module._app is None
+    monkeypatch.setenv('GPT_SERVICE_DIR', str(tmp_path))
+    assert module.app.store_dir == tmp_path
+    assert module.app is module.app
+
+
+def test_missing_descriptions_round_trip_as_strict_json(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setenv('GPTDATA_CACHE_DIR', str(tmp_path / 'cache'))
+    export = tmp_path / 'export.xlsx'
+    write_export(synth_gptdata(300, seed=7), export)
+    app = AnalyzerService(store_dir=tmp_path / 'store', workers=1)
+    try:
+        status, payload = _request(app, 'POST', '/analyze', _multipart({'file': ('export.xlsx', export.read_bytes())}))
+    finally:
+        app.close()
+    assert status == 200
+    assert None in [c['description_preview'] for c in payload['all_categorizations']]
+
+
+def test_non_finite_values_are_sent_as_null(tmp_path):
+    app = AnalyzerService(store_dir=tmp_path, workers=1)
+
+    async def analyze(data, period, filename='upload.xlsx'):
+        return {'metadata': {}, 'scores': [1.5, float('nan')], 'nested': {'ratio': float('inf')}}
+    app.analyze = analyze
+    status, payload = _request(app, 'POST', '/analyze', _multipart({'file': ('export.xlsx', b'xlsx')}))
+    assert status == 200
+    assert payload == {'metadata': {}, 'scores': [1.5, None], 'nested': {'ratio': None}}
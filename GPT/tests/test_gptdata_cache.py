@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from gpt_bench import synth_gptdata, write_export
+from gptdata_cache import read_gptdata
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'export.xlsx'
+    write_export(synth_gptdata(300, seed=3), path)
+    return path
+
+
+def test_cached_reads_match_excel(export, tmp_path):
+    expected = read_gptdata(export, use_cache=False)
+    cold = read_gptdata(export, cache_dir=tmp_path / 'cache')
+    warm = read_gptdata(export, cache_dir=tmp_path / 'cache')
+    pd.testing.assert_frame_equal(cold, expected)
+    pd.testing.assert_frame_equal(warm, expected)
+
+
+def test_warm_frame_can_be_reassigned(export, tmp_path):
+    read_gptdata(export, cache_dir=tmp_path / 'cache')
+    df = read_gptdata(export, cache_dir=tmp_path / 'cache')
+    df['messages_workspace'] = df['messages_workspace'].where(df['is_active'] == 1, 0) + 1
+    assert (df['messages_workspace'] >= 1).all()
+
+
+def test_missing_sheet(export, tmp_path):
+    with pytest.raises(ValueError, match='Nope'):
+        read_gptdata(export, sheet_name='Nope', cache_dir=tmp_path / 'cache')
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+import semantic_categorizer
+from semantic_categorizer import SemanticCategorizer, VectorCache
+
+NAMES = ['Email Polisher', 'Meeting Notes Bot', 'Company Research Desk', 'Python Helper']
+DESCRIPTIONS = ['polish emails', None, 'research companies', 'write python']
+
+
+def hashed_embed(dim):
+    """Deterministic bag-of-characters embedding of length dim."""
+    def embed(texts):
+        out = np.zeros((len(texts), dim))
+        for i, text in enumerate(texts):
+            for ch in text.lower():
+                out[i, ord(ch) % dim] += 1
+        return out
+    return embed
+
+
+def test_custom_embedders_get_their_own_cache_and_fingerprint(tmp_path):
+    small = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars8')
+    large = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(16), embed_name='chars16')
+    small(NAMES, DESCRIPTIONS)
+    large(NAMES, DESCRIPTIONS)
+    assert small.cache.path != large.cache.path
+    assert small.fingerprint != large.fingerprint
+    assert ':8:' in small.fingerprint and ':16:' in large.fingerprint
+
+
+def test_custom_embedder_does_not_share_the_model_cache(tmp_path):
+    custom = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8))
+    assert custom.embedder.startswith('custom:')
+    assert custom.cache.path.name != f"{semantic_categorizer.DEFAULT_MODEL.replace('/', '_')}.npz"
+    assert 'all-MiniLM' not in custom.fingerprint
+
+
+def test_cache_of_another_dimension_is_discarded(tmp_path):
+    SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')(NAMES, DESCRIPTIONS)
+    wider = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(16), embed_name='chars')
+    result = wider(NAMES, DESCRIPTIONS)
+    assert len(result) == len(NAMES)
+    assert VectorCache(wider.cache.path, 'chars').dimension == 16
+
+
+def test_cache_from_another_embedder_is_ignored(tmp_path):
+    first = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')
+    first(NAMES, DESCRIPTIONS)
+    assert len(VectorCache(first.cache.path, 'something else')) == 0
+
+
+def test_results_are_stable_across_cache_reuse(tmp_path):
+    cold = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')(NAMES, DESCRIPTIONS)
+    warm_categorizer = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')
+    warm = warm_categorizer(NAMES, DESCRIPTIONS)
+    assert warm_categorizer.stats['embedded'] == 0
+    assert cold['category'].tolist() == warm['category'].tolist()
+
+
+def test_one_cache_write_per_call(tmp_path, monkeypatch):
+    saves = []
+    save = VectorCache.save
+    monkeypatch.setattr(VectorCache, 'save', lambda self: (saves.append(self.dirty), save(self)))
+    categorizer = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')
+    categorizer(NAMES, DESCRIPTIONS)
+    assert saves == [True]
+
+
+@pytest.mark.parametrize('dim', [8, 16])
+def test_fingerprint_dimension_without_cached_vectors(tmp_path, dim):
+    assert SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(dim)).dimension == dim
+
+
+CUSTOM = {
+    'Writing': {'description': 'emails and documents', 'keywords': ['email', 'polish', 'notes']},
+    'Code': {'description': 'programming help', 'keywords': ['python', 'code']},
+}
+
+
+def test_definitions_are_part_of_the_fingerprint(tmp_path):
+    from analyze_gpt_usage import analysis_fingerprint
+
+    default = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars')
+    custom = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars', definitions=CUSTOM)
+    edited = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars',
+                                 definitions={**CUSTOM, 'Code': {**CUSTOM['Code'], 'keywords': ['sql']}})
+    assert len({default.fingerprint, custom.fingerprint, edited.fingerprint}) == 3
+    assert analysis_fingerprint(default) != analysis_fingerprint(custom)
+
+
+def test_seeds_come_from_the_categorizer_definitions(tmp_path, monkeypatch):
+    categorizer = SemanticCategorizer(cache_dir=tmp_path, embed=hashed_embed(8), embed_name='chars',
+                                      definitions=CUSTOM)
+    seen = []
+    centroids = categorizer.centroids
+
+    def spy(vectors=None, seed_categories=None, save=True):
+        seen.append(seed_categories)
+        return centroids(vectors, seed_categories, save)
+    monkeypatch.setattr(categorizer, 'centroids', spy)
+    names = ['Polish Email Notes Writer', 'Python Code Helper']
+    result = categorizer(names, ['polish email notes', 'python code'])
+    seeds = {s for s in seen[0] if s is not None}
+    assert seeds and seeds <= set(CUSTOM)
+    assert set(result['category']) <= set(CUSTOM) | {semantic_categorizer.UNCATEGORIZED}
@@ -4,13 +4,29 @@ GPT Monthly Usage Report Generator
 
 Usage:
   python gpt_monthly_report.py input.xlsx --out GPT_Monthly_Report.xlsx
+  python gpt_monthly_report.py input.xlsx --history gpt_history.db --months 12
+
+  With --history, the input is ingested into the local history store (see
+  gpt_history.py) and the report covers the latest --months periods in it.
+  Creator stats then come from the store's creator index instead of being
+  regrouped from the month's rows.
+
+  --profile prints wall time, CPU time and tracemalloc peak per stage (load,
+  split, metrics, each sheet) and writes a JSON trace (see gpt_profile.py).
+
+  --backend polars computes the report frames as one lazy polars plan (see
+  gpt_lazy.py) instead of eager pandas; the workbook is the same.
+
+  --workers N renders the sheets in N processes and assembles the workbook
+  from their parts (see gpt_render.py); the default renders them in-process.
 
 Assumptions:
   - Input workbook contains a sheet named "GPTData" with these columns:
       cadence, period_start, period_end, gpt_name, config_type, gpt_description, is_active,
       first_day_active_in_period, last_day_active_in_period, messages_workspace,
       unique_messagers_workspace, gpt_creator_email
-  - The report excludes any rows whose GPT name or description matches:
+  - The report excludes any rows matched by the "monthly" profile in
+    exclusion_rules.json (see gpt_exclusions.py). By default, GPT name or description matching:
       - smart[ -]?pack                 (Smart Pack GPTs)
       - \\bpsych                       (psychometric / psychology-related assessments)
       - exact GPT name: Candidate Letter Generator
@@ -19,20 +35,27 @@ Assumptions:
 from __future__ import annotations
 
 import argparse
-import re
+from contextlib import nullcontext
+from copy import copy
 from pathlib import Path
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
-from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import ColorScaleRule, CellIsRule
 
+from gptdata_cache import read_gptdata
+from gpt_exclusions import ExclusionEngine, load_rules
+from gpt_history import ingest_export, load_creator_index, load_history
+from gpt_lazy import ReportFrames, polars_report_frames
+from gpt_metrics import (SEGMENT_BINS, SEGMENT_ORDER, USAGE_TIER_EDGES, USAGE_TIER_LABELS, bin_values,
+                         concentration)
+from gpt_profile import StageProfiler, profiled, stage
+from gpt_render import SheetJob, render_workbook
 
-DEFAULT_SMART_RE = re.compile(r"smart[\s\-]*pack", re.I)
-DEFAULT_PSYCH_RE = re.compile(r"\bpsych", re.I)
-CANDIDATE_LETTER_NAME = "candidate letter generator"
 
 # Color scheme
 HEADER_FILL = PatternFill("solid", fgColor="1F4E78")
@@ -50,28 +73,21 @@ BORDER_THIN = Border(
 )
 
 
-def load_gptdata(path: Path) -> pd.DataFrame:
-    return pd.read_excel(path, sheet_name="GPTData", engine="openpyxl")
+def load_gptdata(path: Path, use_cache: bool = True) -> pd.DataFrame:
+    return read_gptdata(path, sheet_name="GPTData", use_cache=use_cache)
 
 
-def split_clean_excluded(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+@profiled("split")
+def split_clean_excluded(df: pd.DataFrame, rules: ExclusionEngine | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
     df = df.copy()
     df["gpt_name"] = df.get("gpt_name", "").fillna("").astype(str)
     df["gpt_description"] = df.get("gpt_description", "").fillna("").astype(str)
 
-    combined = (df["gpt_name"] + " " + df["gpt_description"]).astype(str)
-
-    ex_smart = combined.str.contains(DEFAULT_SMART_RE)
-    ex_psych = combined.str.contains(DEFAULT_PSYCH_RE)
-    ex_candidate = df["gpt_name"].str.strip().str.lower().eq(CANDIDATE_LETTER_NAME)
-
-    exclude = ex_smart | ex_psych | ex_candidate
+    res = (rules or load_rules("monthly")).evaluate(df["gpt_name"], df["gpt_description"])
+    exclude = res["excluded"]
 
     df["excluded"] = exclude
-    df["exclude_reason"] = ""
-    df.loc[ex_smart, "exclude_reason"] = "Smart Pack"
-    df.loc[~ex_smart & ex_psych, "exclude_reason"] = "Psychometric"
-    df.loc[~ex_smart & ~ex_psych & ex_candidate, "exclude_reason"] = "Candidate Letter Generator"
+    df["exclude_reason"] = res["exclude_reason"].cat.add_categories("").fillna("")
 
     df_clean = df.loc[~exclude].copy()
     df_excl = df.loc[exclude].copy()
@@ -102,6 +118,77 @@ def _autosize(ws, max_width: int = 60, min_width: int = 8) -> None:
         ws.column_dimensions[col_letter].width = max(min(max_len + 2, max_width), min_width)
 
 
+def _column_widths(df: pd.DataFrame, max_width: int = 60, min_width: int = 8) -> list[float]:
+    """Same widths as _autosize, computed from vectorized string lengths instead of cells."""
+    widths = []
+    for col_name in df.columns:
+        s = df[col_name].dropna()
+        max_len = len(str(col_name))
+        if len(s):
+            if pd.api.types.is_datetime64_any_dtype(s):
+                # str(Timestamp) is 19 chars, 26 with sub-second precision
+                lens = np.where(s.dt.microsecond.to_numpy() != 0, 26, 19)
+            else:
+                lens = s.astype(str).str.len().to_numpy()
+            max_len = max(max_len, int(lens.max()))
+        widths.append(max(min(max_len + 2, max_width), min_width))
+    return widths
+
+
+def _named_style(wb, name: str, number_format: str | None = None, header: bool = False) -> str:
+    """Register a shared named style once per workbook and return its name."""
+    if name not in wb.named_styles:
+        style = NamedStyle(name=name, border=BORDER_THIN)
+        if header:
+            style.font = Font(bold=True)
+            style.fill = PatternFill("solid", fgColor="E0E0E0")
+            style.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        else:
+            style.alignment = Alignment(vertical="center")
+        if number_format:
+            style.number_format = number_format
+        wb.add_named_style(style)
+    return name
+
+
+def _stream_df(wb, title: str, df: pd.DataFrame, format_numbers: dict | None = None) -> None:
+    """
+    Write a full-size table to a write-only workbook, one row at a time. Cells take a
+    per-column shared named style instead of individual border/alignment/format objects.
+    """
+    ws = wb.create_sheet(title)
+    for j, width in enumerate(_column_widths(df), start=1):
+        ws.column_dimensions[get_column_letter(j)].width = width
+    ws.freeze_panes = "A2"
+
+    header_style = _named_style(wb, "report_header", header=True)
+    header = []
+    for col_name in df.columns:
+        cell = WriteOnlyCell(ws, value=col_name)
+        cell.style = header_style
+        header.append(cell)
+    ws.append(header)
+
+    # One styled template cell per column; data cells copy its style array
+    templates = []
+    for col_name in df.columns:
+        fmt = (format_numbers or {}).get(col_name)
+        if fmt is None and pd.api.types.is_datetime64_any_dtype(df[col_name]):
+            fmt = "yyyy-mm-dd h:mm:ss"  # what openpyxl assigns to datetime cells
+        cell = WriteOnlyCell(ws)
+        cell.style = _named_style(wb, f"report_cell {fmt}" if fmt else "report_cell", number_format=fmt)
+        templates.append(cell._style)
+
+    for row_data in df.itertuples(index=False, name=None):
+        row = []
+        for value, style in zip(row_data, templates):
+            cell = WriteOnlyCell(ws)
+            cell._style = copy(style)
+            cell.value = value
+            row.append(cell)
+        ws.append(row)
+
+
 def _style_header_row(ws, row_num: int, num_cols: int) -> None:
     for col in range(1, num_cols + 1):
         cell = ws.cell(row=row_num, column=col)
@@ -163,6 +250,7 @@ def _write_df(ws, df: pd.DataFrame, start_row: int = 1, start_col: int = 1,
     return next_row
 
 
+@profiled("trends")
 def calculate_trend_metrics(df_clean: pd.DataFrame, latest_period: str) -> dict:
     """Calculate month-over-month trends."""
     periods = sorted(df_clean["period_key"].dropna().unique())
@@ -196,22 +284,12 @@ def calculate_trend_metrics(df_clean: pd.DataFrame, latest_period: str) -> dict:
     return metrics
 
 
-def get_usage_tiers(live: pd.DataFrame) -> pd.DataFrame:
-    """Categorize GPTs into usage tiers."""
-    def categorize(messages):
-        if messages == 0:
-            return "Zero Usage"
-        elif messages < 10:
-            return "Low (1-9)"
-        elif messages < 100:
-            return "Medium (10-99)"
-        elif messages < 1000:
-            return "High (100-999)"
-        else:
-            return "Very High (1000+)"
-    
+@profiled("usage_tiers")
+def get_usage_tiers(live: pd.DataFrame, edges=USAGE_TIER_EDGES, labels=USAGE_TIER_LABELS) -> pd.DataFrame:
+    """Categorize GPTs into usage tiers (labels[i] from edges[i-1] messages, see gpt_metrics.bin_values)."""
     live = live.copy()
-    live["usage_tier"] = live["messages_workspace"].apply(categorize)
+    live["usage_tier"] = pd.Series(bin_values(live["messages_workspace"].to_numpy(), edges, labels),
+                                   index=live.index, dtype="str")
     
     tier_summary = live.groupby("usage_tier").agg(
         gpt_count=("gpt_name", "nunique"),
@@ -221,34 +299,33 @@ def get_usage_tiers(live: pd.DataFrame) -> pd.DataFrame:
     ).reset_index()
     
     # Order tiers logically
-    tier_order = ["Zero Usage", "Low (1-9)", "Medium (10-99)", "High (100-999)", "Very High (1000+)"]
-    tier_summary["sort_key"] = tier_summary["usage_tier"].map({t: i for i, t in enumerate(tier_order)})
+    tier_summary["sort_key"] = tier_summary["usage_tier"].map({t: i for i, t in enumerate(labels)})
     tier_summary = tier_summary.sort_values("sort_key").drop("sort_key", axis=1)
     
     return tier_summary
 
 
-def get_creator_segments(live: pd.DataFrame) -> pd.DataFrame:
-    """Analyze creator segments."""
-    creator_stats = live.groupby("gpt_creator_email").agg(
-        gpts_created=("gpt_name", "nunique"),
-        total_messages=("messages_workspace", "sum"),
-        total_users=("unique_messagers_workspace", "sum"),
-        avg_messages_per_gpt=("messages_workspace", "mean"),
-        max_messages_single_gpt=("messages_workspace", "max")
-    ).reset_index()
-    
-    def segment(row):
-        if row["gpts_created"] == 1:
-            return "Single GPT"
-        elif row["gpts_created"] <= 3:
-            return "Small Portfolio (2-3)"
-        elif row["gpts_created"] <= 10:
-            return "Medium Portfolio (4-10)"
-        else:
-            return "Power Creator (10+)"
+def creator_index_for(creator_index: pd.DataFrame | None, period: str) -> pd.DataFrame | None:
+    """One month's rows of a load_creator_index frame, or None when that month isn't in it."""
+    if creator_index is None or period not in set(creator_index["period_key"]):
+        return None
+    return creator_index[creator_index["period_key"] == period].drop(columns="period_key").reset_index(drop=True)
+
+
+@profiled("creator_segments")
+def get_creator_segments(live: pd.DataFrame, creator_stats: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Analyze creator segments. Pass creator_stats (e.g. from the creator index) to skip regrouping live."""
+    if creator_stats is None:
+        creator_stats = live.groupby("gpt_creator_email").agg(
+            gpts_created=("gpt_name", "nunique"),
+            total_messages=("messages_workspace", "sum"),
+            total_users=("unique_messagers_workspace", "sum"),
+            avg_messages_per_gpt=("messages_workspace", "mean"),
+            max_messages_single_gpt=("messages_workspace", "max")
+        ).reset_index()
     
-    creator_stats["segment"] = creator_stats.apply(segment, axis=1)
+    creator_stats["segment"] = pd.cut(creator_stats["gpts_created"], SEGMENT_BINS,
+                                      labels=SEGMENT_ORDER).astype(str)
     
     segment_summary = creator_stats.groupby("segment").agg(
         creators=("gpt_creator_email", "count"),
@@ -258,126 +335,70 @@ def get_creator_segments(live: pd.DataFrame) -> pd.DataFrame:
     ).reset_index()
     
     # Order segments
-    seg_order = ["Single GPT", "Small Portfolio (2-3)", "Medium Portfolio (4-10)", "Power Creator (10+)"]
-    segment_summary["sort_key"] = segment_summary["segment"].map({s: i for i, s in enumerate(seg_order)})
+    segment_summary["sort_key"] = segment_summary["segment"].map({s: i for i, s in enumerate(SEGMENT_ORDER)})
     segment_summary = segment_summary.sort_values("sort_key").drop("sort_key", axis=1)
     
     return segment_summary, creator_stats
 
 
-def build_report(input_path: Path, out_path: Path) -> None:
-    df = load_gptdata(input_path)
-    df_clean, df_excl = split_clean_excluded(df)
+def pandas_report_frames(df: pd.DataFrame, rules: ExclusionEngine,
+                         creator_index: pd.DataFrame | None = None) -> ReportFrames:
+    df_clean, df_excl = split_clean_excluded(df, rules)
 
     # Get periods
     periods = sorted(df_clean["period_key"].dropna().unique())
     if not periods:
         raise ValueError("No valid periods found in data")
-    
-    latest_period = periods[-1]
-    prev_period = periods[-2] if len(periods) > 1 else None
-    
+
     # Calculate trends
-    trend_metrics = calculate_trend_metrics(df_clean, latest_period)
-    
+    trend_metrics = calculate_trend_metrics(df_clean, periods[-1])
+
+    # Period KPIs cover the latest period only (multi-month inputs feed the Trends sheet)
+    current = df_clean[df_clean["period_key"] == periods[-1]]
+
     # Split live/draft
-    live = df_clean[df_clean["config_type"].astype(str).str.lower() == "live"].copy()
-    draft = df_clean[df_clean["config_type"].astype(str).str.lower() == "draft"].copy()
-    
-    # Core metrics
-    tot_live_messages = int(live["messages_workspace"].sum())
-    tot_all_messages = int(df_clean["messages_workspace"].sum())
-    tot_draft_messages = int(draft["messages_workspace"].sum())
-    
-    gpts_with_usage_live = int((live["messages_workspace"] > 0).sum())
-    gpts_with_usage_all = int((df_clean["messages_workspace"] > 0).sum())
-    total_live_gpts = len(live)
-    
-    # Concentration metrics
-    top5_live = live.sort_values("messages_workspace", ascending=False).head(5)
-    top5_share = (top5_live["messages_workspace"].sum() / tot_live_messages) if tot_live_messages else 0.0
-    
-    top10_live = live.sort_values("messages_workspace", ascending=False).head(10)
-    top10_share = (top10_live["messages_workspace"].sum() / tot_live_messages) if tot_live_messages else 0.0
-    
-    draft_share = float(tot_draft_messages / tot_all_messages) if tot_all_messages else 0.0
-    
-    # Engagement metrics
-    live["messages_per_user"] = (live["messages_workspace"] / live["unique_messagers_workspace"].replace(0, pd.NA)).fillna(0)
-    avg_engagement = live[live["messages_workspace"] > 0]["messages_per_user"].mean()
-    
-    # Usage tiers
-    usage_tiers = get_usage_tiers(live)
-    
-    # Creator analysis
-    creator_segments, creator_detail = get_creator_segments(live)
-    
-    # Top performers
-    top10 = (
-        live.sort_values("messages_workspace", ascending=False)
-        .head(10)[["gpt_name", "messages_workspace", "unique_messagers_workspace", 
-                   "messages_per_user", "gpt_creator_email"]]
-        .rename(
-            columns={
-                "messages_workspace": "messages",
-                "unique_messagers_workspace": "unique_users",
-                "messages_per_user": "msgs_per_user",
-                "gpt_creator_email": "creator_email",
-            }
-        )
-    )
-    
-    top10["share_of_total"] = top10["messages"] / tot_live_messages
-    
-    # Top creators
-    creator_summary = (
-        live.groupby("gpt_creator_email")
-        .agg(gpts=("gpt_name", "nunique"), 
-             messages=("messages_workspace", "sum"),
-             users=("unique_messagers_workspace", "sum"))
-        .reset_index()
-        .rename(columns={"gpt_creator_email": "creator_email"})
-        .sort_values("messages", ascending=False)
-        .head(10)
-    )
-    
-    # Rising stars (new GPTs with high usage)
-    if trend_metrics["has_trend"]:
-        prev_live = df_clean[(df_clean["period_key"] == trend_metrics["prev_period"]) & 
-                            (df_clean["config_type"].astype(str).str.lower() == "live")]
-        prev_gpts = set(prev_live["gpt_name"])
-        new_gpts = live[~live["gpt_name"].isin(prev_gpts)]
-        rising_stars = new_gpts.nlargest(5, "messages_workspace")[["gpt_name", "messages_workspace", "gpt_creator_email"]]
-    else:
-        rising_stars = pd.DataFrame()
-    
-    # Create workbook
-    wb = Workbook()
-    wb.remove(wb.active)
-    
-    # ===== DASHBOARD SHEET =====
+    live = current[current["config_type"].astype(str).str.lower() == "live"].copy()
+    draft = current[current["config_type"].astype(str).str.lower() == "draft"].copy()
+
+    creator_segments, creator_detail = get_creator_segments(live, creator_index_for(creator_index, periods[-1]))
+    return ReportFrames(df_clean=df_clean, df_excl=df_excl, periods=periods, trend_metrics=trend_metrics,
+                        current=current, live=live, draft=draft, usage_tiers=get_usage_tiers(live),
+                        creator_segments=creator_segments, creator_detail=creator_detail)
+
+
+KPI_NAMES = ["tot_live_messages", "tot_all_messages", "gpts_with_usage_live", "gpts_with_usage_all",
+             "total_live_gpts", "total_configs", "avg_engagement", "top5_share", "top10_share", "draft_share"]
+TREND_COLS = ["period_key", "config_type", "gpt_name", "messages_workspace"]
+
+
+def _dashboard_sheet(wb, latest_period: str, excludes: list[str], trend_metrics: dict, kpis: dict,
+                     top10: pd.DataFrame) -> None:
+    """Dashboard: reporting period, KPIs with trends, concentration and the top 10 live GPTs."""
+    (tot_live_messages, tot_all_messages, gpts_with_usage_live, gpts_with_usage_all, total_live_gpts,
+     total_configs, avg_engagement, top5_share, top10_share, draft_share) = (kpis[k] for k in KPI_NAMES)
+
     dash = wb.create_sheet("Dashboard")
-    
+
     # Title
     dash["A1"] = "GPT Usage Monthly Report"
     dash["A1"].font = Font(bold=True, size=16, color="1F4E78")
-    dash["A2"] = f"Excludes: Smart Pack | Psychometric | Candidate Letter Generator | Generated: {datetime.now().strftime('%Y-%m-%d')}"
+    dash["A2"] = f"Excludes: {' | '.join(excludes)} | Generated: {datetime.now().strftime('%Y-%m-%d')}"
     dash["A2"].font = Font(italic=True, size=9, color="666666")
-    
+
     # Period info
     dash["A4"] = "Reporting Period"
     dash["A4"].font = Font(bold=True, size=11)
     dash["B4"] = latest_period
-    
+
     if trend_metrics["has_trend"]:
         dash["C4"] = f"vs {trend_metrics['prev_period']}"
         dash["C4"].font = Font(italic=True, color="666666")
-    
+
     # KPI Section
     row = 6
     _style_subheader(dash, row, 1, "KEY PERFORMANCE INDICATORS")
     dash.merge_cells(f"A{row}:E{row}")
-    
+
     # KPI Headers
     row += 1
     headers = ["Metric", "Live Only", "Trend", "Live + Draft", "Trend"]
@@ -387,22 +408,22 @@ def build_report(input_path: Path, out_path: Path) -> None:
         cell.fill = PatternFill("solid", fgColor="E0E0E0")
         cell.alignment = Alignment(horizontal="center")
         cell.border = BORDER_THIN
-    
+
     # KPI Data
     metrics_data = [
         ("Total Messages", tot_live_messages, tot_all_messages),
         ("GPTs with Usage", gpts_with_usage_live, gpts_with_usage_all),
-        ("Total GPT Configs", total_live_gpts, len(df_clean)),
+        ("Total GPT Configs", total_live_gpts, total_configs),
         ("Avg Messages per User", round(avg_engagement, 1), "-"),
     ]
-    
+
     for metric, live_val, all_val in metrics_data:
         row += 1
         dash.cell(row=row, column=1, value=metric).border = BORDER_THIN
         dash.cell(row=row, column=2, value=live_val).border = BORDER_THIN
         dash.cell(row=row, column=2).number_format = "#,##0" if isinstance(live_val, (int, float)) else "0.0"
         dash.cell(row=row, column=2).alignment = Alignment(horizontal="right")
-        
+
         # Trend arrows for live
         if trend_metrics["has_trend"] and metric == "Total Messages":
             change = trend_metrics["messages_change"]
@@ -411,63 +432,81 @@ def build_report(input_path: Path, out_path: Path) -> None:
             trend_text = f"{symbol} {abs(pct):.1%}"
             dash.cell(row=row, column=3, value=trend_text).border = BORDER_THIN
             dash.cell(row=row, column=3).font = Font(color="008000" if change > 0 else "FF0000")
-        
+
         dash.cell(row=row, column=4, value=all_val).border = BORDER_THIN
         dash.cell(row=row, column=4).number_format = "#,##0" if isinstance(all_val, (int, float)) else "@"
         dash.cell(row=row, column=4).alignment = Alignment(horizontal="right")
-    
+
     # Concentration metrics
     row += 2
     _style_subheader(dash, row, 1, "CONCENTRATION ANALYSIS")
     dash.merge_cells(f"A{row}:E{row}")
-    
+
     row += 1
     dash.cell(row=row, column=1, value="Top 5 GPTs Share").border = BORDER_THIN
     dash.cell(row=row, column=2, value=top5_share).border = BORDER_THIN
     dash.cell(row=row, column=2).number_format = "0.0%"
     dash.cell(row=row, column=3, value="High" if top5_share > 0.5 else "Moderate" if top5_share > 0.3 else "Distributed")
     dash.cell(row=row, column=3).border = BORDER_THIN
-    
+
     row += 1
     dash.cell(row=row, column=1, value="Top 10 GPTs Share").border = BORDER_THIN
     dash.cell(row=row, column=2, value=top10_share).border = BORDER_THIN
     dash.cell(row=row, column=2).number_format = "0.0%"
-    
+
+    row += 1
+    dash.cell(row=row, column=1, value="Gini (Live GPTs)").border = BORDER_THIN
+    dash.cell(row=row, column=2, value=kpis["gini"]).border = BORDER_THIN
+    dash.cell(row=row, column=2).number_format = "0.00"
+    dash.cell(row=row, column=3, value="0 = even, 1 = one GPT").border = BORDER_THIN
+
+    row += 1
+    dash.cell(row=row, column=1, value="HHI (Live GPTs)").border = BORDER_THIN
+    dash.cell(row=row, column=2, value=kpis["hhi"]).border = BORDER_THIN
+    dash.cell(row=row, column=2).number_format = "0.0000"
+    dash.cell(row=row, column=3, value=f"~{1 / kpis['hhi']:,.0f} equal GPTs" if kpis["hhi"] else "-").border = BORDER_THIN
+
     row += 1
     dash.cell(row=row, column=1, value="Draft Share of Total").border = BORDER_THIN
     dash.cell(row=row, column=2, value=draft_share).border = BORDER_THIN
     dash.cell(row=row, column=2).number_format = "0.0%"
-    
+
     # Top 10 Table
     row += 3
     _style_subheader(dash, row, 1, f"TOP 10 GPTs BY MESSAGES ({latest_period})")
     dash.merge_cells(f"A{row}:F{row}")
-    
+
     row += 1
     _write_df(dash, top10, start_row=row, start_col=1,
               format_numbers={"messages": "#,##0", "unique_users": "#,##0", 
                             "msgs_per_user": "0.0", "share_of_total": "0.0%"})
-    
+
     _autosize(dash)
-    
-    # ===== INSIGHTS SHEET =====
+
+
+def _insights_sheet(wb, latest_period: str, trend_metrics: dict, kpis: dict, usage_tiers: pd.DataFrame,
+                    creator_segments: pd.DataFrame, creator_summary: pd.DataFrame,
+                    rising_stars: pd.DataFrame) -> None:
+    """Insights: executive summary, usage tiers, creator segments, top creators and rising stars."""
+    top5_share, draft_share, zero_pct = kpis["top5_share"], kpis["draft_share"], kpis["zero_usage_share"]
+
     ins = wb.create_sheet("Insights")
-    
+
     ins["A1"] = "Strategic Insights & Analysis"
     ins["A1"].font = Font(bold=True, size=14, color="1F4E78")
-    
+
     ins["A3"] = f"Analysis Period: {latest_period}"
     ins["A3"].font = Font(bold=True)
-    
+
     current_row = 5
-    
+
     # Executive Summary
     _style_subheader(ins, current_row, 1, "EXECUTIVE SUMMARY")
     ins.merge_cells(f"A{current_row}:F{current_row}")
     current_row += 1
-    
+
     insights_text = []
-    
+
     # Growth insight
     if trend_metrics["has_trend"]:
         growth = trend_metrics["messages_pct_change"]
@@ -476,66 +515,65 @@ def build_report(input_path: Path, out_path: Path) -> None:
             insights_text.append(f"• Message volume has {direction} by {abs(growth):.1%} compared to {trend_metrics['prev_period']}")
         else:
             insights_text.append(f"• Message volume remained stable compared to {trend_metrics['prev_period']}")
-    
+
     # Concentration insight
     if top5_share > 0.6:
         insights_text.append(f"• High concentration risk: Top 5 GPTs account for {top5_share:.1%} of all usage")
     elif top5_share < 0.3:
         insights_text.append(f"• Healthy distribution: Top 5 GPTs account for only {top5_share:.1%} of usage")
-    
+
     # Draft insight
     if draft_share > 0.2:
         insights_text.append(f"• Significant draft activity: {draft_share:.1%} of messages are from draft configs")
-    
+
     # Zero usage insight
-    zero_pct = (live["messages_workspace"] == 0).sum() / len(live)
     if zero_pct > 0.3:
         insights_text.append(f"• Cleanup opportunity: {zero_pct:.1%} of live GPTs have zero usage")
-    
+
     for text in insights_text:
         ins.cell(row=current_row, column=1, value=text)
         ins.cell(row=current_row, column=1).alignment = Alignment(wrap_text=True, vertical="top")
         current_row += 1
-    
+
     current_row += 2
-    
+
     # Usage Tiers Table
     _style_subheader(ins, current_row, 1, "USAGE DISTRIBUTION (LIVE GPTs)")
     ins.merge_cells(f"A{current_row}:E{current_row}")
     current_row += 1
-    
+
     next_row = _write_df(ins, usage_tiers, start_row=current_row, start_col=1,
                         format_numbers={"gpt_count": "#,##0", "total_messages": "#,##0",
                                       "avg_messages": "#,##0.0", "total_users": "#,##0"},
                         add_totals=True)
     current_row = next_row + 1
-    
+
     # Creator Segments Table
     _style_subheader(ins, current_row, 1, "CREATOR ECOSYSTEM ANALYSIS")
     ins.merge_cells(f"A{current_row}:E{current_row}")
     current_row += 1
-    
+
     next_row = _write_df(ins, creator_segments, start_row=current_row, start_col=1,
                         format_numbers={"creators": "#,##0", "total_gpts": "#,##0",
                                       "total_messages": "#,##0", "avg_messages_per_creator": "#,##0.0"},
                         add_totals=True)
     current_row = next_row + 1
-    
+
     # Top Creators Table
     _style_subheader(ins, current_row, 1, "TOP 10 CREATORS BY MESSAGE VOLUME")
     ins.merge_cells(f"A{current_row}:E{current_row}")
     current_row += 1
-    
+
     _write_df(ins, creator_summary, start_row=current_row, start_col=1,
               format_numbers={"gpts": "#,##0", "messages": "#,##0", "users": "#,##0"})
     current_row += 12
-    
+
     # Rising Stars
     if not rising_stars.empty:
         _style_subheader(ins, current_row, 1, f"RISING STARS (New GPTs in {latest_period})")
         ins.merge_cells(f"A{current_row}:D{current_row}")
         current_row += 1
-        
+
         rising_formatted = rising_stars.rename(columns={
             "gpt_name": "GPT Name",
             "messages_workspace": "Messages",
@@ -543,52 +581,152 @@ def build_report(input_path: Path, out_path: Path) -> None:
         })
         _write_df(ins, rising_formatted, start_row=current_row, start_col=1,
                   format_numbers={"Messages": "#,##0"})
-    
+
     _autosize(ins)
+
+
+def _trends_sheet(wb, df_clean: pd.DataFrame) -> None:
+    """Trends: messages per month and config type (needs TREND_COLS of the clean frame)."""
+    trends = wb.create_sheet("Trends")
+
+    # Monthly trend data
+    monthly_summary = df_clean.groupby(["period_key", "config_type"]).agg(
+        total_messages=("messages_workspace", "sum"),
+        active_gpts=("gpt_name", lambda x: (df_clean.loc[x.index, "messages_workspace"] > 0).sum()),
+        total_gpts=("gpt_name", "nunique")
+    ).reset_index()
+
+    # Pivot for easier reading
+    pivot_msgs = monthly_summary.pivot(index="period_key", columns="config_type", 
+                                      values="total_messages").fillna(0)
+    pivot_msgs["Total"] = pivot_msgs.sum(axis=1)
+    pivot_msgs = pivot_msgs.reset_index()
+
+    trends["A1"] = "Monthly Message Trends"
+    trends["A1"].font = Font(bold=True, size=12)
+    _write_df(trends, pivot_msgs, start_row=2, start_col=1,
+              format_numbers={"live": "#,##0", "draft": "#,##0", "Total": "#,##0"})
+
+    _autosize(trends)
+
+
+BACKENDS = {"pandas": pandas_report_frames, "polars": polars_report_frames}
+
+
+def build_report(input_path: Path, out_path: Path, use_cache: bool = True,
+                 history: Path | None = None, months: int | None = None,
+                 rules_path: Path | None = None, backend: str = "pandas",
+                 workers: int = 1) -> None:
+    rules = load_rules("monthly", rules_path)
+    creator_index = None
+    with stage("load"):
+        if history:
+            ingest_export(history, input_path, sheet="GPTData", use_cache=use_cache, rules=rules)
+            df = load_history(history, last_n=months)
+            creator_index = load_creator_index(history, sorted(df["period_key"].dropna().unique())[-1:], rules)
+        else:
+            df = load_gptdata(input_path, use_cache=use_cache)
+    with stage(f"frames[{backend}]"):
+        frames = BACKENDS[backend](df, rules, creator_index)
+    df_clean, df_excl, periods = frames.df_clean, frames.df_excl, frames.periods
+    trend_metrics, current, live, draft = frames.trend_metrics, frames.current, frames.live, frames.draft
+
+    with stage("metrics"):
+        latest_period = periods[-1]
+        prev_period = periods[-2] if len(periods) > 1 else None
+    
+        # Core metrics
+        tot_live_messages = int(live["messages_workspace"].sum())
+        tot_all_messages = int(current["messages_workspace"].sum())
+        tot_draft_messages = int(draft["messages_workspace"].sum())
+    
+        gpts_with_usage_live = int((live["messages_workspace"] > 0).sum())
+        gpts_with_usage_all = int((current["messages_workspace"] > 0).sum())
+        total_live_gpts = len(live)
+    
+        # Concentration metrics (one sort of the live message counts, see gpt_metrics.py)
+        live_concentration = concentration(live["messages_workspace"].to_numpy(), ks=(5, 10))
+        top5_share, top10_share = live_concentration["top5_share"], live_concentration["top10_share"]
+    
+        draft_share = float(tot_draft_messages / tot_all_messages) if tot_all_messages else 0.0
+    
+        # Engagement metrics
+        live["messages_per_user"] = (live["messages_workspace"] / live["unique_messagers_workspace"].replace(0, pd.NA)).fillna(0)
+        avg_engagement = live[live["messages_workspace"] > 0]["messages_per_user"].mean()
+    
+        # Usage tiers and creator analysis
+        usage_tiers = frames.usage_tiers
+        creator_segments, creator_detail = frames.creator_segments, frames.creator_detail
+    
+        # Top performers
+        top10 = (
+            live.sort_values("messages_workspace", ascending=False)
+            .head(10)[["gpt_name", "messages_workspace", "unique_messagers_workspace", 
+                       "messages_per_user", "gpt_creator_email"]]
+            .rename(
+                columns={
+                    "messages_workspace": "messages",
+                    "unique_messagers_workspace": "unique_users",
+                    "messages_per_user": "msgs_per_user",
+                    "gpt_creator_email": "creator_email",
+                }
+            )
+        )
     
-    # ===== TRENDS SHEET (if multi-month) =====
-    if len(periods) > 1:
-        trends = wb.create_sheet("Trends")
-        
-        # Monthly trend data
-        monthly_summary = df_clean.groupby(["period_key", "config_type"]).agg(
-            total_messages=("messages_workspace", "sum"),
-            active_gpts=("gpt_name", lambda x: (df_clean.loc[x.index, "messages_workspace"] > 0).sum()),
-            total_gpts=("gpt_name", "nunique")
-        ).reset_index()
-        
-        # Pivot for easier reading
-        pivot_msgs = monthly_summary.pivot(index="period_key", columns="config_type", 
-                                          values="total_messages").fillna(0)
-        pivot_msgs["Total"] = pivot_msgs.sum(axis=1)
-        pivot_msgs = pivot_msgs.reset_index()
-        
-        trends["A1"] = "Monthly Message Trends"
-        trends["A1"].font = Font(bold=True, size=12)
-        _write_df(trends, pivot_msgs, start_row=2, start_col=1,
-                  format_numbers={"live": "#,##0", "draft": "#,##0", "Total": "#,##0"})
-        
-        _autosize(trends)
-    
-    # ===== DATA SHEETS =====
-    dc = wb.create_sheet("Data_Clean")
-    _write_df(dc, df_clean, format_numbers={"messages_workspace": "#,##0", 
-                                           "unique_messagers_workspace": "#,##0"})
-    _autosize(dc)
-    
-    ex = wb.create_sheet("Excluded_Rows")
-    _write_df(ex, df_excl)
-    _autosize(ex)
+        top10["share_of_total"] = top10["messages"] / tot_live_messages
     
-    # ===== DETAILED CREATORS SHEET =====
-    creators = wb.create_sheet("Creator_Detail")
-    _write_df(creators, creator_detail.sort_values("total_messages", ascending=False),
-              format_numbers={"gpts_created": "#,##0", "total_messages": "#,##0",
-                            "total_users": "#,##0", "avg_messages_per_gpt": "#,##0.0",
-                            "max_messages_single_gpt": "#,##0"})
-    _autosize(creators)
+        # Top creators (same grouping as creator_detail)
+        creator_summary = (
+            creator_detail[["gpt_creator_email", "gpts_created", "total_messages", "total_users"]]
+            .rename(columns={"gpt_creator_email": "creator_email", "gpts_created": "gpts",
+                             "total_messages": "messages", "total_users": "users"})
+            .sort_values("messages", ascending=False)
+            .head(10)
+        )
     
-    wb.save(out_path)
+        # Rising stars (new GPTs with high usage)
+        if trend_metrics["has_trend"]:
+            prev_live = df_clean[(df_clean["period_key"] == trend_metrics["prev_period"]) & 
+                                (df_clean["config_type"].astype(str).str.lower() == "live")]
+            prev_gpts = set(prev_live["gpt_name"])
+            new_gpts = live[~live["gpt_name"].isin(prev_gpts)]
+            rising_stars = new_gpts.nlargest(5, "messages_workspace")[["gpt_name", "messages_workspace", "gpt_creator_email"]]
+        else:
+            rising_stars = pd.DataFrame()
+
+        kpis = dict(zip(KPI_NAMES, (tot_live_messages, tot_all_messages, gpts_with_usage_live, gpts_with_usage_all,
+                                    total_live_gpts, len(current), avg_engagement, top5_share, top10_share,
+                                    draft_share)))
+        kpis["zero_usage_share"] = (live["messages_workspace"] == 0).sum() / len(live)
+        kpis["gini"], kpis["hhi"] = live_concentration["gini"], live_concentration["hhi"]
+
+    # ===== SHEETS =====
+    # Each sheet is rendered from the frames above, in this process or, with
+    # workers > 1, in worker processes whose parts are assembled (see gpt_render.py).
+    # The summary sheets are small and use random cell access, so they are built in
+    # memory. Full-size tables are streamed row by row, keeping memory flat as the
+    # export grows.
+    jobs = [
+        SheetJob("Dashboard", _dashboard_sheet,
+                 (latest_period, list(rules.reasons), trend_metrics, kpis, top10)),
+        SheetJob("Insights", _insights_sheet,
+                 (latest_period, trend_metrics, kpis, usage_tiers, creator_segments, creator_summary, rising_stars)),
+    ]
+    if len(periods) > 1:
+        jobs.append(SheetJob("Trends", _trends_sheet, (df_clean[TREND_COLS],)))
+    jobs += [
+        SheetJob("Data_Clean", _stream_df,
+                 ("Data_Clean", df_clean, {"messages_workspace": "#,##0", "unique_messagers_workspace": "#,##0"}),
+                 write_only=True),
+        SheetJob("Excluded_Rows", _stream_df, ("Excluded_Rows", df_excl), write_only=True),
+        SheetJob("Creator_Detail", _stream_df,
+                 ("Creator_Detail", creator_detail.sort_values("total_messages", ascending=False),
+                  {"gpts_created": "#,##0", "total_messages": "#,##0", "total_users": "#,##0",
+                   "avg_messages_per_gpt": "#,##0.0", "max_messages_single_gpt": "#,##0"}),
+                 write_only=True),
+    ]
+    render_workbook(jobs, out_path, workers)
+
     print(f"✓ Report generated: {out_path}")
     print(f"  - Period: {latest_period}")
     print(f"  - Live GPTs: {total_live_gpts:,} ({gpts_with_usage_live:,} with usage)")
@@ -602,14 +740,41 @@ def main() -> None:
     p.add_argument("input", type=Path, help="Path to input Excel export (.xlsx) containing GPTData sheet")
     p.add_argument("--out", type=Path, default=Path("GPT_Monthly_Report.xlsx"), 
                    help="Output report .xlsx path")
+    p.add_argument("--no-cache", action="store_true",
+                   help="Always re-parse the workbook instead of using the columnar cache")
+    p.add_argument("--history", type=Path, default=None,
+                   help="History store (SQLite) to ingest into and report from")
+    p.add_argument("--rules", type=Path, default=None,
+                   help="Exclusion rules file (default: exclusion_rules.json, 'monthly' profile)")
+    p.add_argument("--months", type=int, default=None,
+                   help="With --history, number of latest periods to include (default: all)")
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="pandas",
+                   help="Engine for the report computations (default: pandas; polars runs one lazy plan)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes rendering the sheets (default: 1, in-process)")
+    p.add_argument("--profile", action="store_true",
+                   help="Time each stage (wall, CPU, tracemalloc peak); prints a summary and writes a JSON trace")
+    p.add_argument("--profile-out", type=Path, default=None,
+                   help="With --profile, JSON trace path (default: <out>.profile.json)")
     args = p.parse_args()
 
     if not args.input.exists():
         print(f"Error: Input file not found: {args.input}")
         return
     
-    build_report(args.input, args.out)
+    profiler = StageProfiler() if args.profile else None
+    with profiler.activate() if profiler else nullcontext():
+        build_report(args.input, args.out, use_cache=not args.no_cache,
+                     history=args.history, months=args.months, rules_path=args.rules,
+                     backend=args.backend, workers=args.workers)
+
+    if profiler:
+        trace_path = args.profile_out or args.out.with_suffix(".profile.json")
+        profiler.write_json(trace_path, input=str(args.input), output=str(args.out))
+        print()
+        print(profiler.summary())
+        print(f"✓ Profile trace: {trace_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
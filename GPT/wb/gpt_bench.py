@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the GPT usage reporting pipeline.
+
+Generates synthetic GPTData exports shaped like the real ones (name and
+description lengths, unnamed drafts, missing descriptions, a category mix,
+excluded GPTs, heavy-tailed usage, GPTs recurring month to month) and times
+each stage from export file to result:
+
+  analyze_gpt_data   ../Analysis/analyze_gpt_usage.py, current month
+  build_report       GPTMonthlyv2.build_report, current month (writes .xlsx)
+  compare_periods    analyze both months, then compare_periods
+  mom_changes        monthovermonth: load both months, exclusions, mom_changes
+
+Each stage runs in a fresh worker process so peak RSS belongs to that stage
+alone. Imports happen before the clock starts; the columnar cache is warmed
+first unless --cold is given. Every run is appended to the results JSON and
+compared against the previous run with the same settings.
+
+Usage:
+  python gpt_bench.py                                   # 1k, 10k, 100k, 1M rows
+  python gpt_bench.py --sizes 1000 10000 --stages analyze_gpt_data mom_changes
+  python gpt_bench.py --out bench/gpt_bench.json --cold
+
+Generated exports are kept under <cache dir>/bench (see gptdata_cache.py) and
+reused across runs. Writing and first parsing the 1M-row files is openpyxl-bound
+and takes the better part of an hour; later runs start straight away.
+
+Dependencies:
+  pip install pandas numpy openpyxl pyarrow
+  pip install psutil   (optional: peak RSS on Windows, where `resource` is missing)
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import resource  # Unix
+except ImportError:
+    resource = None
+try:
+    import psutil  # optional: peak RSS on Windows
+except ImportError:
+    psutil = None
+
+from gptdata_cache import default_cache_dir, read_gptdata
+
+# analyze_gpt_usage.py lives next door in ../Analysis
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Analysis"))
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+GPTDATA_COLS = [
+    "cadence", "period_start", "period_end", "gpt_name", "config_type", "gpt_description", "is_active",
+    "first_day_active_in_period", "last_day_active_in_period", "messages_workspace",
+    "unique_messagers_workspace", "gpt_creator_email", "Exclude",
+]
+
+# Theme -> (share of named GPTs, name words, description phrases). Roughly the
+# mix seen in the workspace exports; "other" names match no category keyword.
+THEMES = {
+    "writing": (0.22, ["Email", "Polish", "Writer", "Draft", "Translate", "Copy", "Proofread", "Tone"],
+                ["drafts and polishes client emails", "rewrites documents in house style",
+                 "translates correspondence between languages", "tightens copy for proposals"]),
+    "research": (0.18, ["Research", "Intel", "Company Profile", "Web Digger", "Market", "Sector", "Finder"],
+                 ["researches companies and sectors from public sources", "builds company profiles",
+                  "finds candidates and market intelligence", "summarises news on target firms"]),
+    "meetings": (0.12, ["Meeting Notes", "Transcript", "Briefing", "Summary", "Minutes", "Recap"],
+                 ["turns meeting transcripts into notes and actions", "summarises calls into a brief",
+                  "prepares briefing notes before client meetings"]),
+    "leadership": (0.12, ["Leadership", "Coach", "Talent", "Succession", "Board", "Executive"],
+                   ["supports leadership coaching conversations", "advises on succession planning",
+                    "maps talent for board searches"]),
+    "assessment": (0.10, ["Assessment", "Evaluation", "Review", "Feedback", "360", "Interview"],
+                   ["structures interview feedback into an assessment", "drafts evaluation reports",
+                    "reviews 360 feedback and highlights themes"]),
+    "productivity": (0.10, ["Automation", "Scheduler", "Calendar", "Invoice", "Extractor", "Tracker"],
+                     ["automates recurring admin steps", "extracts data from invoices",
+                      "schedules and tracks follow ups"]),
+    "training": (0.06, ["Training", "Practice", "Quiz", "Study", "Learning", "Test"],
+                 ["runs practice exercises for new joiners", "quizzes users on process knowledge"]),
+    "other": (0.10, ["Helper", "Buddy", "Assistant", "Tool", "Bot", "GPT"],
+              ["general purpose helper", "a team sandbox", "experimental"]),
+}
+EXCLUDED_NAMES = [
+    "Person Smart Pack", "Company Smart Pack", "Candidate Letter Generator", "Psychometric Report Generator",
+    "Consultant Finder", "Prompt Coach", "person-sp-{i}", "company-sp-{i}",
+]
+NAME_TAILS = ["Assistant", "GPT", "Helper", "Pro", "for Partners", "(EMEA)", "(Americas)", "v2", "Tool", "Copilot"]
+FILLER = ["for the team", "with firm templates", "using approved sources", "in plain English",
+          "step by step", "for partners and associates", "with citations", "quickly"]
+
+
+def _pick(rng: np.random.Generator, options: list[str], size: int) -> np.ndarray:
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), size)]
+
+
+def _population(n: int, rng: np.random.Generator, start_id: int = 0) -> pd.DataFrame:
+    """n synthetic GPTs with stable name/description/creator/config."""
+    themes = list(THEMES)
+    shares = np.array([THEMES[t][0] for t in themes])
+    theme = rng.choice(len(themes), size=n, p=shares / shares.sum())
+    ids = np.arange(start_id, start_id + n)
+
+    names = np.empty(n, dtype=object)
+    descs = np.empty(n, dtype=object)
+    for t, key in enumerate(themes):
+        idx = np.flatnonzero(theme == t)
+        if not len(idx):
+            continue
+        _, words, phrases = THEMES[key]
+        first, second = _pick(rng, words, len(idx)), _pick(rng, words, len(idx))
+        two_words = rng.random(len(idx)) < 0.5
+        tails = _pick(rng, NAME_TAILS, len(idx))
+        # Names average ~23 chars and descriptions ~90 with a long tail, like the exports
+        names[idx] = [f"{a} {b} {tail}" if two else f"{a} {tail} {i % 97}"
+                      for a, b, tail, two, i in zip(first, second, tails, two_words, ids[idx])]
+        extra = rng.poisson(2.0, len(idx))
+        base, filler = _pick(rng, phrases, len(idx)), _pick(rng, FILLER, len(idx))
+        descs[idx] = [f"{name} {b}" + f" {f}" * k for name, b, f, k in zip(names[idx], base, filler, extra)]
+
+    excluded = rng.random(n) < 0.04
+    ex_names = _pick(rng, EXCLUDED_NAMES, int(excluded.sum()))
+    names[excluded] = [s.format(i=i) for s, i in zip(ex_names, ids[excluded])]
+
+    draft = rng.random(n) < 0.56
+    unnamed = draft & (rng.random(n) < 0.6)
+    names[unnamed] = None
+    descs[rng.random(n) < 0.5] = None
+
+    config = np.where(draft, "draft", "live").astype(object)
+    config[rng.random(n) < 0.01] = None
+    return pd.DataFrame({
+        "gpt_id": ids,
+        "gpt_name": names,
+        "gpt_description": descs,
+        "config_type": config,
+        "gpt_creator_email": [f"user{i}@example.com" for i in rng.integers(0, max(n // 3, 1), n)],
+        "Exclude": np.where(rng.random(n) < 0.03, "Exclude", "Keep").astype(object),
+    })
+
+
+def synth_gptdata(n_rows: int, periods: int = 1, start: str = "2025-12", seed: int = 0,
+                  churn: float = 0.1) -> pd.DataFrame:
+    """
+    A GPTData-shaped frame of n_rows spread evenly over `periods` monthly
+    periods. Each month about `churn` of the GPTs are replaced by new ones,
+    so most names recur across periods.
+    """
+    rng = np.random.default_rng(seed)
+    per_period = max(n_rows // periods, 1)
+    pop = _population(per_period, rng)
+    frames = []
+    for p, period_start in enumerate(pd.date_range(start, periods=periods, freq="MS")):
+        if p:
+            replaced = rng.random(len(pop)) < churn
+            fresh = _population(int(replaced.sum()), rng, start_id=int(pop["gpt_id"].max()) + 1)
+            pop = pd.concat([pop.loc[~replaced], fresh], ignore_index=True)
+        n = len(pop) if p < periods - 1 else n_rows - per_period * (periods - 1)
+        month = pop.iloc[np.arange(n) % len(pop)].reset_index(drop=True)
+
+        # ~30% of GPTs see use in a month; usage is heavy-tailed
+        used = rng.random(n) < np.where(month["config_type"].eq("live"), 0.5, 0.15)
+        messages = np.where(used, np.ceil(rng.pareto(1.2, n) * 3).astype(np.int64), 0)
+        uniques = np.where(messages > 0, np.minimum(messages, 1 + rng.poisson(1.5, n)), 0)
+        period_end = period_start + pd.offsets.MonthEnd(0)
+        first_day = period_start + pd.to_timedelta(rng.integers(0, 28, n), unit="D")
+        last_day = first_day + pd.to_timedelta(rng.integers(0, 28, n), unit="D")
+        last_day = last_day.where(last_day <= period_end, period_end)
+
+        frames.append(pd.DataFrame({
+            "cadence": "Monthly",
+            "period_start": period_start,
+            "period_end": period_end,
+            "gpt_name": month["gpt_name"],
+            "config_type": month["config_type"],
+            "gpt_description": month["gpt_description"],
+            "is_active": (messages > 0).astype(int),
+            "first_day_active_in_period": pd.Series(first_day).where(messages > 0),
+            "last_day_active_in_period": pd.Series(last_day).where(messages > 0),
+            "messages_workspace": messages,
+            "unique_messagers_workspace": uniques,
+            "gpt_creator_email": month["gpt_creator_email"],
+            "Exclude": month["Exclude"],
+        }))
+    return pd.concat(frames, ignore_index=True)[GPTDATA_COLS]
+
+
+def write_export(df: pd.DataFrame, path: Path) -> None:
+    """Write a frame as a GPTData sheet (write-only, so 1M rows stays in bounded memory)."""
+    cols = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.Series(np.asarray(values.dt.to_pydatetime(), dtype=object), index=values.index)
+        elif pd.api.types.is_integer_dtype(values):
+            values = values.astype(object)  # plain ints; openpyxl checks types per cell
+        cols.append(values.astype(object).where(values.notna(), None).tolist())
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("GPTData")
+    ws.append(list(df.columns))
+    for row in zip(*cols):
+        ws.append(row)
+    tmp = path.with_suffix(".tmp.xlsx")
+    wb.save(tmp)
+    os.replace(tmp, path)
+
+
+def bench_exports(n_rows: int, data_dir: Path, seed: int = 0) -> dict[str, Path]:
+    """Previous- and current-month exports of n_rows each, generated once and reused."""
+    paths = {"prev": data_dir / f"gptdata_{n_rows}_s{seed}_prev.xlsx",
+             "cur": data_dir / f"gptdata_{n_rows}_s{seed}_cur.xlsx"}
+    if all(p.exists() for p in paths.values()):
+        return paths
+    data_dir.mkdir(parents=True, exist_ok=True)
+    df = synth_gptdata(2 * n_rows, periods=2, seed=seed)
+    prev_start = df["period_start"].min()
+    write_export(df[df["period_start"] == prev_start], paths["prev"])
+    write_export(df[df["period_start"] != prev_start], paths["cur"])
+    return paths
+
+
+# ----------------------------------------------------------------------------
+# Stages: each runs one tool from export file(s) to its result
+# ----------------------------------------------------------------------------
+
+def _stage_analyze_gpt_data(files: dict, work: Path) -> None:
+    from analyze_gpt_usage import analyze_gpt_data
+    analyze_gpt_data(str(files["cur"]))
+
+
+def _stage_build_report(files: dict, work: Path) -> None:
+    from GPTMonthlyv2 import build_report
+    build_report(files["cur"], work / "report.xlsx", use_cache=_use_cache())
+
+
+def _stage_compare_periods(files: dict, work: Path) -> None:
+    from analyze_gpt_usage import analyze_gpt_data, compare_periods
+    compare_periods(analyze_gpt_data(str(files["cur"])), analyze_gpt_data(str(files["prev"])))
+
+
+def _stage_mom_changes(files: dict, work: Path) -> None:
+    from monthovermonth import apply_exclusions, load_month, mom_changes
+    months = [apply_exclusions(load_month(str(files[k]), use_cache=_use_cache()).df) for k in ("prev", "cur")]
+    mom_changes(*(m[~m["_excluded"]] for m in months))
+
+
+STAGES = {
+    "analyze_gpt_data": (_stage_analyze_gpt_data, ("cur",)),
+    "build_report": (_stage_build_report, ("cur",)),
+    "compare_periods": (_stage_compare_periods, ("prev", "cur")),
+    "mom_changes": (_stage_mom_changes, ("prev", "cur")),
+}
+
+
+def _use_cache() -> bool:
+    return os.environ.get("GPT_BENCH_COLD") != "1"
+
+
+def _preload() -> None:
+    # Import everything the stages use so import time stays off the clock
+    import analyze_gpt_usage  # noqa: F401
+    import GPTMonthlyv2  # noqa: F401
+    import monthovermonth  # noqa: F401
+
+
+def _peak_rss_mb() -> float | None:
+    status = Path("/proc/self/status")
+    if status.exists():
+        # Linux: ru_maxrss survives fork+exec, so a worker would report the parent's
+        # high-water mark; VmHWM is per address space
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)  # bytes on macOS, KiB on Linux
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 1024 / 1024, 1)
+    return None
+
+
+def _run_stage(stage: str, files: dict) -> dict:
+    """Runs in a fresh worker process."""
+    _preload()
+    func, _ = STAGES[stage]
+    rss_before = _peak_rss_mb()
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as work:
+        if not _use_cache():
+            # The analyzer always reads through the cache when it can; give it an empty one
+            os.environ["GPTDATA_CACHE_DIR"] = str(Path(work) / "cache")
+        t0, c0 = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):  # the tools print progress
+            func(files, Path(work))
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+    return {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4),
+            "peak_rss_mb": _peak_rss_mb(), "base_rss_mb": rss_before}
+
+
+def measure(stage: str, files: dict, n_rows: int) -> dict:
+    ctx = get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        res = pool.submit(_run_stage, stage, files).result()
+    rows = n_rows * len(STAGES[stage][1])
+    return {"stage": stage, "size": n_rows, "rows": rows, **res,
+            "rows_per_s": round(rows / res["wall_s"], 1) if res["wall_s"] > 0 else None}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _previous_run(runs: list[dict], settings: dict) -> dict | None:
+    for run in reversed(runs):
+        if all(run.get(k) == v for k, v in settings.items()):
+            return run
+    return None
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark the GPT usage reporting pipeline on synthetic exports")
+    p.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Rows per monthly export")
+    p.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="Stages to run")
+    p.add_argument("--out", type=Path, default=Path("gpt_bench_results.json"),
+                   help="Results file; each run is appended (default: gpt_bench_results.json)")
+    p.add_argument("--data-dir", type=Path, default=None,
+                   help="Where synthetic exports are kept (default: <cache dir>/bench)")
+    p.add_argument("--seed", type=int, default=0, help="Generator seed")
+    p.add_argument("--cold", action="store_true", help="Parse workbooks every time instead of using the columnar cache")
+    args = p.parse_args()
+
+    data_dir = args.data_dir or default_cache_dir() / "bench"
+    if args.cold:
+        os.environ["GPT_BENCH_COLD"] = "1"  # read by the stage workers
+
+    settings = {"seed": args.seed, "cache": "cold" if args.cold else "warm"}
+    run = {"run_at": datetime.now().isoformat(timespec="seconds"), "git_commit": _git_commit(), **settings,
+           "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+           "platform": platform.platform(), "cpu_count": os.cpu_count(), "results": []}
+
+    runs = json.loads(args.out.read_text()) if args.out.exists() else []
+    previous = _previous_run(runs, settings)
+    before = {(r["stage"], r["size"]): r for r in (previous or {}).get("results", [])}
+
+    print(f"{'stage':<18} {'rows/export':>11} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'rows/s':>12}  vs last")
+    for n_rows in args.sizes:
+        t0 = time.perf_counter()
+        files = bench_exports(n_rows, data_dir, seed=args.seed)
+        if not args.cold:
+            for path in files.values():
+                read_gptdata(path)  # warm the columnar cache outside the timed runs
+        print(f"# {n_rows:,} rows/export ready in {time.perf_counter() - t0:.1f}s")
+        files = {k: str(v) for k, v in files.items()}
+
+        for stage in args.stages:
+            r = measure(stage, files, n_rows)
+            run["results"].append(r)
+            last = before.get((stage, n_rows))
+            vs = f"{r['wall_s'] / last['wall_s']:.2f}x" if last and last["wall_s"] else "-"
+            print(f"{stage:<18} {n_rows:>11,} {r['wall_s']:>9.3f} {r['cpu_s']:>9.3f} "
+                  f"{r['peak_rss_mb'] or 0:>9.1f} {r['rows_per_s'] or 0:>12,.0f}  {vs}")
+
+    runs.append(run)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(runs, indent=2))
+    print(f"\nWrote: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
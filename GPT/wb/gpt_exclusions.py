@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Shared exclusion rule engine for the GPT report tools.
+
+Rules live in exclusion_rules.json, grouped into named profiles (one per tool,
+so each keeps its own semantics). A profile is compiled once, including one
+combined alternation per text field. Evaluating a frame screens every distinct
+name (or name + description) with that alternation in a single pass; only the
+texts it hits are checked rule by rule for the reason. String columns stay
+Arrow-backed where pandas supports it, so the screen runs in pyarrow's RE2
+unless a rule needs Python-only regex syntax (lookarounds, backreferences).
+Results are remembered per distinct text, so names that repeat month after
+month are not re-matched; the memo is cleared once it would pass memo_size
+entries, so a long-running process doesn't grow without bound.
+
+Rule fields:
+  code     short reason code, shared across profiles (e.g. "smart_pack")
+  reason   human-readable reason shown in reports
+  field    "name" or "name_description" (name + " " + description)
+  one of   "regex" (case-insensitive, "." also matches newlines), "contains"
+           (substring of the lowercased text) or "equals" (stripped,
+           lowercased text)
+
+The first matching rule, in file order, gives the reason.
+
+Usage:
+  from gpt_exclusions import load_rules
+  res = load_rules("monthly").evaluate(df["gpt_name"], df["gpt_description"])
+  res["excluded"], res["exclude_code"], res["exclude_reason"]
+
+  python gpt_exclusions.py monthly "Company Smart Pack"     # check names
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "exclusion_rules.json"
+
+
+@dataclass(frozen=True)
+class Rule:
+    code: str
+    reason: str
+    field: str
+    kind: str
+    pattern: str
+    regex: re.Pattern | None = None  # compiled at load, so bad patterns fail early
+
+    def matches(self, texts: pd.Series) -> np.ndarray:
+        if self.kind == "regex":
+            # Pattern text rather than self.regex: pandas hands it to pyarrow's RE2 when
+            # it can (no lookarounds/backrefs) and falls back to `re` otherwise
+            return texts.str.contains(self.source(), case=False, na=False).to_numpy(dtype=bool)
+        if self.kind == "contains":
+            return texts.str.contains(self.pattern, regex=False, na=False).to_numpy(dtype=bool)
+        return texts.str.strip().eq(self.pattern).to_numpy(dtype=bool)
+
+    def source(self) -> str:
+        """The rule as a regex (with the DOTALL it is compiled with), for matching as text."""
+        if self.kind == "regex":
+            # Scoped flag group: both RE2 and `re` accept it, and it doesn't leak into the screen
+            return f"(?s:{self.pattern})"
+        if self.kind == "contains":
+            return re.escape(self.pattern)
+        return rf"^\s*{re.escape(self.pattern)}\s*$"
+
+
+def _parse_rule(spec: dict) -> Rule:
+    field = spec.get("field", "name")
+    if field not in ("name", "name_description"):
+        raise ValueError(f"Unknown rule field {field!r} in {spec}")
+    for kind in ("regex", "contains", "equals"):
+        if kind in spec:
+            pattern = spec[kind]
+            compiled = re.compile(pattern, re.I | re.S) if kind == "regex" else None
+            if kind != "regex":
+                pattern = pattern.lower() if kind == "contains" else pattern.strip().lower()
+            return Rule(spec["code"], spec["reason"], field, kind, pattern, compiled)
+    raise ValueError(f"Rule needs one of regex/contains/equals: {spec}")
+
+
+def _lower(values, n: int) -> pd.Series:
+    """Positional lowercase text column; missing values become empty text."""
+    if values is None:
+        return pd.Series([""] * n).astype(str)
+    series = pd.Series(values).reset_index(drop=True)
+    return series.where(series.notna(), "").astype(str).str.lower()
+
+
+class ExclusionEngine:
+    """A compiled rule profile. Results are memoized per distinct input text."""
+
+    def __init__(self, rules: list[Rule], profile: str = "", memo_size: int = 200_000):
+        self.rules = rules
+        self.profile = profile
+        self.memo_size = memo_size
+        self.codes = list(dict.fromkeys(r.code for r in rules))
+        self.reasons = list(dict.fromkeys(r.reason for r in rules))
+        self.uses_description = any(r.field == "name_description" for r in rules)
+        self._screen = {
+            field: "|".join(f"(?:{r.source()})" for r in rules if r.field == field)
+            for field in dict.fromkeys(r.field for r in rules)
+        }
+        self._memo: dict[str, int] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the rules, for tagging results derived from them."""
+        specs = [[r.code, r.reason, r.field, r.kind, r.pattern] for r in self.rules]
+        return hashlib.sha256(json.dumps(specs).encode("utf-8")).hexdigest()[:16]
+
+    def _first_match(self, names: pd.Series, descriptions: pd.Series | None) -> np.ndarray:
+        """Index of the first matching rule for each text, -1 if none."""
+        texts = {"name": names}
+        if descriptions is not None:
+            texts["name_description"] = names + " " + descriptions
+        result = np.full(len(names), -1, dtype=np.int64)
+        candidate = np.zeros(len(names), dtype=bool)
+        for field, screen in self._screen.items():
+            candidate |= texts[field].str.contains(screen, case=False, na=False).to_numpy(dtype=bool)
+        for i, rule in enumerate(self.rules):
+            todo = np.flatnonzero(candidate & (result == -1))
+            if not len(todo):
+                break
+            hit = rule.matches(texts[rule.field].take(todo))
+            result[todo[hit]] = i
+        return result
+
+    def rule_index(self, names, descriptions=None) -> np.ndarray:
+        """Position of the first matching rule for each name, -1 if none."""
+        name_l = _lower(names, len(names))
+        desc_l = _lower(descriptions if self.uses_description else None, len(names))
+        keys = name_l + "\x00" + desc_l if self.uses_description else name_l
+
+        codes, uniques = pd.factorize(keys)
+        uniques = pd.Series(uniques)
+        known = uniques.map(self._memo)
+        missing = known.isna().to_numpy()
+        if missing.any():
+            # Row of each distinct key's first occurrence, to pick its name/description
+            first = np.empty(len(uniques), dtype=np.int64)
+            first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+            rows = first[missing]
+            found = self._first_match(
+                name_l.take(rows).reset_index(drop=True),
+                desc_l.take(rows).reset_index(drop=True) if self.uses_description else None,
+            )
+            if len(self._memo) + len(found) > self.memo_size:
+                self._memo.clear()
+            self._memo.update(zip(uniques[missing].tolist(), found.tolist()))
+            known[missing] = found
+        return known.to_numpy(dtype=np.int64)[codes]
+
+    def evaluate(self, names, descriptions=None) -> pd.DataFrame:
+        """
+        Returns a frame aligned with `names` with columns 'excluded' (bool),
+        'exclude_code' and 'exclude_reason' (categoricals, NaN when not excluded).
+        """
+        index = names.index if isinstance(names, pd.Series) else pd.RangeIndex(len(names))
+        hit = self.rule_index(names, descriptions)
+        code_of = np.array([self.codes.index(r.code) for r in self.rules] + [-1], dtype=np.int64)
+        reason_of = np.array([self.reasons.index(r.reason) for r in self.rules] + [-1], dtype=np.int64)
+        return pd.DataFrame({
+            "excluded": hit >= 0,
+            "exclude_code": pd.Categorical.from_codes(code_of[hit], categories=self.codes),
+            "exclude_reason": pd.Categorical.from_codes(reason_of[hit], categories=self.reasons),
+        }, index=index)
+
+
+@lru_cache(maxsize=None)
+def _load_profile(profile: str, path: str) -> ExclusionEngine:
+    config = json.loads(Path(path).read_text(encoding="utf-8"))
+    profiles = config.get("profiles", {})
+    if profile not in profiles:
+        raise ValueError(f"Unknown exclusion profile {profile!r} in {path} (have: {', '.join(profiles)})")
+    return ExclusionEngine([_parse_rule(spec) for spec in profiles[profile]], profile=profile)
+
+
+def load_rules(profile: str, path: str | Path | None = None) -> ExclusionEngine:
+    """Compiled engine for a profile; compiled once per (profile, file) per process."""
+    return _load_profile(profile, str(Path(path or DEFAULT_RULES_PATH).resolve()))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Check GPT names against an exclusion profile")
+    p.add_argument("profile", help="Profile name, e.g. monthly, mom, analyzer")
+    p.add_argument("names", nargs="+", help="GPT names to check")
+    p.add_argument("--rules", type=Path, default=None, help="Rules file (default: exclusion_rules.json)")
+    args = p.parse_args()
+
+    res = load_rules(args.profile, args.rules).evaluate(pd.Series(args.names))
+    for name, (_, r) in zip(args.names, res.iterrows()):
+        print(f"{name}: {r['exclude_reason'] if r['excluded'] else 'kept'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Local multi-month history store for GPTData exports.
+
+Each monthly export is ingested once into a SQLite database. Rows are
+deduplicated across ingestions on (period_start, gpt_name, config_type): the
+first export that supplies a key owns all of that key's rows, so re-ingesting
+an overlapping export adds nothing. Rows sharing a key within one export (same
+name used by different GPTs) are kept. Reports then query any N-month window
+without reloading historical workbooks.
+
+Optional per-user events (a user column plus gpt_name, dated or labelled with
+a period) are stored as HyperLogLog sketches (see gpt_hll.py) per month for
+the whole workspace, each GPT and each category. Ingesting more events for a
+month merges into its sketches, and quarter/year distinct-user rollups merge
+stored sketches instead of rescanning events.
+
+Each ingestion also refreshes a creator index for the months it touched:
+per (month, gpt_creator_email) live-GPT stats and the creator's GPT list,
+after the exclusion rules the report uses. Creator drill-downs, portfolio
+changes between months and the report's creator sheets are lookups on it
+instead of regrouping the month's rows. The index records the rules it was
+built with; a lookup with different rules rebuilds that month first.
+
+Usage:
+  python gpt_history.py gpt_history.db export_2025-12.xlsx export_2026-01.xlsx
+  python gpt_history.py gpt_history.db --list
+  python gpt_history.py gpt_history.db --user-events users_2026-01.csv --period 2026-01
+  python gpt_history.py gpt_history.db --distinct-users category --freq Q
+  python gpt_history.py gpt_history.db --creator alice@example.com
+  python gpt_history.py gpt_history.db --portfolio-changes 2025-12 2026-01
+
+  from gpt_history import ingest_export, load_history, distinct_users
+  ingest_export("gpt_history.db", "export.xlsx")
+  df = load_history("gpt_history.db", last_n=6)
+  distinct_users("gpt_history.db", level="workspace", freq="Y")
+  creator_drilldown("gpt_history.db", "alice@example.com")
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from gpt_exclusions import ExclusionEngine, load_rules
+from gptdata_cache import DATE_COLS, NUMERIC_COLS, file_hash, read_gptdata, sheet_headers
+from gpt_hll import DEFAULT_PRECISION, HyperLogLog, read_user_events, sketch_groups, user_column
+
+
+REQUIRED_COLS = {"gpt_name", "config_type", "period_start", "messages_workspace"}
+
+HISTORY_COLS = [
+    "period_key", "cadence", "period_start", "period_end", "gpt_id", "gpt_name", "config_type",
+    "gpt_description", "is_active", "first_day_active_in_period", "last_day_active_in_period",
+    "messages_workspace", "unique_messagers_workspace", "gpt_creator_email", "Exclude",
+]
+KEY_COLS = ["period_start", "gpt_name", "config_type"]
+SKETCH_LEVELS = ["workspace", "gpt", "category"]
+EVENT_DATE_COLS = ["period_start", "date", "event_date", "timestamp"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingestions (
+    ingest_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_hash TEXT NOT NULL UNIQUE,
+    source TEXT,
+    ingested_at TEXT,
+    rows_added INTEGER
+);
+CREATE TABLE IF NOT EXISTS gpt_rows (
+    ingest_id INTEGER NOT NULL REFERENCES ingestions(ingest_id),
+    period_key TEXT NOT NULL,
+    cadence TEXT,
+    period_start TEXT NOT NULL,
+    period_end TEXT,
+    gpt_id TEXT,
+    gpt_name TEXT NOT NULL,
+    config_type TEXT NOT NULL,
+    gpt_description TEXT,
+    is_active INTEGER,
+    first_day_active_in_period TEXT,
+    last_day_active_in_period TEXT,
+    messages_workspace INTEGER,
+    unique_messagers_workspace INTEGER,
+    gpt_creator_email TEXT,
+    Exclude TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_gpt_rows_period ON gpt_rows(period_key);
+CREATE INDEX IF NOT EXISTS idx_gpt_rows_key ON gpt_rows(period_start, gpt_name, config_type);
+CREATE TABLE IF NOT EXISTS user_sketches (
+    period_key TEXT NOT NULL,
+    level TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sketch BLOB NOT NULL,
+    PRIMARY KEY (period_key, level, key)
+);
+CREATE TABLE IF NOT EXISTS creator_index (
+    period_key TEXT NOT NULL,
+    gpt_creator_email TEXT NOT NULL,
+    gpts_created INTEGER NOT NULL,
+    live_rows INTEGER NOT NULL,
+    total_messages INTEGER NOT NULL,
+    total_users INTEGER NOT NULL,
+    max_messages_single_gpt INTEGER NOT NULL,
+    PRIMARY KEY (period_key, gpt_creator_email)
+);
+CREATE TABLE IF NOT EXISTS creator_gpts (
+    period_key TEXT NOT NULL,
+    gpt_creator_email TEXT NOT NULL,
+    gpt_name TEXT NOT NULL,
+    messages INTEGER NOT NULL,
+    users INTEGER NOT NULL,
+    PRIMARY KEY (period_key, gpt_creator_email, gpt_name)
+);
+CREATE INDEX IF NOT EXISTS idx_creator_gpts_email ON creator_gpts(gpt_creator_email);
+CREATE TABLE IF NOT EXISTS creator_index_periods (
+    period_key TEXT PRIMARY KEY,
+    rules TEXT NOT NULL,
+    built_at TEXT
+);
+"""
+CREATOR_STATS_COLS = ["gpt_creator_email", "gpts_created", "total_messages", "total_users",
+                      "avg_messages_per_gpt", "max_messages_single_gpt"]
+
+
+def open_history(db_path: str | Path) -> sqlite3.Connection:
+    con = sqlite3.connect(str(db_path))
+    con.executescript(SCHEMA)
+    return con
+
+
+def _to_store_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize an export to the store's columns; unnamed GPTs are stored under ''."""
+    out = pd.DataFrame(index=df.index)
+    for col in HISTORY_COLS:
+        out[col] = df[col] if col in df.columns else None
+
+    out["period_start"] = pd.to_datetime(out["period_start"], errors="coerce")
+    out = out[out["period_start"].notna()].copy()
+    out["period_key"] = out["period_start"].dt.strftime("%Y-%m")
+    out["gpt_name"] = out["gpt_name"].fillna("").astype(str)
+    out["config_type"] = out["config_type"].fillna("").astype(str).str.lower()
+
+    for col in DATE_COLS:
+        out[col] = pd.to_datetime(out[col], errors="coerce").dt.strftime("%Y-%m-%d")
+    for col in NUMERIC_COLS:
+        out[col] = pd.to_numeric(out[col], errors="coerce").fillna(0).astype(int)
+    return out.reset_index(drop=True)
+
+
+def _find_data_sheet(path: str | Path, use_cache: bool) -> str:
+    headers = sheet_headers(path, use_cache=use_cache)
+    if "GPTData" in headers:
+        return "GPTData"
+    for name, header in headers.items():
+        if REQUIRED_COLS.issubset(set(header)):
+            return name
+    raise ValueError(f"Could not find a sheet with required columns in: {path}")
+
+
+def ingest_frame(con: sqlite3.Connection, df: pd.DataFrame, file_digest: str, source: str = "",
+                 rules: ExclusionEngine | None = None) -> int:
+    """
+    Append rows whose (period_start, gpt_name, config_type) key is new to the
+    store and re-index creators for the months that gained rows. Returns rows added.
+    """
+    if con.execute("SELECT 1 FROM ingestions WHERE file_hash = ?", (file_digest,)).fetchone():
+        return 0
+
+    rows = _to_store_frame(df)
+    with con:
+        cur = con.execute(
+            "INSERT INTO ingestions (file_hash, source, ingested_at, rows_added) VALUES (?, ?, ?, 0)",
+            (file_digest, source, datetime.now().isoformat(timespec="seconds")),
+        )
+        ingest_id = cur.lastrowid
+
+        periods = sorted(rows["period_start"].unique())
+        if periods:
+            marks = ",".join("?" * len(periods))
+            existing = pd.read_sql_query(
+                f"SELECT DISTINCT period_start, gpt_name, config_type FROM gpt_rows WHERE period_start IN ({marks})",
+                con, params=periods,
+            )
+            if not existing.empty:
+                seen = rows.merge(existing.assign(_seen=True), on=KEY_COLS, how="left")["_seen"].notna().to_numpy()
+                rows = rows.loc[~seen]
+
+        rows.insert(0, "ingest_id", ingest_id)
+        rows.to_sql("gpt_rows", con, if_exists="append", index=False)
+        con.execute("UPDATE ingestions SET rows_added = ? WHERE ingest_id = ?", (len(rows), ingest_id))
+        _index_creators(con, sorted(rows["period_key"].unique()), rules or load_rules("monthly"))
+    return len(rows)
+
+
+def ingest_export(db_path: str | Path, path: str | Path, sheet: str | None = None,
+                  use_cache: bool = True, rules: ExclusionEngine | None = None) -> int:
+    """Ingest one Excel export into the store (no-op if this exact file was ingested before)."""
+    con = open_history(db_path)
+    try:
+        digest = file_hash(path)
+        if con.execute("SELECT 1 FROM ingestions WHERE file_hash = ?", (digest,)).fetchone():
+            return 0
+        sheet_name = sheet or _find_data_sheet(path, use_cache)
+        df = read_gptdata(path, sheet_name=sheet_name, use_cache=use_cache)
+        return ingest_frame(con, df, digest, source=Path(path).name, rules=rules)
+    finally:
+        con.close()
+
+
+def list_periods(db_path: str | Path) -> list[str]:
+    con = open_history(db_path)
+    try:
+        return [r[0] for r in con.execute("SELECT DISTINCT period_key FROM gpt_rows ORDER BY period_key")]
+    finally:
+        con.close()
+
+
+def load_history(db_path: str | Path, last_n: int | None = None,
+                 periods: list[str] | None = None) -> pd.DataFrame:
+    """
+    Load stored rows as a GPTData-shaped frame for the given periods, or the
+    latest last_n periods, or everything. Empty names and config types come back as NaN.
+    """
+    con = open_history(db_path)
+    try:
+        if periods is None:
+            periods = [r[0] for r in con.execute("SELECT DISTINCT period_key FROM gpt_rows ORDER BY period_key")]
+            if last_n:
+                periods = periods[-last_n:]
+        if not periods:
+            return pd.DataFrame(columns=HISTORY_COLS)
+        marks = ",".join("?" * len(periods))
+        cols = ", ".join(HISTORY_COLS)
+        df = pd.read_sql_query(
+            f"SELECT {cols} FROM gpt_rows WHERE period_key IN ({marks}) ORDER BY period_key, ingest_id, rowid",
+            con, params=list(periods),
+        )
+    finally:
+        con.close()
+
+    for col in DATE_COLS:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in ["gpt_name", "config_type"]:
+        df[col] = df[col].replace("", pd.NA)
+    return df
+
+
+def _index_creators(con: sqlite3.Connection, periods: list[str], rules: ExclusionEngine) -> None:
+    """Rebuild the creator index for these months from their live, non-excluded rows (caller commits)."""
+    if not periods:
+        return
+    marks = ",".join("?" * len(periods))
+    live = pd.read_sql_query(
+        "SELECT period_key, gpt_name, gpt_description, gpt_creator_email, messages_workspace, "
+        f"unique_messagers_workspace FROM gpt_rows WHERE config_type = 'live' AND period_key IN ({marks})",
+        con, params=list(periods),
+    )
+    excluded = rules.evaluate(live["gpt_name"].fillna("").astype(str),
+                              live["gpt_description"].fillna("").astype(str))["excluded"].to_numpy()
+    live = live.loc[~excluded & live["gpt_creator_email"].notna().to_numpy()]
+
+    gpts = live.groupby(["period_key", "gpt_creator_email", "gpt_name"], sort=False).agg(
+        messages=("messages_workspace", "sum"),
+        users=("unique_messagers_workspace", "sum"),
+    ).reset_index()
+    stats = live.groupby(["period_key", "gpt_creator_email"], sort=False).agg(
+        live_rows=("gpt_name", "size"),
+        total_messages=("messages_workspace", "sum"),
+        total_users=("unique_messagers_workspace", "sum"),
+        max_messages_single_gpt=("messages_workspace", "max"),
+    )
+    stats.insert(0, "gpts_created", gpts.groupby(["period_key", "gpt_creator_email"], sort=False).size())
+    built_at = datetime.now().isoformat(timespec="seconds")
+
+    for table in ("creator_index", "creator_gpts", "creator_index_periods"):
+        con.execute(f"DELETE FROM {table} WHERE period_key IN ({marks})", list(periods))
+    stats.reset_index().to_sql("creator_index", con, if_exists="append", index=False)
+    gpts.to_sql("creator_gpts", con, if_exists="append", index=False)
+    con.executemany("INSERT INTO creator_index_periods (period_key, rules, built_at) VALUES (?, ?, ?)",
+                    [(p, rules.fingerprint, built_at) for p in periods])
+
+
+def index_creators(db_path: str | Path, periods: list[str] | None = None,
+                   rules: ExclusionEngine | None = None) -> list[str]:
+    """(Re)build the creator index for the given months, default all stored months. Returns the months."""
+    con = open_history(db_path)
+    try:
+        if periods is None:
+            periods = [r[0] for r in con.execute("SELECT DISTINCT period_key FROM gpt_rows ORDER BY period_key")]
+        with con:
+            _index_creators(con, list(periods), rules or load_rules("monthly"))
+    finally:
+        con.close()
+    return list(periods)
+
+
+def load_creator_index(db_path: str | Path, periods: list[str] | None = None,
+                       rules: ExclusionEngine | None = None) -> pd.DataFrame:
+    """
+    Per-creator live stats (GPTMonthlyv2's creator_stats columns, plus
+    period_key) for the given months, default all, sorted by month and email.
+    Months indexed with other rules, or not at all, are indexed first.
+    """
+    rules = rules or load_rules("monthly")
+    con = open_history(db_path)
+    try:
+        stored = [r[0] for r in con.execute("SELECT DISTINCT period_key FROM gpt_rows ORDER BY period_key")]
+        periods = stored if periods is None else [p for p in periods if p in stored]
+        if not periods:
+            return pd.DataFrame(columns=["period_key"] + CREATOR_STATS_COLS)
+        marks = ",".join("?" * len(periods))
+        built = dict(con.execute(f"SELECT period_key, rules FROM creator_index_periods WHERE period_key IN ({marks})",
+                                 list(periods)).fetchall())
+        stale = [p for p in periods if built.get(p) != rules.fingerprint]
+        if stale:
+            with con:
+                _index_creators(con, stale, rules)
+        stats = pd.read_sql_query(
+            "SELECT period_key, gpt_creator_email, gpts_created, live_rows, total_messages, total_users, "
+            f"max_messages_single_gpt FROM creator_index WHERE period_key IN ({marks}) "
+            "ORDER BY period_key, gpt_creator_email",
+            con, params=list(periods),
+        )
+    finally:
+        con.close()
+
+    stats["avg_messages_per_gpt"] = stats["total_messages"] / stats.pop("live_rows")
+    for col in ["gpts_created", "total_messages", "total_users", "max_messages_single_gpt"]:
+        stats[col] = stats[col].astype("int64")
+    return stats[["period_key"] + CREATOR_STATS_COLS]
+
+
+def _creator_gpts(con: sqlite3.Connection, where: str, params: list) -> pd.DataFrame:
+    return pd.read_sql_query(
+        f"SELECT period_key, gpt_creator_email, gpt_name, messages, users FROM creator_gpts WHERE {where} "
+        "ORDER BY period_key, gpt_creator_email, messages DESC, gpt_name",
+        con, params=params,
+    )
+
+
+def creator_drilldown(db_path: str | Path, email: str) -> pd.DataFrame:
+    """One creator's months from the index: stats plus their live GPTs, busiest first."""
+    con = open_history(db_path)
+    try:
+        stats = pd.read_sql_query(
+            "SELECT period_key, gpts_created, total_messages, total_users, max_messages_single_gpt "
+            "FROM creator_index WHERE gpt_creator_email = ? ORDER BY period_key",
+            con, params=[email],
+        )
+        gpts = _creator_gpts(con, "gpt_creator_email = ?", [email])
+    finally:
+        con.close()
+    names = gpts.groupby("period_key", sort=False)["gpt_name"].agg(list)
+    stats["gpts"] = stats["period_key"].map(names)
+    return stats
+
+
+def portfolio_changes(db_path: str | Path, prev_period: str, cur_period: str) -> pd.DataFrame:
+    """
+    Per-creator portfolio change between two indexed months: GPT counts,
+    messages, and the GPTs added and dropped. Creators present in either month.
+    """
+    con = open_history(db_path)
+    try:
+        gpts = _creator_gpts(con, "period_key IN (?, ?)", [prev_period, cur_period])
+    finally:
+        con.close()
+    cols = ["gpt_creator_email", "gpts_prev", "gpts_cur", "messages_prev", "messages_cur",
+            "messages_change", "added", "dropped"]
+    if gpts.empty:
+        return pd.DataFrame(columns=cols)
+
+    wide = gpts.pivot_table(index=["gpt_creator_email", "gpt_name"], columns="period_key",
+                            values="messages", aggfunc="sum")
+    wide = wide.reindex(columns=[prev_period, cur_period])
+    in_prev, in_cur = wide[prev_period].notna(), wide[cur_period].notna()
+    names = wide.index.get_level_values("gpt_name").to_series(index=wide.index)
+    by_creator = wide.index.get_level_values("gpt_creator_email")
+
+    out = pd.DataFrame({
+        "gpts_prev": in_prev.groupby(by_creator).sum(),
+        "gpts_cur": in_cur.groupby(by_creator).sum(),
+        "messages_prev": wide[prev_period].fillna(0).groupby(by_creator).sum().astype("int64"),
+        "messages_cur": wide[cur_period].fillna(0).groupby(by_creator).sum().astype("int64"),
+        "added": names[in_cur & ~in_prev].groupby(by_creator[in_cur & ~in_prev]).agg(list),
+        "dropped": names[in_prev & ~in_cur].groupby(by_creator[in_prev & ~in_cur]).agg(list),
+    })
+    out["messages_change"] = out["messages_cur"] - out["messages_prev"]
+    for col in ["added", "dropped"]:
+        out[col] = out[col].apply(lambda v: v if isinstance(v, list) else [])
+    return out.rename_axis("gpt_creator_email").reset_index()[cols]
+
+
+def _event_periods(events: pd.DataFrame, period: str | None) -> pd.Series:
+    if period:
+        return pd.Series(pd.Period(period, freq="M").strftime("%Y-%m"), index=events.index)
+    for col in EVENT_DATE_COLS:
+        if col in events.columns:
+            return pd.to_datetime(events[col], errors="coerce").dt.strftime("%Y-%m")
+    raise ValueError(f"Per-user events need a period or one of these columns: {', '.join(EVENT_DATE_COLS)}")
+
+
+def ingest_user_events(db_path: str | Path, events: pd.DataFrame | str | Path, period: str | None = None,
+                       categories: dict | None = None, precision: int = DEFAULT_PRECISION) -> int:
+    """
+    Merge per-user events into the month's distinct-user sketches. `period`
+    ("2026-01") labels undated events; GPT categories come from a 'category'
+    column or the `categories` name -> category mapping. Re-ingesting the same
+    events is harmless. Returns the number of sketches written.
+    """
+    if not isinstance(events, pd.DataFrame):
+        events = read_user_events(events)
+    users = events[user_column(events)]
+    frame = pd.DataFrame({"period_key": _event_periods(events, period), "user": users,
+                          "gpt": events["gpt_name"] if "gpt_name" in events.columns else None})
+    if "category" in events.columns:
+        frame["category"] = events["category"]
+    else:
+        frame["category"] = frame["gpt"].map(categories) if categories else None
+    frame = frame[frame["period_key"].notna() & frame["user"].notna()]
+
+    sketches = {}
+    for period_key, month in frame.groupby("period_key"):
+        sketches[(period_key, "workspace", "*")] = HyperLogLog(precision).add(month["user"])
+        for level, col in (("gpt", "gpt"), ("category", "category")):
+            for key, sketch in sketch_groups(month["user"], month[col], precision).items():
+                sketches[(period_key, level, str(key))] = sketch
+
+    con = open_history(db_path)
+    try:
+        with con:
+            for (period_key, level, key), sketch in sketches.items():
+                row = con.execute("SELECT sketch FROM user_sketches WHERE period_key = ? AND level = ? AND key = ?",
+                                  (period_key, level, key)).fetchone()
+                if row:
+                    sketch = HyperLogLog.from_bytes(row[0]).merge(sketch)
+                con.execute("INSERT OR REPLACE INTO user_sketches (period_key, level, key, sketch) VALUES (?, ?, ?, ?)",
+                            (period_key, level, key, sketch.to_bytes()))
+    finally:
+        con.close()
+    return len(sketches)
+
+
+def load_sketches(db_path: str | Path, level: str = "workspace",
+                  periods: list[str] | None = None) -> pd.DataFrame:
+    """Stored sketches for a level as a frame of period_key, key, sketch (HyperLogLog)."""
+    if level not in SKETCH_LEVELS:
+        raise ValueError(f"Unknown sketch level {level!r} (have: {', '.join(SKETCH_LEVELS)})")
+    con = open_history(db_path)
+    try:
+        sql = "SELECT period_key, key, sketch FROM user_sketches WHERE level = ?"
+        params = [level]
+        if periods is not None:
+            sql += f" AND period_key IN ({','.join('?' * len(periods))})"
+            params += list(periods)
+        rows = con.execute(sql + " ORDER BY period_key, key", params).fetchall()
+    finally:
+        con.close()
+    return pd.DataFrame([(p, k, HyperLogLog.from_bytes(b)) for p, k, b in rows],
+                        columns=["period_key", "key", "sketch"])
+
+
+def distinct_users(db_path: str | Path, level: str = "workspace", freq: str = "M",
+                   periods: list[str] | None = None) -> pd.DataFrame:
+    """
+    Estimated distinct users per period and key, with months rolled up to
+    freq "M" (month), "Q" (quarter, e.g. 2026-Q1), "Y" (year) or "all".
+    """
+    sketches = load_sketches(db_path, level, periods)
+    if sketches.empty:
+        return pd.DataFrame(columns=["period", "key", "distinct_users"])
+    months = pd.PeriodIndex(sketches["period_key"], freq="M")
+    labels = {
+        "M": sketches["period_key"],
+        "Q": pd.Series(months.year.astype(str) + "-Q" + months.quarter.astype(str), index=sketches.index),
+        "Y": pd.Series(months.year.astype(str), index=sketches.index),
+        "all": pd.Series("all", index=sketches.index),
+    }
+    if freq not in labels:
+        raise ValueError(f"freq must be one of {', '.join(labels)}, got {freq!r}")
+    rows = [(period, key, HyperLogLog.union(group["sketch"]).count())
+            for (period, key), group in sketches.groupby([labels[freq], "key"], sort=True)]
+    return pd.DataFrame(rows, columns=["period", "key", "distinct_users"])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Ingest GPTData exports into the local history store")
+    p.add_argument("db", type=Path, help="History database path (SQLite)")
+    p.add_argument("inputs", nargs="*", type=Path, help="Excel exports (.xlsx) to ingest")
+    p.add_argument("--list", action="store_true", help="List stored periods")
+    p.add_argument("--user-events", nargs="*", type=Path, default=[], help="Per-user event files (CSV/Excel) to sketch")
+    p.add_argument("--period", default=None, help="With --user-events, month (YYYY-MM) for undated events")
+    p.add_argument("--distinct-users", choices=SKETCH_LEVELS, default=None, help="Print distinct users for a level")
+    p.add_argument("--freq", choices=["M", "Q", "Y", "all"], default="M", help="With --distinct-users, rollup (default: M)")
+    p.add_argument("--creator", default=None, help="Print one creator's months and GPTs from the creator index")
+    p.add_argument("--portfolio-changes", nargs=2, metavar=("PREV", "CUR"), default=None,
+                   help="Print per-creator portfolio changes between two months (YYYY-MM)")
+    p.add_argument("--reindex", action="store_true", help="Rebuild the creator index for all stored months")
+    args = p.parse_args()
+
+    for path in args.inputs:
+        added = ingest_export(args.db, path)
+        print(f"✓ {path.name}: {added:,} rows added")
+
+    for path in args.user_events:
+        written = ingest_user_events(args.db, path, period=args.period)
+        print(f"✓ {path.name}: {written:,} user sketches updated")
+
+    if args.reindex:
+        print(f"✓ creator index rebuilt for {len(index_creators(args.db)):,} months")
+
+    if args.distinct_users:
+        print(distinct_users(args.db, args.distinct_users, args.freq).to_string(index=False))
+    elif args.creator:
+        print(creator_drilldown(args.db, args.creator).to_string(index=False))
+    elif args.portfolio_changes:
+        print(portfolio_changes(args.db, *args.portfolio_changes).to_string(index=False))
+    elif args.list or not (args.inputs or args.user_events or args.reindex):
+        for period in list_periods(args.db):
+            print(period)
+
+
+if __name__ == "__main__":
+    main()
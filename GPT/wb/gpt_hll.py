@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+HyperLogLog sketches for distinct-user counts.
+
+GPTData exports only carry unique_messagers_workspace per GPT, and summing it
+counts a user once for every GPT they used. Given per-user events (one row
+per user and GPT, optionally dated), these sketches estimate true distinct
+users per GPT, category or month. Counts for any grouping (a quarter, a year,
+several categories) come from merging stored sketches without rescanning
+events. Adding the same users twice changes nothing.
+
+Like HLL++, a sketch starts sparse: the sorted 64-bit hashes of its users,
+8 bytes each and counted exactly. Past 2**precision / 8 users (2,048 at the
+default precision of 14) it switches to the dense form, 2**precision one-byte
+registers (16 KB), where a union is the element-wise max. Most GPTs have a
+handful of users, so per-GPT sketches stay a few bytes each.
+
+Dense sketches are counted with Ertl's improved estimator ("New cardinality
+estimation algorithms for HyperLogLog sketches", 2017), which is unbiased
+across the whole range without HLL++'s empirical bias tables; the raw
+estimator with linear counting is about 2% high around 2.5 * 2**precision
+users. The standard error at precision 14 is about 0.8%.
+
+Usage:
+  from gpt_hll import HyperLogLog, sketch_groups
+  hll = HyperLogLog().add(["a@x.com", "b@x.com"])
+  hll.count()
+  by_gpt = sketch_groups(events["user_email"], events["gpt_name"])
+  HyperLogLog.union(by_gpt.values()).count()
+
+  python gpt_hll.py events.csv [--by gpt_name]     # distinct users per group
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PRECISION = 14
+_SPARSE_FLAG = 0x80  # set on the precision byte of serialized sparse sketches
+USER_COLS = ["user_email", "user_id", "email", "user"]
+
+
+def hash_ids(values) -> np.ndarray:
+    """Stable 64-bit hash of each id (ids are trimmed and lowercased, so emails match across exports)."""
+    ids = pd.Series(values, dtype=object).astype(str).str.strip().str.lower()
+    codes, uniques = pd.factorize(ids)
+    hashes = np.array([int.from_bytes(hashlib.blake2b(u.encode("utf-8"), digest_size=8).digest(), "little")
+                       for u in uniques], dtype=np.uint64)
+    return hashes[codes]
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Exact bit length of each uint64 (no float rounding)."""
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n[big] += shift
+        x[big] >>= np.uint64(shift)
+    return n + (x > 0).astype(np.uint8)
+
+
+def _index_rank(hashes: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    """Register index (top bits) and rank (leading zeros + 1 of the rest) per hash."""
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.int64)
+    rest = hashes & np.uint64((1 << width) - 1)
+    rank = (width + 1 - _bit_length(rest)).astype(np.uint8)
+    return index, rank
+
+
+def _sigma(x: float) -> float:
+    if x == 1.0:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_old, z = z, z + x * y
+        y += y
+        if z == z_old:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = np.sqrt(x)
+        y *= 0.5
+        z_old, z = z, z - (1.0 - x) ** 2 * y
+        if z == z_old:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch. Sparse (`hashes`, sorted unique uint64) until it
+    holds more than sparse_limit users, dense (`registers`) after that.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: np.ndarray | None = None,
+                 hashes: np.ndarray | None = None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = registers
+        self.hashes = None
+        if registers is None:
+            self.hashes = np.empty(0, dtype=np.uint64) if hashes is None else np.unique(hashes)
+            self._maybe_densify()
+
+    @property
+    def sparse_limit(self) -> int:
+        """Most users kept sparse: where 8-byte hashes would outgrow the one-byte registers."""
+        return (1 << self.precision) // 8
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.registers is None
+
+    def _dense_registers(self) -> np.ndarray:
+        if self.registers is not None:
+            return self.registers
+        registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        if len(self.hashes):
+            index, rank = _index_rank(self.hashes, self.precision)
+            np.maximum.at(registers, index, rank)
+        return registers
+
+    def _maybe_densify(self) -> None:
+        if self.registers is None and len(self.hashes) > self.sparse_limit:
+            self.registers, self.hashes = self._dense_registers(), None
+
+    def add(self, ids) -> "HyperLogLog":
+        """Add ids (any values; missing ones are skipped). Returns self."""
+        ids = pd.Series(ids, dtype=object).dropna()
+        if len(ids):
+            hashes = hash_ids(ids)
+            if self.is_sparse:
+                self.hashes = np.union1d(self.hashes, hashes)
+                self._maybe_densify()
+            else:
+                index, rank = _index_rank(hashes, self.precision)
+                np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Union with another sketch, in place. Returns self."""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge sketches of precision {self.precision} and {other.precision}")
+        if self.is_sparse and other.is_sparse:
+            self.hashes = np.union1d(self.hashes, other.hashes)
+            self._maybe_densify()
+        else:
+            self.registers = self._dense_registers()
+            self.hashes = None
+            np.maximum(self.registers, other._dense_registers(), out=self.registers)
+        return self
+
+    @classmethod
+    def union(cls, sketches, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        sketches = list(sketches)
+        out = cls(sketches[0].precision if sketches else precision)
+        for sketch in sketches:
+            out.merge(sketch)
+        return out
+
+    def estimate(self) -> float:
+        if self.is_sparse:
+            return float(len(self.hashes))
+        # Ertl's improved estimator over the register histogram
+        m, q = len(self.registers), 64 - self.precision
+        counts = np.bincount(self.registers, minlength=q + 2).astype(np.float64)
+        z = m * _tau(1.0 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * _sigma(counts[0] / m)
+        return float(m * m / (2 * np.log(2) * z))
+
+    def count(self) -> int:
+        return int(round(self.estimate()))
+
+    def to_bytes(self) -> bytes:
+        if self.is_sparse:
+            return zlib.compress(bytes([self.precision | _SPARSE_FLAG]) + self.hashes.astype("<u8").tobytes())
+        return zlib.compress(bytes([self.precision]) + self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        raw = zlib.decompress(data)
+        if raw[0] & _SPARSE_FLAG:
+            return cls(raw[0] & ~_SPARSE_FLAG, hashes=np.frombuffer(raw[1:], dtype="<u8").astype(np.uint64))
+        return cls(raw[0], np.frombuffer(raw[1:], dtype=np.uint8).copy())
+
+    def __repr__(self) -> str:
+        form = "sparse" if self.is_sparse else "dense"
+        return f"HyperLogLog(precision={self.precision}, {form}, estimate={self.estimate():.0f})"
+
+
+def sketch_groups(ids, groups, precision: int = DEFAULT_PRECISION) -> dict:
+    """
+    One sketch per distinct group value. Users are hashed once and sorted by
+    (group, hash); each group takes its slice, so small groups stay sparse and
+    only groups past the sparse limit allocate registers.
+    """
+    frame = pd.DataFrame({"g": pd.Series(groups, dtype=object).to_numpy(),
+                          "u": pd.Series(ids, dtype=object).to_numpy()}).dropna()
+    group_codes, keys = pd.factorize(frame["g"])
+    hashes = hash_ids(frame["u"]) if len(frame) else np.empty(0, dtype=np.uint64)
+    order = np.lexsort((hashes, group_codes))
+    group_codes, hashes = group_codes[order], hashes[order]
+    bounds = np.searchsorted(group_codes, np.arange(len(keys) + 1))
+    return {key: HyperLogLog(precision, hashes=hashes[bounds[i]:bounds[i + 1]])
+            for i, key in enumerate(keys.tolist())}
+
+
+def user_column(df: pd.DataFrame) -> str:
+    for col in USER_COLS:
+        if col in df.columns:
+            return col
+    raise ValueError(f"Per-user events need one of these columns: {', '.join(USER_COLS)}")
+
+
+def read_user_events(path: str | Path) -> pd.DataFrame:
+    """Per-user events from CSV or Excel (first sheet)."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path)
+    return pd.read_excel(path, sheet_name=0, engine="openpyxl")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Estimate distinct users from per-user GPT events")
+    p.add_argument("events", type=Path, help="CSV or Excel file with a user column and gpt_name")
+    p.add_argument("--by", default=None, help="Group column (default: whole file)")
+    p.add_argument("--precision", type=int, default=DEFAULT_PRECISION)
+    args = p.parse_args()
+
+    events = read_user_events(args.events)
+    users = events[user_column(events)]
+    print(f"Distinct users: {HyperLogLog(args.precision).add(users).count():,} (exact {users.nunique():,})")
+    if args.by:
+        for key, sketch in sorted(sketch_groups(users, events[args.by], args.precision).items(),
+                                  key=lambda kv: -kv[1].estimate()):
+            print(f"  {key}: {sketch.count():,}")
+
+
+if __name__ == "__main__":
+    main()
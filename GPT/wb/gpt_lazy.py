@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Lazy polars backend for the monthly report computations.
+
+GPTMonthlyv2's pandas path splits the export with several full-frame copies
+and lowercases config_type again in every helper. Here the whole set of
+report frames (clean/excluded split, latest-period live/draft slices, usage
+tiers, creator segments and trend inputs) is one polars LazyFrame plan:
+config_type is lowercased once, filters such as config_type == "live" are
+pushed down by the optimizer, and shared sub-plans are collected together.
+Exclusion rules still run through the shared ExclusionEngine.
+
+Results come back as pandas DataFrames with the pandas path's columns,
+dtypes, row order and index, so the report writer is unchanged and both
+backends produce the same workbook.
+
+Usage:
+  python GPTMonthlyv2.py input.xlsx --backend polars
+
+  from gpt_lazy import polars_report_frames
+  frames = polars_report_frames(df, load_rules("monthly"))
+
+Dependencies:
+  pip install polars
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from gpt_exclusions import ExclusionEngine
+from gpt_metrics import SEGMENT_BINS, SEGMENT_ORDER, USAGE_TIER_EDGES, USAGE_TIER_LABELS
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+NUMERIC_COLS = ["messages_workspace", "unique_messagers_workspace", "is_active"]
+TIER_ORDER = list(USAGE_TIER_LABELS)
+
+
+@dataclass
+class ReportFrames:
+    """Everything build_report computes before writing, whichever backend produced it."""
+    df_clean: pd.DataFrame
+    df_excl: pd.DataFrame
+    periods: list[str]
+    trend_metrics: dict
+    current: pd.DataFrame
+    live: pd.DataFrame
+    draft: pd.DataFrame
+    usage_tiers: pd.DataFrame
+    creator_segments: pd.DataFrame
+    creator_detail: pd.DataFrame
+
+
+def _usage_tier(messages: "pl.Expr") -> "pl.Expr":
+    """Same bins as gpt_metrics.bin_values with the default usage tier edges."""
+    tier = pl.when(messages < USAGE_TIER_EDGES[0]).then(pl.lit(TIER_ORDER[0]))
+    for edge, label in zip(USAGE_TIER_EDGES[1:], TIER_ORDER[1:]):
+        tier = tier.when(messages < edge).then(pl.lit(label))
+    return tier.otherwise(pl.lit(TIER_ORDER[-1]))
+
+
+def _segment(gpts: "pl.Expr") -> "pl.Expr":
+    """Same bins as pd.cut(gpts, SEGMENT_BINS, labels=SEGMENT_ORDER); null outside them."""
+    segment = pl.when(gpts <= SEGMENT_BINS[0]).then(pl.lit(None, dtype=pl.String))
+    for edge, label in zip(SEGMENT_BINS[1:], SEGMENT_ORDER):
+        segment = segment.when(gpts <= edge).then(pl.lit(label))
+    return segment
+
+
+def _ordered(lf: "pl.LazyFrame", col: str, order: list[str]) -> "pl.LazyFrame":
+    """Rows in a fixed label order; _row keeps the position pandas' sorted groupby gave each one."""
+    rank = pl.col(col).replace_strict(order, list(range(len(order))), return_dtype=pl.Int64)
+    return lf.sort(col).with_row_index("_row").sort(rank)
+
+
+def _to_pandas(frame: "pl.DataFrame", dtypes: dict, index: pd.Index | None = None) -> pd.DataFrame:
+    """
+    pandas frame with the given column dtypes. The _row column becomes the
+    index: labels from `index` when given, else the positions themselves.
+    """
+    out = frame.drop("_row", strict=False).to_pandas()
+    for col, dtype in dtypes.items():
+        if col in out.columns and out[col].dtype != dtype:
+            out[col] = out[col].astype(dtype)
+    if "_row" in frame.columns:
+        rows = frame["_row"].to_numpy().astype("int64")
+        out.index = index.take(rows) if index is not None else pd.Index(rows)
+    return out
+
+
+def polars_report_frames(df: pd.DataFrame, rules: ExclusionEngine,
+                         creator_index: pd.DataFrame | None = None) -> ReportFrames:
+    """
+    All report frames from one lazy plan. creator_index (gpt_history's
+    load_creator_index) replaces grouping live rows by creator when it
+    covers the latest period.
+    """
+    if pl is None:
+        raise ImportError("The polars backend needs polars: pip install polars")
+
+    names = df.get("gpt_name", "").fillna("").astype(str)
+    descriptions = df.get("gpt_description", "").fillna("").astype(str)
+    res = rules.evaluate(names, descriptions)
+    reason = res["exclude_reason"].cat.add_categories("").fillna("")
+    source = df.assign(gpt_name=names, gpt_description=descriptions,
+                       excluded=res["excluded"].to_numpy(), exclude_reason=reason.to_numpy(),
+                       period_start=pd.to_datetime(df["period_start"], errors="coerce"))
+
+    columns = list(dict.fromkeys(list(source.columns) + ["period_key"]))
+    base = (
+        pl.from_pandas(source.reset_index(drop=True), include_index=False).lazy()
+        .with_row_index("_row")
+        .with_columns(
+            pl.col("period_start").dt.strftime("%Y-%m").alias("period_key"),
+            *[pl.col(c).cast(pl.Float64, strict=False).fill_nan(None).fill_null(0).cast(pl.Int64)
+              for c in NUMERIC_COLS if c in source.columns],
+            pl.col("config_type").cast(pl.String).str.to_lowercase().alias("_config"),
+        )
+    )
+    clean = base.filter(~pl.col("excluded"))
+    excl = base.filter(pl.col("excluded"))
+
+    key = pl.col("period_key")
+    latest = key.max()
+    prev = key.filter(key < key.max()).max()
+    current = clean.filter(key == latest)
+    live = current.filter(pl.col("_config") == "live")
+    draft = current.filter(pl.col("_config") == "draft")
+    prev_live = clean.filter((key == prev) & (pl.col("_config") == "live"))
+
+    msgs = pl.col("messages_workspace")
+    usage_tiers = _ordered(
+        live.group_by(_usage_tier(msgs).alias("usage_tier")).agg(
+            gpt_count=pl.col("gpt_name").n_unique().cast(pl.Int64),
+            total_messages=msgs.sum(),
+            avg_messages=msgs.mean(),
+            total_users=pl.col("unique_messagers_workspace").sum(),
+        ), "usage_tier", TIER_ORDER)
+
+    if creator_index is not None:
+        creator_stats = (
+            pl.from_pandas(creator_index.reset_index(drop=True), include_index=False).lazy()
+            .join(clean.select(latest.alias("period_key")), on="period_key", how="semi")
+            .drop("period_key")
+        )
+    else:
+        creator_stats = (
+            live.filter(pl.col("gpt_creator_email").is_not_null())
+            .group_by("gpt_creator_email").agg(
+                gpts_created=pl.col("gpt_name").n_unique().cast(pl.Int64),
+                total_messages=msgs.sum(),
+                total_users=pl.col("unique_messagers_workspace").sum(),
+                avg_messages_per_gpt=msgs.mean(),
+                max_messages_single_gpt=msgs.max(),
+            )
+        )
+    creator_detail = creator_stats.sort("gpt_creator_email").with_columns(
+        _segment(pl.col("gpts_created")).alias("segment"))
+    creator_segments = _ordered(
+        creator_detail.group_by("segment").agg(
+            creators=pl.col("gpt_creator_email").count().cast(pl.Int64),
+            total_gpts=pl.col("gpts_created").sum(),
+            total_messages=pl.col("total_messages").sum(),
+            avg_messages_per_creator=pl.col("total_messages").mean(),
+        ), "segment", SEGMENT_ORDER)
+
+    def live_stats(lf):
+        return lf.select(messages=msgs.sum(), active=(msgs > 0).sum(), configs=pl.len())
+
+    cur_names = live.select("gpt_name").unique()
+    prev_names = prev_live.select("gpt_name").unique()
+    outputs = [
+        clean.select("_row", *columns), excl.select("_row", *columns),
+        clean.select(key.drop_nulls().unique().sort()),
+        current.select("_row", *columns), live.select("_row", *columns), draft.select("_row", *columns),
+        usage_tiers, creator_detail, creator_segments,
+        live_stats(live), live_stats(prev_live),
+        cur_names.join(prev_names, on="gpt_name", how="anti").select(pl.len()),
+        prev_names.join(cur_names, on="gpt_name", how="anti").select(pl.len()),
+    ]
+    (clean_df, excl_df, periods_df, current_df, live_df, draft_df, tiers_df, detail_df, segments_df,
+     cur_stats, prev_stats, new_count, dropped_count) = pl.collect_all(outputs)
+
+    periods = periods_df["period_key"].to_list()
+    if not periods:
+        raise ValueError("No valid periods found in data")
+    if creator_index is not None and periods[-1] not in set(creator_index["period_key"]):
+        return polars_report_frames(df, rules)
+
+    trend_metrics = {"has_trend": False}
+    if len(periods) >= 2:
+        cur, prv = cur_stats.row(0, named=True), prev_stats.row(0, named=True)
+        trend_metrics = {
+            "has_trend": True,
+            "prev_period": periods[-2],
+            "messages_change": cur["messages"] - prv["messages"],
+            "messages_pct_change": (cur["messages"] / prv["messages"] - 1) if prv["messages"] > 0 else 0,
+            "active_gpts_change": cur["active"] - prv["active"],
+            "total_gpts_change": cur["configs"] - prv["configs"],
+            "new_gpts": new_count.item(),
+            "dropped_gpts": dropped_count.item(),
+        }
+
+    # Match the pandas path's dtypes: text columns as str, reason as the engine's categories
+    dtypes = dict(source.dtypes)
+    dtypes.update({c: "int64" for c in NUMERIC_COLS if c in source.columns})
+    dtypes["period_key"] = "str"
+    dtypes["exclude_reason"] = reason.dtype
+    frames = [_to_pandas(f, dtypes, df.index) for f in (clean_df, excl_df, current_df, live_df, draft_df)]
+    return ReportFrames(
+        df_clean=frames[0], df_excl=frames[1], periods=periods, trend_metrics=trend_metrics,
+        current=frames[2], live=frames[3], draft=frames[4],
+        usage_tiers=_to_pandas(tiers_df, {}), creator_segments=_to_pandas(segments_df, {}),
+        creator_detail=_to_pandas(detail_df, {}),
+    )
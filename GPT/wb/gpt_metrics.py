@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Vectorized usage tiers and concentration metrics for the GPT reports.
+
+Shared by GPTMonthlyv2.py (usage tiers, creator segments, dashboard
+concentration), its polars backend gpt_lazy.py and monthovermonth.py
+(month_metrics). Everything works on plain numpy arrays of per-GPT message
+counts, so callers pass a column's values, not the frame.
+
+  bin_values      label per value from np.searchsorted against ascending
+                  lower edges (the usage tiers by default)
+  top_shares      share of the total held by the k largest values, for
+                  several k, from one partial sort (np.partition)
+  hhi             Herfindahl-Hirschman index: sum of squared shares, from
+                  1/n (even) to 1 (one GPT has everything)
+  gini            Gini coefficient: 0 (even) to 1 - 1/n (one GPT has everything)
+  concentration   all of the above in one dict; the top-k shares come from
+                  top_shares, and only the Gini coefficient (optional)
+                  needs a full sort
+
+Usage:
+  from gpt_metrics import bin_values, concentration
+  tiers = bin_values(live["messages_workspace"].to_numpy())
+  concentration(live["messages_workspace"].to_numpy(), ks=(5, 10))
+  # {'top5_share': 0.41, 'top10_share': 0.55, 'gini': 0.87, 'hhi': 0.06}
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+# Usage tiers: lower edge of every tier after the first (values are message counts)
+USAGE_TIER_EDGES = (1, 10, 100, 1000)
+USAGE_TIER_LABELS = ("Zero Usage", "Low (1-9)", "Medium (10-99)", "High (100-999)", "Very High (1000+)")
+
+# Creator segments: portfolio size bins (right-inclusive, as pd.cut) for SEGMENT_ORDER: 1, 2-3, 4-10, 11+
+SEGMENT_ORDER = ["Single GPT", "Small Portfolio (2-3)", "Medium Portfolio (4-10)", "Power Creator (10+)"]
+SEGMENT_BINS = [0, 1, 3, 10, float("inf")]
+
+
+def bin_values(values, edges=USAGE_TIER_EDGES, labels=USAGE_TIER_LABELS) -> np.ndarray:
+    """
+    Label of each value's bin: labels[0] below edges[0], labels[i] for
+    edges[i-1] <= value < edges[i], labels[-1] from edges[-1] up.
+    """
+    edges = np.asarray(edges)
+    if len(labels) != len(edges) + 1:
+        raise ValueError(f"Need one label more than edges, got {len(labels)} labels for {len(edges)} edges")
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError(f"Edges must be strictly increasing, got {list(edges)}")
+    return np.asarray(labels, dtype=object)[np.searchsorted(edges, np.asarray(values), side="right")]
+
+
+def top_shares(values, ks=(5, 10)) -> dict[int, float]:
+    """Share of the total held by the k largest values, for each k, from a single np.partition."""
+    x = np.asarray(values)
+    n, total = len(x), x.sum()
+    if total <= 0:
+        return {k: 0.0 for k in ks}
+    kth = sorted({n - k for k in ks if 0 < k < n})
+    if kth:
+        x = np.partition(x, kth)  # x[n - k:] holds the k largest for every k at once
+    return {k: float(x[max(n - k, 0):].sum() / total) for k in ks}
+
+
+def hhi(values) -> float:
+    x = np.asarray(values, dtype=np.float64)
+    total = x.sum()
+    if total <= 0:
+        return 0.0
+    return float(np.square(x / total).sum())
+
+
+def gini(values) -> float:
+    x = np.sort(np.asarray(values))
+    n, total = len(x), x.sum()
+    if n == 0 or total <= 0:
+        return 0.0
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    return float(2 * np.dot(ranks, x.astype(np.float64)) / (n * total) - (n + 1) / n)
+
+
+def concentration(values, ks=(5, 10), with_gini: bool = True) -> dict:
+    """
+    top{k}_share for each k, gini (unless with_gini is False) and hhi of
+    non-negative values (all 0.0 when they sum to 0). Without Gini nothing
+    is fully sorted.
+    """
+    x = np.asarray(values)
+    out = {f"top{k}_share": share for k, share in top_shares(x, ks).items()}
+    if with_gini:
+        out["gini"] = gini(x)
+    out["hhi"] = hhi(x)
+    return out
@@ -0,0 +1,179 @@
+"""
+Lightweight per-stage profiling for the GPT report tools.
+
+Wrap a stage in `with stage("load"):` or decorate a function with
+`@profiled("split")`. Both are no-ops unless a StageProfiler is active, so the
+hooks can stay in the code permanently. Stages nest: a stage opened inside
+another is recorded as "outer/inner".
+
+For each stage the profiler records wall time, CPU time (this process) and,
+with trace_memory=True, the tracemalloc peak above the memory held when the
+stage started. tracemalloc sees Python and numpy allocations but not Arrow
+buffers, and it slows allocation-heavy code noticeably, so compare wall times
+between profiled runs, not against unprofiled ones.
+
+Usage:
+  from gpt_profile import StageProfiler, stage
+
+  prof = StageProfiler()
+  with prof.activate():
+      build_report(...)           # its stage()/profiled() hooks now record
+  print(prof.summary())
+  prof.write_json("report.profile.json")
+
+The JSON trace also carries Chrome trace events, so it opens directly in
+chrome://tracing or https://ui.perfetto.dev.
+
+Stages timed in another process (e.g. a worker rendering one sheet) are
+recorded by a StageProfiler of its own there; merge() adds its records under
+the stage open here, on the timeline and trace row (tid) of that worker.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+
+
+_ACTIVE: list["StageProfiler"] = []
+
+
+@dataclass
+class StageRecord:
+    path: str
+    depth: int
+    start_s: float
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_mb: float | None = None
+    tid: int = 0
+    _mem_start: int = field(default=0, repr=False)
+    _mem_peak: int = field(default=0, repr=False)
+
+
+class StageProfiler:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records: list[StageRecord] = []
+        self._stack: list[StageRecord] = []
+        self._t0 = time.perf_counter()
+        self.epoch = time.time()  # wall clock at _t0, to line up records merged from other processes
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+        self._owns_tracemalloc = False
+
+    @contextmanager
+    def activate(self):
+        """Make this the profiler that stage()/profiled() hooks report to."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        _ACTIVE.append(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.remove(self)
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str):
+        parent = self._stack[-1] if self._stack else None
+        rec = StageRecord(
+            path=f"{parent.path}/{name}" if parent else name,
+            depth=len(self._stack),
+            start_s=time.perf_counter() - self._t0,
+        )
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent:
+                # reset_peak() is global, so bank the parent's peak so far first
+                parent._mem_peak = max(parent._mem_peak, peak)
+            tracemalloc.reset_peak()
+            rec._mem_start = rec._mem_peak = current
+        self.records.append(rec)
+        self._stack.append(rec)
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec.wall_s = time.perf_counter() - wall0
+            rec.cpu_s = time.process_time() - cpu0
+            if tracing:
+                rec._mem_peak = max(rec._mem_peak, tracemalloc.get_traced_memory()[1])
+                rec.peak_mb = (rec._mem_peak - rec._mem_start) / 1024 / 1024
+                if parent:
+                    parent._mem_peak = max(parent._mem_peak, rec._mem_peak)
+            self._stack.pop()
+
+    def merge(self, records: list[StageRecord], epoch: float, tid: int = 0) -> None:
+        """Add another profiler's records (started at `epoch`) under the stage open here, on trace row tid."""
+        parent = self._stack[-1] if self._stack else None
+        shift = epoch - self.epoch
+        for r in records:
+            self.records.append(replace(r, path=f"{parent.path}/{r.path}" if parent else r.path,
+                                        depth=r.depth + len(self._stack), start_s=r.start_s + shift, tid=tid))
+
+    def summary(self) -> str:
+        """Fixed-width table of stages in the order they started."""
+        total = sum(r.wall_s for r in self.records if r.depth == 0) or 1.0
+        width = max([len("stage")] + [len(r.path.rsplit("/", 1)[-1]) + 2 * r.depth for r in self.records])
+        lines = [f"{'stage':<{width}}  {'wall s':>9}  {'cpu s':>9}  {'% wall':>7}  {'peak MB':>9}"]
+        for r in self.records:
+            label = "  " * r.depth + r.path.rsplit("/", 1)[-1]
+            peak = f"{r.peak_mb:>9.1f}" if r.peak_mb is not None else f"{'-':>9}"
+            lines.append(f"{label:<{width}}  {r.wall_s:>9.3f}  {r.cpu_s:>9.3f}  {r.wall_s / total:>7.1%}  {peak}")
+        return "\n".join(lines)
+
+    def as_dict(self, **meta) -> dict:
+        stages = []
+        for r in self.records:
+            d = {k: v for k, v in asdict(r).items() if not k.startswith("_")}
+            d.update(wall_s=round(r.wall_s, 6), cpu_s=round(r.cpu_s, 6), start_s=round(r.start_s, 6),
+                     peak_mb=round(r.peak_mb, 3) if r.peak_mb is not None else None)
+            stages.append(d)
+        pid = os.getpid()
+        events = [
+            {"name": r.path.rsplit("/", 1)[-1], "cat": "stage", "ph": "X", "pid": pid, "tid": r.tid,
+             "ts": round(r.start_s * 1e6), "dur": round(r.wall_s * 1e6),
+             "args": {"path": r.path, "cpu_s": round(r.cpu_s, 6), "peak_mb": stages[i]["peak_mb"]}}
+            for i, r in enumerate(self.records)
+        ]
+        return {"started_at": self._started_at, "trace_memory": self.trace_memory, **meta,
+                "stages": stages, "traceEvents": events}
+
+    def write_json(self, path: str | Path, **meta) -> None:
+        Path(path).write_text(json.dumps(self.as_dict(**meta), indent=2, default=str), encoding="utf-8")
+
+
+def active_profiler() -> StageProfiler | None:
+    """The profiler stage()/profiled() hooks currently report to, if any."""
+    return _ACTIVE[-1] if _ACTIVE else None
+
+
+def stage(name: str):
+    """Context manager timing a stage on the active profiler; a no-op when none is active."""
+    return _ACTIVE[-1].stage(name) if _ACTIVE else nullcontext()
+
+
+def profiled(name: str | None = None):
+    """Decorator form of stage(); the stage name defaults to the function name."""
+    def wrap(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not _ACTIVE:
+                return func(*args, **kwargs)
+            with _ACTIVE[-1].stage(label):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Parallel sheet rendering for multi-sheet report workbooks.
+
+openpyxl builds and serializes a workbook's sheets one after another. Here
+each sheet is a SheetJob: a module-level function that adds one sheet to a
+fresh workbook, plus its (picklable) arguments, typically precomputed frames.
+Worker processes render the jobs to worksheet XML parts concurrently.
+openpyxl writes cell text inline, so a part depends on the rest of the
+workbook only through its cell style ids; each worker also returns the
+styles behind its ids. The parent registers those styles in one workbook
+skeleton (styles, sheet list, content types), renumbers style ids in the
+parts that need it and writes the final .xlsx zip. Wall time is then about
+the largest sheet plus assembly instead of the sum of all sheets.
+
+The parallel path is opt-in (workers > 1) because it relies on openpyxl
+internals: the workbook's style tables, WorksheetWriter and the write-only
+sheet's writer. It is only used with the openpyxl releases in
+PARTS_OPENPYXL. By default, and on other releases, write_workbook renders
+the jobs in this process, one after another, through openpyxl's public API
+only. Small sheets are then built in memory and copied into one write-only
+workbook, and the workbook has the same cells either way.
+
+Sheets may use values, styles, named styles, merged cells, column widths
+and freeze panes. Parts that need their own relationships (hyperlinks,
+comments, images, charts) are rejected.
+
+Under an active StageProfiler (gpt_profile.py) each sheet is a stage. Worker
+processes record their sheet's stages with a profiler of their own and the
+parent merges them under "render", one trace row per worker.
+
+Usage:
+  from gpt_render import SheetJob, render_workbook
+  render_workbook([SheetJob("Summary", build_summary, (summary,)),
+                   SheetJob("Data", stream_table, ("Data", df), write_only=True)],
+                  "report.xlsx", workers=4)
+
+Dependencies:
+  pip install "openpyxl>=3.1,<3.2"
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from copy import copy
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+
+import openpyxl
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS, BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+
+try:
+    from openpyxl.worksheet._writer import WorksheetWriter
+except ImportError:  # moved or gone in a newer openpyxl; write_workbook is used instead
+    WorksheetWriter = None
+
+from gpt_profile import StageProfiler, StageRecord, active_profiler, stage
+
+
+# openpyxl releases the worksheet-parts path is tested with
+PARTS_OPENPYXL = ("3.1.",)
+
+
+# Style id attributes: s= on cells and rows, style= on columns
+_STYLE_ATTR = re.compile(rb'(<(?:c|row|col) [^>]*?\bs(?:tyle)?=")([0-9]+)"')
+
+
+@dataclass
+class SheetJob:
+    """build(wb, *args) must add exactly one sheet, named title, to wb."""
+    title: str
+    build: Callable
+    args: tuple = ()
+    write_only: bool = False
+
+
+@dataclass
+class RenderedSheet:
+    title: str
+    xml: bytes
+    styles: list[tuple] = field(default_factory=list)   # per local style id, see _resolve_styles
+    named_styles: list[NamedStyle] = field(default_factory=list)
+    stages: list[StageRecord] = field(default_factory=list)   # recorded in a worker, see render_sheet
+    epoch: float = 0.0
+    pid: int = 0
+
+
+def parts_supported() -> bool:
+    """Whether the installed openpyxl is one the worksheet-parts path (render_sheet) is tested with."""
+    return WorksheetWriter is not None and openpyxl.__version__.startswith(PARTS_OPENPYXL)
+
+
+def _single_sheet(wb, job: SheetJob, before: list[str]):
+    if wb.sheetnames != before + [job.title]:
+        raise ValueError(f"Sheet job {job.title!r} produced sheets {wb.sheetnames[len(before):]}")
+    return wb.worksheets[-1]
+
+
+def _copy_sheet(wb, src) -> None:
+    """Copy a small, fully built sheet (values, styles, merges, widths) into a write-only workbook."""
+    ws = wb.create_sheet(src.title)
+    for letter, dim in src.column_dimensions.items():
+        ws.column_dimensions[letter].width = dim.width
+    for rng in src.merged_cells.ranges:
+        ws.merged_cells.add(rng.coord)
+    ws.freeze_panes = src.freeze_panes
+
+    for src_row in src.iter_rows():
+        row = []
+        for src_cell in src_row:
+            if src_cell.value is None and not src_cell.has_style:
+                row.append(None)
+                continue
+            cell = WriteOnlyCell(ws, value=src_cell.value)
+            if src_cell.has_style:
+                cell.font = copy(src_cell.font)
+                cell.fill = copy(src_cell.fill)
+                cell.border = copy(src_cell.border)
+                cell.alignment = copy(src_cell.alignment)
+                cell.protection = copy(src_cell.protection)
+                cell.number_format = src_cell.number_format
+            row.append(cell)
+        ws.append(row)
+
+
+def write_workbook(jobs: list[SheetJob], out_path: str | Path) -> None:
+    """Render sheet jobs in this process, in order, into one workbook, using openpyxl's public API only."""
+    wb = Workbook(write_only=True)
+    for job in jobs:
+        with stage(job.title):
+            if job.write_only:
+                before = wb.sheetnames
+                job.build(wb, *job.args)
+                _single_sheet(wb, job, before)
+            else:
+                scratch = Workbook()
+                scratch.remove(scratch.active)
+                job.build(scratch, *job.args)
+                _copy_sheet(wb, _single_sheet(scratch, job, []))
+    with stage("save"):
+        wb.save(out_path)
+
+
+def _resolve_styles(wb) -> tuple[list[tuple], list[NamedStyle]]:
+    """The objects behind each of wb's cell style ids, free of references to wb."""
+    styles = []
+    for sa in wb._cell_styles:
+        fmt = (BUILTIN_FORMATS[sa.numFmtId] if sa.numFmtId < BUILTIN_FORMATS_MAX_SIZE
+               else wb._number_formats[sa.numFmtId - BUILTIN_FORMATS_MAX_SIZE])
+        styles.append((wb._fonts[sa.fontId], wb._fills[sa.fillId], wb._borders[sa.borderId], fmt,
+                       wb._protections[sa.protectionId], wb._alignments[sa.alignmentId],
+                       wb._named_styles[sa.xfId].name, sa.pivotButton, sa.quotePrefix))
+    named = [NamedStyle(name=s.name, font=copy(s.font), fill=copy(s.fill), border=copy(s.border),
+                        alignment=copy(s.alignment), number_format=s.number_format,
+                        protection=copy(s.protection), builtinId=s.builtinId, hidden=s.hidden)
+             for s in wb._named_styles]
+    return styles, named
+
+
+def render_sheet(job: SheetJob, trace_memory: bool | None = None) -> RenderedSheet:
+    """
+    Run one job in a workbook of its own and return its worksheet XML and styles.
+    In a worker process, trace_memory (not None) records the job's stages with a
+    profiler of its own; they come back on the RenderedSheet for merging.
+    """
+    profiler = StageProfiler(trace_memory) if trace_memory is not None else None
+    with profiler.activate() if profiler else nullcontext(), stage(job.title):
+        wb = Workbook(write_only=job.write_only)
+        if not job.write_only:
+            wb.remove(wb.active)
+        job.build(wb, *job.args)
+        ws = _single_sheet(wb, job, [])
+        if job.write_only:
+            ws.close()
+            writer = ws._writer
+        else:
+            if ws._charts or ws._images or ws._hyperlinks:
+                raise ValueError(f"Sheet {job.title!r} has charts, images or hyperlinks; render it directly")
+            writer = WorksheetWriter(ws)
+            writer.write()
+        xml = writer.read()
+        writer.cleanup()
+        if len(writer._rels) or ws.legacy_drawing:
+            raise ValueError(f"Sheet {job.title!r} needs relationships (comments, drawings); render it directly")
+
+        styles, named = _resolve_styles(wb)
+    sheet = RenderedSheet(job.title, xml, styles, named)
+    if profiler:
+        sheet.stages, sheet.epoch, sheet.pid = profiler.records, profiler.epoch, os.getpid()
+    return sheet
+
+
+def _register_style(wb, style: tuple) -> int:
+    """Global cell style id in wb for a resolved style (added if new)."""
+    font, fill, border, fmt, protection, alignment, named, pivot, quote = style
+    sa = StyleArray()
+    sa.fontId = wb._fonts.add(font)
+    sa.fillId = wb._fills.add(fill)
+    sa.borderId = wb._borders.add(border)
+    sa.numFmtId = (BUILTIN_FORMATS_REVERSE[fmt] if fmt in BUILTIN_FORMATS_REVERSE
+                   else wb._number_formats.add(fmt) + BUILTIN_FORMATS_MAX_SIZE)
+    sa.protectionId = wb._protections.add(protection)
+    sa.alignmentId = wb._alignments.add(alignment)
+    sa.xfId = wb._named_styles.names.index(named)
+    sa.pivotButton, sa.quotePrefix = pivot, quote
+    return wb._cell_styles.add(sa)
+
+
+def _restyle(xml: bytes, ids: list[int]) -> bytes:
+    """Replace local style ids with global ones; parts whose ids already match are returned as-is."""
+    if all(i == g for i, g in enumerate(ids)):
+        return xml
+    return _STYLE_ATTR.sub(lambda m: m.group(1) + b'%d"' % ids[int(m.group(2))], xml)
+
+
+def assemble_workbook(sheets: list[RenderedSheet], out_path: str | Path) -> None:
+    """Write rendered sheets, in order, as one .xlsx file."""
+    skeleton = Workbook(write_only=True)
+    for sheet in sheets:
+        skeleton.create_sheet(sheet.title)
+
+    # Styles of the largest part first: a fresh workbook numbers them as the worker did,
+    # so the largest part is written without rewriting its style ids
+    ids = {}
+    for sheet in sorted(sheets, key=lambda s: len(s.xml), reverse=True):
+        for named in sheet.named_styles:
+            if named.name not in skeleton.named_styles:
+                skeleton.add_named_style(named)
+        ids[sheet.title] = [_register_style(skeleton, style) for style in sheet.styles]
+
+    buf = BytesIO()
+    skeleton.save(buf)
+    parts = {ws.path.lstrip("/"): sheet for ws, sheet in zip(skeleton.worksheets, sheets)}
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            sheet = parts.get(info.filename)
+            data = _restyle(sheet.xml, ids[sheet.title]) if sheet else src.read(info)
+            dst.writestr(info.filename, data)
+
+
+def render_workbook(jobs: list[SheetJob], out_path: str | Path, workers: int = 1) -> None:
+    """
+    Render sheet jobs and write them, in job order, to out_path: in worker
+    processes when workers > 1 and the installed openpyxl is supported
+    (parts_supported), otherwise in this process with write_workbook.
+    """
+    workers = min(len(jobs), workers or 1)
+    if workers <= 1 or not parts_supported():
+        write_workbook(jobs, out_path)
+        return
+
+    profiler = active_profiler()
+    trace_memory = profiler.trace_memory if profiler else None
+    with stage("render"):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Largest jobs are usually listed last; submitting them first shortens the tail
+            futures = {id(job): pool.submit(render_sheet, job, trace_memory) for job in reversed(jobs)}
+            sheets = [futures[id(job)].result() for job in jobs]
+        if profiler:
+            for sheet in sheets:
+                profiler.merge(sheet.stages, sheet.epoch, tid=sheet.pid)
+    with stage("assemble"):
+        assemble_workbook(sheets, out_path)
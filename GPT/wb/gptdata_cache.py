@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Columnar cache for GPTData Excel exports.
+
+The first load of a workbook parses the sheet with openpyxl, coerces dates and
+numerics, and writes it as an uncompressed Arrow IPC (Feather v2) file keyed by
+the workbook's content hash. Later loads memory-map that file instead of
+re-parsing the XML. Sheet headers are cached alongside, so sheet detection
+doesn't need to open the workbook either.
+
+A warm load is close to zero-copy: columns are converted one block each
+(split_blocks), so text columns (Arrow-backed strings) and numeric and date
+columns without missing values are views over the mapped file. Columns with
+missing values (e.g. first_day_active_in_period) are still converted. The
+views are read-only: assign a new column instead of writing into one in place.
+
+Usage:
+  from gptdata_cache import read_gptdata
+  df = read_gptdata("export.xlsx")                  # GPTData sheet
+  df = read_gptdata("export.xlsx", sheet_name=None) # first sheet
+
+  python gptdata_cache.py export.xlsx [more.xlsx ...]   # warm the cache
+
+Cache location: $GPTDATA_CACHE_DIR, else ~/.cache/gptdata
+Dependencies:
+  pip install pandas openpyxl pyarrow   (without pyarrow, reads are uncached)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+
+# Bump when coercion rules change so old cache files are ignored
+CACHE_VERSION = 1
+
+DATE_COLS = ["period_start", "period_end", "first_day_active_in_period", "last_day_active_in_period"]
+NUMERIC_COLS = ["messages_workspace", "unique_messagers_workspace", "is_active"]
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("GPTDATA_CACHE_DIR", Path.home() / ".cache" / "gptdata"))
+
+
+def file_hash(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def coerce_gptdata(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce known date and numeric columns. Values that don't parse become NaT/NaN,
+    so stray header rows and blanks survive for callers that filter them out.
+    Other mixed-type columns are stored as text.
+    """
+    df = df.copy()
+    df.columns = [c.strip() if isinstance(c, str) else str(c) for c in df.columns]
+    for col in DATE_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in df.columns:
+        if df[col].dtype == object:
+            non_null = df[col].dropna()
+            if not non_null.map(lambda v: isinstance(v, str)).all():
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _cache_paths(digest: str, sheet_name: str, cache_dir: Path) -> tuple[Path, Path]:
+    safe_sheet = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in sheet_name)
+    stem = f"{digest[:32]}.v{CACHE_VERSION}"
+    return cache_dir / f"{stem}.{safe_sheet}.arrow", cache_dir / f"{stem}.sheets.json"
+
+
+def sheet_headers(path: str | Path, cache_dir: Path | None = None, digest: str | None = None,
+                  use_cache: bool = True) -> dict[str, list]:
+    """
+    Map each sheet name to its header row, in workbook order. The workbook is
+    opened once (read-only) rather than once per sheet, and the result is cached.
+    """
+    headers_path = None
+    if use_cache:
+        cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        _, headers_path = _cache_paths(digest or file_hash(path), "", cache_dir)
+        if headers_path.exists():
+            return json.loads(headers_path.read_text())
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        headers = {}
+        for ws in wb.worksheets:
+            first = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            headers[ws.title] = [c.strip() if isinstance(c, str) else c for c in first]
+    finally:
+        wb.close()
+
+    if headers_path is not None:
+        _atomic_write_bytes(headers_path, json.dumps(headers, default=str).encode())
+    return headers
+
+
+def read_gptdata(path: str | Path, sheet_name: str | None = "GPTData",
+                 cache_dir: Path | None = None, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Load one sheet of a GPT export as a typed DataFrame, via the columnar cache.
+    sheet_name=None reads the first sheet. Raises ValueError if the sheet is missing.
+    """
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    if not use_cache or feather is None:
+        df = pd.read_excel(path, sheet_name=sheet_name or 0, engine="openpyxl")
+        return coerce_gptdata(df)
+
+    digest = file_hash(path)
+    sheets = list(sheet_headers(path, cache_dir, digest))
+    if sheet_name is None:
+        sheet_name = sheets[0]
+    elif sheet_name not in sheets:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found in {path}")
+
+    data_path, _ = _cache_paths(digest, sheet_name, cache_dir)
+    if data_path.exists():
+        try:
+            # One block per column, so null-free numeric columns stay views over the map
+            return feather.read_table(data_path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+        except (OSError, pa.ArrowInvalid):
+            data_path.unlink(missing_ok=True)  # corrupt or partial file; rebuild below
+
+    df = coerce_gptdata(pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl"))
+
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=data_path.parent, suffix=".tmp")
+    os.close(fd)
+    # Uncompressed so later reads can memory-map the buffers without decoding
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, data_path)
+    return df
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Warm the GPTData columnar cache")
+    p.add_argument("inputs", nargs="+", type=Path, help="Excel exports (.xlsx)")
+    p.add_argument("--sheet", default="GPTData", help="Sheet to cache (default: GPTData)")
+    p.add_argument("--cache-dir", type=Path, default=None, help="Cache directory")
+    args = p.parse_args()
+
+    for path in args.inputs:
+        df = read_gptdata(path, sheet_name=args.sheet, cache_dir=args.cache_dir)
+        print(f"✓ {path}: {len(df):,} rows cached")
+
+
+if __name__ == "__main__":
+    main()
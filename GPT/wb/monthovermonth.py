@@ -5,36 +5,39 @@ Monthly MoM GPT usage analysis (Dec vs Jan style) with exclusions.
 Usage:
   python gpt_mom.py --prev "m2.GPT Analysis December2025.xlsx" --cur "RRA OpenAI Workspace monthly gpt report 2026-01-01.xlsx" --out "mom_summary.xlsx"
 
+  History mode (see gpt_history.py): ingest any new exports, then compare the
+  latest --months periods from the store without reloading older workbooks:
+  python gpt_mom.py --history gpt_history.db --ingest "2026-02 export.xlsx" --months 6 --out "mom_summary.xlsx"
+
+  Batch mode: load every export in a directory once (in parallel) and write a
+  MoM workbook for each consecutive pair of months plus an all-months summary:
+  python gpt_mom.py --batch "exports/" --out-dir "exports/mom_reports" --workers 4
+
+  Keyword exclusions are the "mom" profile in exclusion_rules.json (see
+  gpt_exclusions.py); pass --rules to use another rules file.
+
 Dependencies:
   pip install pandas openpyxl
+  pip install pyarrow   (optional: caches parsed workbooks, see gptdata_cache.py)
 """
 
 import argparse
-import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from gptdata_cache import read_gptdata, sheet_headers
+from gpt_exclusions import ExclusionEngine, load_rules
+from gpt_history import ingest_export, load_history
+from gpt_metrics import concentration
 
-REQUIRED_COLS = {"gpt_name", "config_type", "is_active", "messages_workspace", "unique_messagers_workspace"}
 
-EXCLUDE_PATTERNS = [
-    r"smart[\s\-_]*pack",  # smart pack, smart-pack, smart_pack
-    r"candidate[\s\-_]*letter[\s\-_]*generator",
-    r"\bCLG\b",
-    r"psychometric",
-    r"psychometrics",
-    r"consultant[\s\-_]*finder",
-    r"candidate[\s\-_]*archetype",
-    r"candidate[\s\-_]*archetypes",
-    r"prompt[\s\-_]*coach",
-    r"person[-_ ]sp[-_ ]",   # person-sp-*
-    r"company[-_ ]sp[-_ ]",  # company-sp-*
-    r"project[-_ ]sp[-_ ]",  # project-sp-*
-]
-EXCLUDE_REGEX = re.compile("|".join(EXCLUDE_PATTERNS), flags=re.IGNORECASE)
+REQUIRED_COLS = {"gpt_name", "config_type", "is_active", "messages_workspace", "unique_messagers_workspace"}
 
 
 @dataclass
@@ -43,24 +46,26 @@ class MonthData:
     df: pd.DataFrame
 
 
-def find_data_sheet(path: str, explicit_sheet: Optional[str] = None) -> str:
-    xl = pd.ExcelFile(path)
+def find_data_sheet(path: str, explicit_sheet: Optional[str] = None, use_cache: bool = True) -> str:
     if explicit_sheet:
         return explicit_sheet
 
-    for s in xl.sheet_names:
-        hdr = pd.read_excel(path, sheet_name=s, nrows=0)
-        cols = set([c.strip() if isinstance(c, str) else c for c in hdr.columns])
-        if REQUIRED_COLS.issubset(cols):
+    # Header rows for every sheet come from one read-only pass (or the cache)
+    for s, header in sheet_headers(path, use_cache=use_cache).items():
+        if REQUIRED_COLS.issubset(set(header)):
             return s
 
     raise ValueError(f"Could not find a sheet with required columns in: {path}")
 
 
-def load_month(path: str, sheet: Optional[str] = None) -> MonthData:
-    sheet_name = find_data_sheet(path, sheet)
-    df = pd.read_excel(path, sheet_name=sheet_name)
+def load_month(path: str, sheet: Optional[str] = None, use_cache: bool = True) -> MonthData:
+    sheet_name = find_data_sheet(path, sheet, use_cache=use_cache)
+    df = read_gptdata(path, sheet_name=sheet_name, use_cache=use_cache)
+    return month_from_frame(df)
+
 
+def month_from_frame(df: pd.DataFrame) -> MonthData:
+    df = df.copy()
     for col in ["period_start", "period_end", "first_day_active_in_period", "last_day_active_in_period"]:
         if col in df.columns:
             df[col] = pd.to_datetime(df[col], errors="coerce")
@@ -80,9 +85,21 @@ def load_month(path: str, sheet: Optional[str] = None) -> MonthData:
     return MonthData(label=label, df=df)
 
 
-def apply_exclusions(df: pd.DataFrame) -> pd.DataFrame:
+def load_history_months(db_path: str, months: Optional[int] = None) -> List[MonthData]:
+    hist = load_history(db_path, last_n=months)
+    out = []
+    for _, g in hist.groupby("period_key", sort=True):
+        # Only some exports carry the manual Exclude flag; an all-empty one would exclude everything
+        if g["Exclude"].isna().all():
+            g = g.drop(columns="Exclude")
+        out.append(month_from_frame(g))
+    return out
+
+
+def apply_exclusions(df: pd.DataFrame, rules: Optional[ExclusionEngine] = None) -> pd.DataFrame:
     out = df.copy()
-    out["_kw_excluded"] = out["gpt_name_clean"].fillna("").str.contains(EXCLUDE_REGEX, na=False)
+    res = (rules or load_rules("mom")).evaluate(out["gpt_name_clean"])
+    out["_kw_excluded"] = res["excluded"]
 
     if "Exclude" in out.columns:
         out["_flag_excluded"] = out["Exclude"].astype("string").str.lower().fillna("").ne("keep")
@@ -90,42 +107,42 @@ def apply_exclusions(df: pd.DataFrame) -> pd.DataFrame:
         out["_flag_excluded"] = False
 
     out["_excluded"] = out["_kw_excluded"] | out["_flag_excluded"]
+    reason = res["exclude_reason"].cat.add_categories("Exclude flag")
+    out["_exclude_reason"] = reason.mask(~out["_kw_excluded"] & out["_flag_excluded"], "Exclude flag")
     return out
 
 
-def month_metrics(df: pd.DataFrame) -> dict:
-    d = df.copy()
-
-    live = d[d["config_type"].astype("string").str.lower() == "live"]
-    live_used = live[live["messages_workspace"] > 0]
+def _config_is(df: pd.DataFrame, value: str) -> np.ndarray:
+    return (df["config_type"].astype("string").str.lower() == value).fillna(False).to_numpy(dtype=bool)
 
-    all_used = d[d["messages_workspace"] > 0]
 
-    def top_share(x: pd.DataFrame, n: int) -> float:
-        total = x["messages_workspace"].sum()
-        if total <= 0:
-            return 0.0
-        return float(x.sort_values("messages_workspace", ascending=False)["messages_workspace"].head(n).sum() / total)
+def month_metrics(df: pd.DataFrame) -> dict:
+    named = (df["gpt_name_clean"] != "").to_numpy(dtype=bool)
+    live = _config_is(df, "live")
+    messages = df["messages_workspace"].to_numpy()
+    live_used = messages[live & (messages > 0)]
+    shares = concentration(messages[live], ks=(10, 5), with_gini=False)  # partial sort only
 
     return {
-        "rows_total": int(len(d)),
-        "gpts_named": int((d["gpt_name_clean"] != "").sum()),
-        "gpts_live_named": int(((d["gpt_name_clean"] != "") & (d["config_type"].astype("string").str.lower() == "live")).sum()),
-        "gpts_draft_named": int(((d["gpt_name_clean"] != "") & (d["config_type"].astype("string").str.lower() == "draft")).sum()),
-        "messages_total": int(d["messages_workspace"].sum()),
-        "live_messages_total": int(live["messages_workspace"].sum()),
-        "active_gpts_any": int(len(all_used)),
+        "rows_total": int(len(df)),
+        "gpts_named": int(named.sum()),
+        "gpts_live_named": int((named & live).sum()),
+        "gpts_draft_named": int((named & _config_is(df, "draft")).sum()),
+        "messages_total": int(messages.sum()),
+        "live_messages_total": int(messages[live].sum()),
+        "active_gpts_any": int((messages > 0).sum()),
         "active_live_gpts": int(len(live_used)),
-        "live_activation_rate": float(len(live_used) / max(1, (live["gpt_name_clean"] != "").sum())),
-        "top10_live_share": top_share(live_used, 10),
-        "top5_live_share": top_share(live_used, 5),
+        "live_activation_rate": float(len(live_used) / max(1, (named & live).sum())),
+        "top10_live_share": shares["top10_share"],
+        "top5_live_share": shares["top5_share"],
+        "live_hhi": shares["hhi"],
     }
 
 
 def aggregate_live(df: pd.DataFrame) -> pd.DataFrame:
-    live = df[df["config_type"].astype("string").str.lower() == "live"].copy()
     g = (
-        live.groupby("gpt_name_clean", dropna=False)[["messages_workspace", "unique_messagers_workspace"]]
+        df[_config_is(df, "live")]
+        .groupby("gpt_name_clean", dropna=False)[["messages_workspace", "unique_messagers_workspace"]]
         .sum()
         .reset_index()
     )
@@ -133,15 +150,71 @@ def aggregate_live(df: pd.DataFrame) -> pd.DataFrame:
     return g
 
 
-def mom_changes(prev_df: pd.DataFrame, cur_df: pd.DataFrame) -> pd.DataFrame:
-    prev = aggregate_live(prev_df).rename(
-        columns={"messages_workspace": "messages_prev", "unique_messagers_workspace": "unique_prev"}
-    )
-    cur = aggregate_live(cur_df).rename(
-        columns={"messages_workspace": "messages_cur", "unique_messagers_workspace": "unique_cur"}
-    )
+class MomTracker:
+    """
+    Running per-GPT live aggregates keyed by gpt_name_clean. Each month added is
+    aggregated once and diffed against the previous month's totals kept here,
+    so a trend over N months aggregates N frames instead of 2(N-1) and never
+    re-merges full months. `running` holds totals across every month added.
+    """
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.last: Optional[pd.DataFrame] = None
+        self.running = pd.DataFrame(
+            columns=["messages_total", "unique_total", "months_active", "first_active", "last_active"],
+            index=pd.Index([], name="gpt_name_clean"),
+        )
+
+    def add(self, month: MonthData) -> Optional[pd.DataFrame]:
+        """Add the next (already excluded) month; returns its changes vs the previous month, if any."""
+        cur = aggregate_live(month.df).set_index("gpt_name_clean")
+        changes = None if self.last is None else _changes(self.last, cur)
+        self._accumulate(cur, month.label)
+        self.last = cur
+        self.labels.append(month.label)
+        return changes
+
+    def _accumulate(self, cur: pd.DataFrame, label: str) -> None:
+        idx = self.running.index.union(cur.index)
+        run = self.running.reindex(idx)
+        msgs = cur["messages_workspace"].reindex(idx, fill_value=0).to_numpy()
+        active = msgs > 0
+        run["messages_total"] = run["messages_total"].fillna(0).to_numpy() + msgs
+        run["unique_total"] = (run["unique_total"].fillna(0).to_numpy()
+                               + cur["unique_messagers_workspace"].reindex(idx, fill_value=0).to_numpy())
+        run["months_active"] = run["months_active"].fillna(0).to_numpy() + active
+        run["first_active"] = run["first_active"].mask(run["first_active"].isna() & active, label)
+        run["last_active"] = run["last_active"].mask(active, label)
+        self.running = run.astype({"messages_total": "int64", "unique_total": "int64", "months_active": "int64"})
+
+
+def mom_trend(months: List[MonthData]) -> pd.DataFrame:
+    """mom_changes for every consecutive pair of (already excluded) months, stacked long."""
+    tracker = MomTracker()
+    frames = []
+    for month in months:
+        changes = tracker.add(month)
+        if changes is not None:
+            frames.append(changes.assign(prev_month=tracker.labels[-2], cur_month=month.label))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
 
-    m = prev.merge(cur, on="gpt_name_clean", how="outer").fillna(0)
+def mom_changes(prev_df: pd.DataFrame, cur_df: pd.DataFrame) -> pd.DataFrame:
+    return _changes(aggregate_live(prev_df).set_index("gpt_name_clean"),
+                    aggregate_live(cur_df).set_index("gpt_name_clean"))
+
+
+def _changes(prev: pd.DataFrame, cur: pd.DataFrame) -> pd.DataFrame:
+    """Per-GPT deltas and status between two aggregate_live results indexed by name."""
+    idx = prev.index.union(cur.index)  # sorted names, the row order an outer merge gives
+    m = pd.DataFrame({
+        "gpt_name_clean": idx,
+        "messages_prev": prev["messages_workspace"].reindex(idx).to_numpy(),
+        "unique_prev": prev["unique_messagers_workspace"].reindex(idx).to_numpy(),
+        "messages_cur": cur["messages_workspace"].reindex(idx).to_numpy(),
+        "unique_cur": cur["unique_messagers_workspace"].reindex(idx).to_numpy(),
+    }).fillna(0)
     m["delta_messages"] = m["messages_cur"] - m["messages_prev"]
     m["status"] = np.select(
         [
@@ -155,29 +228,144 @@ def mom_changes(prev_df: pd.DataFrame, cur_df: pd.DataFrame) -> pd.DataFrame:
     return m.sort_values("delta_messages", ascending=False)
 
 
+def write_mom_workbook(out: str, months_inc: List[MonthData], overview: pd.DataFrame, mom: pd.DataFrame) -> str:
+    prev, cur = months_inc[-2], months_inc[-1]
+    with pd.ExcelWriter(out, engine="openpyxl") as w:
+        prev.df.to_excel(w, index=False, sheet_name=f"{prev.label}_clean")
+        cur.df.to_excel(w, index=False, sheet_name=f"{cur.label}_clean")
+        overview.to_excel(w, sheet_name="overview")
+        mom.to_excel(w, index=False, sheet_name="mom_live_changes")
+        if len(months_inc) > 2:
+            mom_trend(months_inc).to_excel(w, index=False, sheet_name="mom_trend")
+    return out
+
+
+def batch_inputs(directory: str) -> List[str]:
+    """Excel exports directly inside `directory` (Excel lock files skipped)."""
+    return sorted(str(p) for p in Path(directory).glob("*.xlsx") if not p.name.startswith("~$"))
+
+
+def _load_excluded(path: str, use_cache: bool, rules_path: Optional[str]) -> MonthData:
+    """Batch worker: load one export and flag exclusions."""
+    month = load_month(path, use_cache=use_cache)
+    return MonthData(label=month.label, df=apply_exclusions(month.df, load_rules("mom", rules_path)))
+
+
+def run_batch(directory: str, out_dir: Optional[str] = None, workers: Optional[int] = None,
+              use_cache: bool = True, rules_path: Optional[str] = None) -> List[str]:
+    """
+    Load every export in `directory` exactly once across a process pool, then
+    write one MoM workbook per consecutive pair of months and a summary
+    workbook covering all months (overview, stacked changes and per-GPT
+    totals). Returns the paths written.
+    """
+    paths = batch_inputs(directory)
+    if len(paths) < 2:
+        raise ValueError(f"Need at least 2 exports in {directory}; found {len(paths)}")
+    out_dir = Path(out_dir or Path(directory) / "mom_reports")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(_load_excluded, paths, [use_cache] * len(paths), [rules_path] * len(paths)))
+
+        by_label = {}
+        for path, month in zip(paths, loaded):
+            if month.label == "unknown" or month.label in by_label:
+                clash = f" (also {by_label[month.label][0]})" if month.label in by_label else ""
+                raise ValueError(f"Cannot place {path} in the month sequence: period {month.label}{clash}")
+            by_label[month.label] = (path, month)
+        months_f = [by_label[label][1] for label in sorted(by_label)]
+        months_inc = [MonthData(label=m.label, df=m.df[~m.df["_excluded"]].copy()) for m in months_f]
+
+        metrics = [month_metrics(m.df) for m in months_inc]
+        overview = pd.DataFrame(metrics, index=[m.label for m in months_inc])
+        print(f"Loaded {len(months_inc)} months from {directory} ({workers} workers): "
+              f"{months_inc[0].label} .. {months_inc[-1].label}")
+        print()
+
+        tracker = MomTracker()
+        tracker.add(months_inc[0])
+        changes, jobs = [], []
+        for (prev, cur), (prev_m, cur_m) in zip(zip(months_inc, months_inc[1:]), zip(metrics, metrics[1:])):
+            mom = tracker.add(cur)
+            changes.append(mom.assign(prev_month=prev.label, cur_month=cur.label))
+            status = mom["status"].value_counts()
+            print(f"{prev.label} to {cur.label}: live messages {prev_m['live_messages_total']:,} to "
+                  f"{cur_m['live_messages_total']:,}  delta {cur_m['live_messages_total'] - prev_m['live_messages_total']:,}  "
+                  f"new {int(status.get('new_in_cur', 0)):,}  dropped {int(status.get('dropped_in_cur', 0)):,}")
+            out = str(out_dir / f"mom_{prev.label}_{cur.label}.xlsx")
+            jobs.append(pool.submit(write_mom_workbook, out, [prev, cur], overview.loc[[prev.label, cur.label]], mom))
+
+        summary = str(out_dir / f"mom_summary_{months_inc[0].label}_{months_inc[-1].label}.xlsx")
+        with pd.ExcelWriter(summary, engine="openpyxl") as w:
+            overview.to_excel(w, sheet_name="overview")
+            pd.concat(changes, ignore_index=True).to_excel(w, index=False, sheet_name="mom_trend")
+            tracker.running.reset_index().to_excel(w, index=False, sheet_name="gpt_totals")
+        written = [job.result() for job in jobs] + [summary]
+
+    print()
+    print(f"Trend over {len(months_inc)} months:")
+    for label, r in overview.iterrows():
+        print(f"  {label}: live messages {int(r['live_messages_total']):,}  active live GPTs {int(r['active_live_gpts']):,}  top10 share {r['top10_live_share']:.2%}")
+    print()
+    print(f"Wrote {len(written)} workbooks to {out_dir}")
+    return written
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--prev", required=True, help="Previous month xlsx path")
-    ap.add_argument("--cur", required=True, help="Current month xlsx path")
+    ap.add_argument("--prev", default=None, help="Previous month xlsx path")
+    ap.add_argument("--cur", default=None, help="Current month xlsx path")
     ap.add_argument("--prev-sheet", default=None, help="Optional explicit sheet name for prev")
     ap.add_argument("--cur-sheet", default=None, help="Optional explicit sheet name for cur")
     ap.add_argument("--out", default=None, help="Optional output Excel path")
+    ap.add_argument("--rules", default=None, help="Exclusion rules file (default: exclusion_rules.json, 'mom' profile)")
+    ap.add_argument("--no-cache", action="store_true", help="Always re-parse workbooks instead of using the columnar cache")
+    ap.add_argument("--history", default=None, help="History store (SQLite); compare the latest months stored there")
+    ap.add_argument("--ingest", nargs="*", default=[], help="With --history, exports to ingest before comparing")
+    ap.add_argument("--months", type=int, default=None, help="With --history, number of latest months to compare (default: all)")
+    ap.add_argument("--batch", default=None, help="Directory of monthly exports; compare every consecutive pair in one run")
+    ap.add_argument("--out-dir", default=None, help="With --batch, output directory (default: <batch dir>/mom_reports)")
+    ap.add_argument("--workers", type=int, default=None, help="With --batch, worker processes (default: one per export, up to CPU count)")
     args = ap.parse_args()
 
-    prev = load_month(args.prev, args.prev_sheet)
-    cur = load_month(args.cur, args.cur_sheet)
-
-    prev_f = apply_exclusions(prev.df)
-    cur_f = apply_exclusions(cur.df)
+    if args.batch:
+        if args.history or args.prev or args.cur:
+            ap.error("--batch cannot be combined with --history, --prev or --cur")
+        try:
+            run_batch(args.batch, args.out_dir, args.workers, use_cache=not args.no_cache, rules_path=args.rules)
+        except ValueError as e:
+            ap.error(str(e))
+        return
+
+    if args.history:
+        for path, sheet in [(args.prev, args.prev_sheet), (args.cur, args.cur_sheet)] + [(p, None) for p in args.ingest]:
+            if path:
+                ingest_export(args.history, path, sheet=sheet, use_cache=not args.no_cache)
+        months = load_history_months(args.history, args.months)
+        if len(months) < 2:
+            ap.error(f"history store has {len(months)} month(s); need at least 2 to compare")
+        prev, cur = months[-2], months[-1]
+    elif args.prev and args.cur:
+        prev = load_month(args.prev, args.prev_sheet, use_cache=not args.no_cache)
+        cur = load_month(args.cur, args.cur_sheet, use_cache=not args.no_cache)
+        months = [prev, cur]
+    else:
+        ap.error("--prev and --cur are required unless --history or --batch is given")
 
-    prev_inc = prev_f[~prev_f["_excluded"]].copy()
-    cur_inc = cur_f[~cur_f["_excluded"]].copy()
+    rules = load_rules("mom", args.rules)
+    months_f = [apply_exclusions(m.df, rules) for m in months]
+    months_inc = [MonthData(label=m.label, df=f[~f["_excluded"]].copy()) for m, f in zip(months, months_f)]
+    prev_f, cur_f = months_f[-2], months_f[-1]
+    prev_inc, cur_inc = months_inc[-2].df, months_inc[-1].df
 
     exc_prev_msgs = int(prev_f.loc[prev_f["_excluded"], "messages_workspace"].sum())
     exc_cur_msgs = int(cur_f.loc[cur_f["_excluded"], "messages_workspace"].sum())
 
-    prev_m = month_metrics(prev_inc)
-    cur_m = month_metrics(cur_inc)
+    metrics = [month_metrics(m.df) for m in months_inc]
+    overview = pd.DataFrame(metrics, index=[m.label for m in months_inc])
+    prev_m, cur_m = metrics[-2], metrics[-1]
 
     print(f"Prev month: {prev.label}")
     print(f"Cur  month: {cur.label}")
@@ -191,6 +379,12 @@ def main():
     print(f"Top10 live share:              {prev_m['top10_live_share']:.2%} to {cur_m['top10_live_share']:.2%}")
     print()
 
+    if len(months_inc) > 2:
+        print(f"Trend over {len(months_inc)} months:")
+        for label, r in overview.iterrows():
+            print(f"  {label}: live messages {int(r['live_messages_total']):,}  active live GPTs {int(r['active_live_gpts']):,}  top10 share {r['top10_live_share']:.2%}")
+        print()
+
     mom = mom_changes(prev_inc, cur_inc)
 
     top_new = mom[mom["status"] == "new_in_cur"].sort_values("messages_cur", ascending=False).head(10)
@@ -218,11 +412,7 @@ def main():
         print(f"  {r['gpt_name_clean']}: {int(r['messages_prev']):,}")
 
     if args.out:
-        with pd.ExcelWriter(args.out, engine="openpyxl") as w:
-            prev_inc.to_excel(w, index=False, sheet_name=f"{prev.label}_clean")
-            cur_inc.to_excel(w, index=False, sheet_name=f"{cur.label}_clean")
-            pd.DataFrame([prev_m, cur_m], index=[prev.label, cur.label]).to_excel(w, sheet_name="overview")
-            mom.to_excel(w, index=False, sheet_name="mom_live_changes")
+        write_mom_workbook(args.out, months_inc, overview, mom)
         print()
         print(f"Wrote: {args.out}")
 